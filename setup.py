@@ -29,6 +29,16 @@ PKG_NAME = "dbLinkPro"
 AUTHOR_USER_NAME = "snehsuresh"
 AUTHOR_EMAIL = "snehsuresh02@gmail.com"
 
+# Each backend's driver is an extra, e.g. `pip install dbLinkPro[mysql,files]`; modules import them on first use
+EXTRAS_REQUIRE = {
+    "mysql": ["mysql-connector-python>=8.0.0"],
+    "mongo": ["pymongo[srv]", "dnspython"],
+    "cassandra": ["cassandra-driver"],
+    "files": ["pandas", "numpy", "pyarrow", "openpyxl"],
+    "async": ["aiomysql", "motor"],
+}
+EXTRAS_REQUIRE["all"] = sorted({req for reqs in EXTRAS_REQUIRE.values() for req in reqs})
+
 setup(
     name=PKG_NAME,
     version=__version__,
@@ -43,6 +53,10 @@ setup(
     },
     package_dir={"": "src"},
     packages=find_packages(where="src"),
-    install_requires=["pymongo", "pymongo[srv]", "dnspython", "pandas", "numpy", "ensure", "pytest", "mysql-connector-python", "cassandra-driver"]
+    install_requires=[],
+    extras_require=EXTRAS_REQUIRE,
+    entry_points={
+        "console_scripts": ["dblinkpro-benchmark=database_automation.benchmark:main"],
+    },
     )
 
@@ -0,0 +1,160 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from database_automation.cassandra_crud import CassandraOperation, _resolve_condition, _unset_missing
+from database_automation.conditions import Condition
+from database_automation.ingestion import frame_to_rows, iter_batches, iter_in_executor
+from database_automation.instrumentation import instrument
+
+
+def _set_future(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _wrap_response_future(response_future: Any) -> asyncio.Future:
+    # Driver callbacks run on the driver's event thread, so results are handed back to the loop thread-safely
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    response_future.add_callbacks(
+        lambda result: loop.call_soon_threadsafe(_set_future, future, result),
+        errback=lambda error: loop.call_soon_threadsafe(_set_future, future, None, error)
+    )
+    return future
+
+
+class AsyncCassandraOperation:
+    def __init__(self, contact_points: list, volume: str = "cassandra_data", max_concurrency: int = 100, **options: Any):
+        self.operation = CassandraOperation(contact_points, volume, **options)
+        self.max_concurrency = max_concurrency
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+
+    def _limiter(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.__semaphore
+
+    async def _in_executor(self, function: Any, *args: Any) -> Any:
+        # Connecting and schema changes are rare and go through the blocking driver calls on the default executor
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, function, *args)
+
+    async def connect(self, username=None, password=None):
+        return await self._in_executor(self.operation.connect, username, password)
+
+    async def close(self) -> None:
+        await self._in_executor(self.operation.close)
+
+    async def create_keyspace(self, keyspace_name: str, strategy: str = 'SimpleStrategy', replicas: int = 1):
+        await self._in_executor(self.operation.create_keyspace, keyspace_name, strategy, replicas)
+
+    async def use_keyspace(self, keyspace_name: str):
+        await self._in_executor(self.operation.use_keyspace, keyspace_name)
+
+    async def create_table(self, table_name: str, schema: Dict[str, str]):
+        await self._in_executor(self.operation.create_table, table_name, schema)
+
+    async def __aenter__(self) -> "AsyncCassandraOperation":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def execute(self, statement: Any, params: Any = None) -> Any:
+        async with self._limiter():
+            return await _wrap_response_future(self.operation.session.execute_async(statement, params))
+
+    async def insert_record(self, table_name: str, record: Dict):
+        with instrument('cassandra', 'insert_record', table_name) as event:
+            statement = self.operation._insert_statement(self.operation._qualify(table_name), tuple(record.keys()))
+            params = tuple(record.values())
+            with event.phase('execute'):
+                await self.execute(statement, params)
+            event.record(1, params)
+            self.operation._invalidate(table_name)
+
+    async def bulk_insert(self, datafile: str, table_name: str, batch_size: int = 1000,
+                          dtype: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        report: Dict[str, Any] = {'rows': 0, 'failed': []}
+        table = self.operation._qualify(table_name)
+        offset = 0
+        with instrument('cassandra', 'bulk_insert', table_name) as event:
+            # Parsing and conversion run on the executor, so the loop keeps serving other tasks meanwhile
+            chunks = (frame_to_rows(chunk) for chunk in iter_batches(datafile, batch_size, dtype))
+            async for columns, rows in iter_in_executor(chunks):
+                statement = self.operation._insert_statement(table, tuple(columns))
+                with event.phase('execute'):
+                    results = await asyncio.gather(
+                        *(self.execute(statement, _unset_missing(row)) for row in event.measure(rows)),
+                        return_exceptions=True)
+                for index, result in enumerate(results, start=offset):
+                    if isinstance(result, Exception):
+                        report['failed'].append({'row': index, 'error': repr(result)})
+                    else:
+                        report['rows'] += 1
+                offset += len(rows)
+            event.record(report['rows'])
+            self.operation._invalidate(table_name)
+        return report
+
+    async def fetch_records(self, table_name: str, fetch_size: int = 5000) -> List[Any]:
+        return [row async for row in self.fetch_iter(table_name, fetch_size)]
+
+    async def fetch_iter(self, table_name: str, fetch_size: int = 5000) -> AsyncIterator[Any]:
+        bound = self.operation._select_statement(table_name).bind(())
+        bound.fetch_size = fetch_size
+        loop = asyncio.get_running_loop()
+        pages: asyncio.Queue = asyncio.Queue()
+        with instrument('cassandra', 'fetch_iter', table_name) as event:
+            async with self._limiter():
+                response_future = self.operation.session.execute_async(bound)
+                # Callbacks stay registered and fire again for every page fetched with start_fetching_next_page
+                response_future.add_callbacks(
+                    lambda rows: loop.call_soon_threadsafe(pages.put_nowait, (rows, None)),
+                    errback=lambda error: loop.call_soon_threadsafe(pages.put_nowait, (None, error))
+                )
+                while True:
+                    with event.phase('fetch'):
+                        rows, error = await pages.get()
+                    if error is not None:
+                        raise error
+                    event.record(len(rows))
+                    for row in rows:
+                        yield row
+                    if not response_future.has_more_pages:
+                        return
+                    response_future.start_fetching_next_page()
+
+    async def fetch_pages(self, table_name: str, columns: Optional[List[str]] = None,
+                          where: Optional[Union[Dict[str, Any], Condition]] = None,
+                          fetch_size: int = 5000, paging_state: Optional[bytes] = None, dataframe: bool = False,
+                          token_range: Optional[Tuple[int, int]] = None,
+                          partition_key: Optional[Union[str, List[str]]] = None) -> AsyncIterator[Tuple[Any, Optional[bytes]]]:
+        # Resumable paging needs each page's paging_state, so every page is one blocking fetch on the executor
+        pages = self.operation.fetch_pages(table_name, columns, where, fetch_size, paging_state, dataframe,
+                                           token_range, partition_key)
+        async for page in iter_in_executor(pages):
+            yield page
+
+    async def update_record(self, table_name: str, condition_column: Union[str, Condition], condition_value: Any = None,
+                            update_values: Optional[Dict] = None):
+        condition, update_values = _resolve_condition(condition_column, condition_value, update_values)
+        with instrument('cassandra', 'update_record', table_name) as event:
+            statement, params = self.operation._update_statement(table_name, condition, update_values)
+            with event.phase('execute'):
+                await self.execute(statement, params)
+            event.record(1, params)
+            self.operation._invalidate(table_name)
+
+    async def delete_record(self, table_name: str, condition_column: Union[str, Condition], condition_value: Any = None):
+        condition, _ = _resolve_condition(condition_column, condition_value)
+        with instrument('cassandra', 'delete_record', table_name) as event:
+            statement, params = self.operation._delete_statement(table_name, condition)
+            with event.phase('execute'):
+                await self.execute(statement, params)
+            event.record(1)
+            self.operation._invalidate(table_name)
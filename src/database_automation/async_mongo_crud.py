@@ -0,0 +1,234 @@
+import asyncio
+import warnings
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError, PyMongoError
+from database_automation.ingestion import iter_batches, iter_in_executor
+from database_automation.instrumentation import instrument
+from database_automation.mongo_crud import _documents_to_frame, _frame_to_documents, _tally
+
+
+class AsyncMongoBulkWriter:
+    def __init__(self, collection: Any, batch_size: int = 1000, flush_interval: Optional[float] = 5.0):
+        self.collection = collection
+        self.batch_size = batch_size
+        # As for MongoBulkWriter, but the interval flush is a task on the running loop instead of a timer thread
+        self.flush_interval = flush_interval
+        self.stats: Dict[str, Any] = {'matched': 0, 'modified': 0, 'upserted': 0, 'deleted': 0, 'inserted': 0, 'errors': []}
+        self.__operations: List[Any] = []
+        self.__oldest = 0.0
+        self.__timer: Optional[asyncio.TimerHandle] = None
+        self.__lock: Optional[asyncio.Lock] = None
+
+    async def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False) -> None:
+        from pymongo import UpdateOne
+        await self._add(UpdateOne(filter, update, upsert=upsert))
+
+    async def replace_one(self, filter: Dict[str, Any], document: Dict[str, Any], upsert: bool = False) -> None:
+        from pymongo import ReplaceOne
+        await self._add(ReplaceOne(filter, document, upsert=upsert))
+
+    async def upsert(self, filter: Dict[str, Any], document: Dict[str, Any]) -> None:
+        from pymongo import UpdateOne
+        await self._add(UpdateOne(filter, {'$set': document}, upsert=True))
+
+    async def delete_one(self, filter: Dict[str, Any]) -> None:
+        from pymongo import DeleteOne
+        await self._add(DeleteOne(filter))
+
+    def _flush_lock(self) -> asyncio.Lock:
+        # Created lazily so it binds to the running event loop
+        if self.__lock is None:
+            self.__lock = asyncio.Lock()
+        return self.__lock
+
+    async def _add(self, operation: Any) -> None:
+        loop = asyncio.get_running_loop()
+        if not self.__operations:
+            self.__oldest = loop.time()
+        self.__operations.append(operation)
+        due = self.flush_interval is not None and loop.time() - self.__oldest >= self.flush_interval
+        if len(self.__operations) >= self.batch_size or due:
+            await self.flush()
+        elif self.flush_interval is not None and self.__timer is None:
+            self.__timer = loop.call_later(self.flush_interval - (loop.time() - self.__oldest),
+                                           lambda: asyncio.ensure_future(self._flush_due()))
+
+    async def _flush_due(self) -> None:
+        # Runs as its own task, where an exception would otherwise go unnoticed
+        try:
+            await self.flush()
+        except Exception as err:
+            warnings.warn(f"AsyncMongoBulkWriter interval flush failed: {err}", RuntimeWarning)
+
+    async def flush(self) -> Dict[str, Any]:
+        async with self._flush_lock():
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            operations, self.__operations = self.__operations, []
+            if not operations:
+                return self.stats
+            with instrument('mongo', 'bulk_write', getattr(self.collection, 'name', None)) as event:
+                try:
+                    with event.phase('execute'):
+                        result = await self.collection.bulk_write(operations, ordered=False)
+                    _tally(self.stats, result.bulk_api_result)
+                except BulkWriteError as err:
+                    _tally(self.stats, err.details)
+                    self.stats['errors'].extend(err.details.get('writeErrors', []))
+                except Exception as err:
+                    # Nothing was acknowledged, so the operations go back to the front of the buffer for the next flush
+                    self.__operations[:0] = operations
+                    self.stats['errors'].append(str(err))
+                    raise
+                event.record(len(operations))
+            return self.stats
+
+    def __len__(self) -> int:
+        return len(self.__operations)
+
+    async def __aenter__(self) -> "AsyncMongoBulkWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.flush()
+
+
+class AsyncMongoOperation:
+    def __init__(self, client_url: str, database_name: str, collection_name: Optional[str] = None,
+                 max_pool_size: int = 100, min_pool_size: int = 0, max_concurrency: int = 10, **client_options: Any):
+        self.client_url = client_url
+        self.database_name = database_name
+        self.collection_name = collection_name
+        self.max_concurrency = max_concurrency
+        self.client_options = {'maxPoolSize': max_pool_size, 'minPoolSize': min_pool_size, **client_options}
+        self.__client = None
+        self.__collections: Dict[Optional[str], Any] = {}
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+
+    def create_mongo_client(self):
+        if self.__client is None:
+            self.__client = AsyncIOMotorClient(self.client_url, **self.client_options)
+        return self.__client
+
+    def create_collection(self, collection: Optional[str] = None):
+        collection_name = collection or self.collection_name
+        handle = self.__collections.get(collection_name)
+        if handle is None:
+            handle = self.__collections[collection_name] = self.create_mongo_client()[self.database_name][collection_name]
+        return handle
+
+    def _limiter(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.__semaphore
+
+    async def close(self) -> None:
+        if self.__client is not None:
+            self.__client.close()
+        self.__client = None
+        self.__collections.clear()
+
+    async def __aenter__(self) -> "AsyncMongoOperation":
+        self.create_mongo_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def insert_record(self, record: dict, collection_name: str) -> Any:
+        collection = self.create_collection(collection_name)
+        with instrument('mongo', 'insert_record', collection_name) as event:
+            with event.phase('connect'):
+                await self._limiter().acquire()
+            try:
+                if isinstance(record, list):
+                    for data in record:
+                        if not isinstance(data, dict):
+                            raise TypeError("record must be in the dict")
+                    with event.phase('execute'):
+                        await collection.insert_many(record)
+                    event.record(len(record), record)
+                elif isinstance(record, dict):
+                    with event.phase('execute'):
+                        await collection.insert_one(record)
+                    event.record(1, record)
+            finally:
+                self._limiter().release()
+
+    async def bulk_insert(self, datafile: str, collection_name: Optional[str] = None, batch_size: int = 1000,
+                          dtype: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Up to max_concurrency batches are in flight while the next chunk is read
+        collection = self.create_collection(collection_name)
+        report: Dict[str, Any] = {'inserted': 0, 'errors': []}
+
+        async def insert(index: int, documents: List[Dict[str, Any]]) -> None:
+            try:
+                result = await collection.insert_many(documents, ordered=False)
+                report['inserted'] += len(result.inserted_ids)
+            except BulkWriteError as err:
+                report['inserted'] += err.details.get('nInserted', 0)
+                report['errors'].append({'batch': index, 'inserted': err.details.get('nInserted', 0),
+                                         'error': err.details.get('writeErrors', [])})
+            except PyMongoError as err:
+                report['errors'].append({'batch': index, 'inserted': 0, 'error': str(err)})
+            finally:
+                self._limiter().release()
+
+        with instrument('mongo', 'bulk_insert', collection_name) as event:
+            tasks = []
+            # Parsing and conversion run on the executor, so in-flight inserts keep progressing meanwhile
+            batches = (_frame_to_documents(frame) for frame in iter_batches(datafile, batch_size, dtype))
+            index = 0
+            async for documents in iter_in_executor(batches):
+                await self._limiter().acquire()
+                tasks.append(asyncio.ensure_future(insert(index, list(event.measure(documents)))))
+                index += 1
+            with event.phase('execute'):
+                await asyncio.gather(*tasks)
+            event.record(report['inserted'])
+        return report
+
+    def bulk_writer(self, collection_name: Optional[str] = None, batch_size: int = 1000,
+                    flush_interval: Optional[float] = 5.0) -> AsyncMongoBulkWriter:
+        return AsyncMongoBulkWriter(self.create_collection(collection_name), batch_size, flush_interval)
+
+    async def find_iter(self, filter: Optional[Dict[str, Any]] = None, collection_name: Optional[str] = None,
+                        projection: Optional[Any] = None, sort: Optional[List[Tuple[str, int]]] = None,
+                        batch_size: int = 1000, hint: Optional[Any] = None,
+                        dataframe: bool = False) -> AsyncIterator[Any]:
+        cursor = self.create_collection(collection_name).find(filter or {}, projection, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        if hint is not None:
+            cursor = cursor.hint(hint)
+        async for item in self._iter_cursor(cursor, batch_size, dataframe, 'find_iter', collection_name):
+            yield item
+
+    async def aggregate_iter(self, pipeline: List[Dict[str, Any]], collection_name: Optional[str] = None,
+                             batch_size: int = 1000, hint: Optional[Any] = None,
+                             dataframe: bool = False) -> AsyncIterator[Any]:
+        options: Dict[str, Any] = {'batchSize': batch_size}
+        if hint is not None:
+            options['hint'] = hint
+        cursor = self.create_collection(collection_name).aggregate(pipeline, **options)
+        async for item in self._iter_cursor(cursor, batch_size, dataframe, 'aggregate_iter', collection_name):
+            yield item
+
+    async def _iter_cursor(self, cursor: Any, batch_size: int, dataframe: bool, operation: str,
+                           collection_name: Optional[str]) -> AsyncIterator[Any]:
+        with instrument('mongo', operation, collection_name) as event:
+            documents: List[Dict[str, Any]] = []
+            async for document in cursor:
+                event.record(1)
+                if not dataframe:
+                    yield document
+                    continue
+                documents.append(document)
+                if len(documents) >= batch_size:
+                    yield _documents_to_frame(documents)
+                    documents = []
+            if documents:
+                yield _documents_to_frame(documents)
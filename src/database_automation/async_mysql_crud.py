@@ -0,0 +1,220 @@
+import asyncio
+import time
+import aiomysql
+from pymysql.constants import ER
+from contextlib import asynccontextmanager
+from typing import Optional, Any, List, Dict, Union, Iterable, AsyncIterator, Tuple
+from database_automation.conditions import Condition
+from database_automation.ingestion import iter_in_executor
+from database_automation.instrumentation import instrument
+from database_automation.sql import _iter_row_batches, _rowcount, _where
+
+
+async def _execute(cursor: Any, query: str, params: Tuple[Any, ...] = ()) -> None:
+    if params:
+        await cursor.execute(query, params)
+    else:
+        await cursor.execute(query)
+
+
+class AsyncMySQLConnection:
+    def __init__(self, host: str, user: str, password: str, database: Optional[str] = None, port: int = 3306,
+                 pool_size: int = 10, max_concurrency: Optional[int] = None, pool_recycle: float = -1):
+        self.__host = host
+        self.__user = user
+        self.__password = password
+        self.__database = database
+        self.__port = port
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency or pool_size
+        self.pool_recycle = pool_recycle
+        self.__pool: Optional[Any] = None
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+        self.__connect_lock: Optional[asyncio.Lock] = None
+
+    async def _create_pool(self) -> Any:
+        return await aiomysql.create_pool(
+            host=self.__host,
+            user=self.__user,
+            password=self.__password,
+            db=self.__database,
+            port=self.__port,
+            minsize=1,
+            maxsize=self.pool_size,
+            pool_recycle=self.pool_recycle
+        )
+
+    async def connect(self) -> None:
+        if self.__pool is not None:
+            return
+        # Created here rather than in __init__ so they bind to the running event loop; the lock makes concurrent
+        # first calls share one pool instead of each creating their own
+        if self.__connect_lock is None:
+            self.__connect_lock = asyncio.Lock()
+        async with self.__connect_lock:
+            if self.__pool is not None:
+                return
+            try:
+                pool = await self._create_pool()
+            except aiomysql.Error as err:
+                if err.args and err.args[0] == ER.BAD_DB_ERROR and self.__database:
+                    await self.create_database()
+                    pool = await self._create_pool()
+                else:
+                    raise Exception(f"Error connecting to the database: {err}")
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.__pool = pool
+
+    async def close(self) -> None:
+        if self.__pool is not None:
+            self.__pool.close()
+            await self.__pool.wait_closed()
+            self.__pool = None
+
+    async def __aenter__(self) -> "AsyncMySQLConnection":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    @asynccontextmanager
+    async def _cursor(self, cursor_class: Any = None, event: Any = None) -> AsyncIterator[Tuple[Any, Any]]:
+        # Time spent waiting for the semaphore and a pooled connection is reported as the connect phase
+        started = time.perf_counter()
+        await self.connect()
+        async with self.__semaphore:  # type: ignore
+            async with self.__pool.acquire() as connection:  # type: ignore
+                if event is not None:
+                    event.timings['connect'] = time.perf_counter() - started
+                cursor = connection.cursor(cursor_class) if cursor_class else connection.cursor()
+                async with cursor as cursor:
+                    yield connection, cursor
+
+    async def create_database(self) -> None:
+        try:
+            connection = await aiomysql.connect(
+                host=self.__host,
+                user=self.__user,
+                password=self.__password,
+                port=self.__port
+            )
+            async with connection.cursor() as cursor:
+                await cursor.execute(f"CREATE DATABASE {self.__database}")
+            connection.close()
+        except aiomysql.Error as err:
+            raise Exception(f"Failed to create database: {err}")
+
+    async def create_table(self, table_name: str, columns: Dict[str, str]) -> None:
+        try:
+            async with self._cursor() as (connection, cursor):
+                columns_str = ', '.join([f'{col} {data_type}' for col, data_type in columns.items()])
+                await cursor.execute(f'CREATE TABLE IF NOT EXISTS {table_name} ({columns_str})')
+                await connection.commit()
+        except aiomysql.Error as err:
+            raise Exception(f"Failed to create table: {err}")
+
+    async def insert_record(self, table_name: str, record: Dict[str, Any]) -> None:
+        with instrument('mysql', 'insert_record', table_name) as event:
+            try:
+                async with self._cursor(event=event) as (connection, cursor):
+                    columns = ', '.join(record.keys())
+                    placeholders = ', '.join(['%s'] * len(record))
+                    values = tuple(record.values())
+                    with event.phase('execute'):
+                        await cursor.execute(f'INSERT INTO {table_name} ({columns}) VALUES ({placeholders})', values)
+                        await connection.commit()
+                    event.record(1, values)
+            except aiomysql.Error as err:
+                raise Exception(f"Failed to insert record: {err}")
+
+    async def bulk_insert(self, table_name: str, rows: Union[str, Iterable[Dict[str, Any]], Any],
+                          batch_size: int = 1000, dtype: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        total_rows = 0
+        batches = 0
+        with instrument('mysql', 'bulk_insert', table_name) as event:
+            async with self._cursor(event=event) as (connection, cursor):
+                # Reading and converting the file runs on the executor, between awaits on the database
+                async for columns, values in iter_in_executor(_iter_row_batches(rows, batch_size, dtype)):
+                    placeholders = ', '.join(['%s'] * len(columns))
+                    try:
+                        with event.phase('execute'):
+                            await cursor.executemany(f'INSERT INTO {table_name} ({", ".join(columns)}) VALUES ({placeholders})', values)
+                            await connection.commit()
+                    except aiomysql.Error as err:
+                        await connection.rollback()
+                        raise Exception(f"Failed to bulk insert records after {total_rows} rows: {err}")
+                    event.record(len(values), values)
+                    total_rows += len(values)
+                    batches += 1
+        return {'rows': total_rows, 'batches': batches}
+
+    async def select_record(self, table_name: str, conditions: Union[str, Condition, None] = None) -> List[Tuple[Any, ...]]:
+        where, params = _where(conditions)
+        with instrument('mysql', 'select_record', table_name) as event:
+            try:
+                async with self._cursor(event=event) as (connection, cursor):
+                    with event.phase('execute'):
+                        await _execute(cursor, f'SELECT * FROM {table_name}{where}', params)
+                    with event.phase('fetch'):
+                        rows = list(await cursor.fetchall())
+                    event.record(len(rows), rows)
+                    return rows
+            except aiomysql.Error as err:
+                raise Exception(f"Failed to select record: {err}")
+
+    async def select_iter(self, table_name: str, conditions: Union[str, Condition, None] = None, batch_size: int = 1000,
+                          batches: bool = False) -> AsyncIterator[Any]:
+        # Server-side cursor; the pooled connection is held until the generator is exhausted or closed
+        where, params = _where(conditions)
+        select_query = f'SELECT * FROM {table_name}{where}'
+        with instrument('mysql', 'select_iter', table_name) as event:
+            try:
+                async with self._cursor(aiomysql.SSCursor, event) as (connection, cursor):
+                    with event.phase('execute'):
+                        await _execute(cursor, select_query, params)
+                    while True:
+                        with event.phase('fetch'):
+                            rows = await cursor.fetchmany(batch_size)
+                        if not rows:
+                            return
+                        event.record(len(rows), rows)
+                        if batches:
+                            yield list(rows)
+                        else:
+                            for row in rows:
+                                yield row
+            except aiomysql.Error as err:
+                raise Exception(f"Failed to select records: {err}")
+
+    async def update_record(self, table_name: str, record: Dict[str, Any], conditions: Union[str, Condition]) -> None:
+        where, params = _where(conditions)
+        if not where:
+            raise ValueError("update_record requires conditions; pass a condition matching every row to update all rows.")
+        with instrument('mysql', 'update_record', table_name) as event:
+            try:
+                async with self._cursor(event=event) as (connection, cursor):
+                    set_clause = ', '.join([f'{key}=%s' for key in record.keys()])
+                    values = tuple(record.values()) + params
+                    with event.phase('execute'):
+                        await cursor.execute(f'UPDATE {table_name} SET {set_clause}{where}', values)
+                        await connection.commit()
+                    event.record(_rowcount(cursor), values)
+            except aiomysql.Error as err:
+                raise Exception(f"Failed to update record: {err}")
+
+    async def delete_record(self, table_name: str, conditions: Union[str, Condition]) -> None:
+        where, params = _where(conditions)
+        if not where:
+            raise ValueError("delete_record requires conditions; pass a condition matching every row to delete all rows.")
+        with instrument('mysql', 'delete_record', table_name) as event:
+            try:
+                async with self._cursor(event=event) as (connection, cursor):
+                    with event.phase('execute'):
+                        await _execute(cursor, f'DELETE FROM {table_name}{where}', params)
+                        await connection.commit()
+                    event.record(_rowcount(cursor))
+            except aiomysql.Error as err:
+                raise Exception(f"Failed to delete record: {err}")
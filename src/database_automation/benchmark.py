@@ -0,0 +1,369 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from unittest import mock
+
+
+BACKENDS = ('mysql', 'mysql_pooled', 'mongo', 'cassandra')
+SQL_COLUMNS = {'id': 'INT PRIMARY KEY', 'name': 'VARCHAR(64)', 'score': 'DOUBLE', 'category': 'VARCHAR(16)'}
+CQL_COLUMNS = {'id': 'int', 'name': 'text', 'score': 'double', 'category': 'text'}
+
+
+def generate_rows(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    # Same seed, same rows, so results from different versions are comparable
+    rng = random.Random(seed)
+    categories = ['alpha', 'beta', 'gamma', 'delta']
+    return [
+        {'id': index, 'name': f'user{rng.randrange(10 ** 6):06d}', 'score': round(rng.uniform(0, 100), 3),
+         'category': rng.choice(categories)}
+        for index in range(count)
+    ]
+
+
+def write_csv(rows: List[Dict[str, Any]], path: str) -> str:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(latencies: List[float], rows: int) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        'calls': len(ordered),
+        'rows': rows,
+        'seconds': total,
+        'p50_ms': _percentile(ordered, 0.50) * 1000,
+        'p95_ms': _percentile(ordered, 0.95) * 1000,
+        'p99_ms': _percentile(ordered, 0.99) * 1000,
+        'mean_ms': total / len(ordered) * 1000,
+        'rows_per_sec': rows / total if total > 0 else 0.0,
+    }
+
+
+def time_each(items: Sequence[Any], operation: Callable[[Any], Any]) -> Dict[str, float]:
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        operation(item)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, len(items))
+
+
+def time_runs(rows: int, operation: Callable[[int], Any], repeat: int) -> Dict[str, float]:
+    # Whole-dataset operations are timed once per run, so the percentiles are taken over `repeat` samples
+    latencies = []
+    for run_index in range(repeat):
+        start = time.perf_counter()
+        operation(run_index)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, rows * repeat)
+
+
+class _SQLiteCursor:
+    # Enough of the mysql.connector cursor API for MySQLConnection, backed by SQLite
+    def __init__(self, database: sqlite3.Connection, latency: float):
+        self._cursor = database.cursor()
+        self._latency = latency
+
+    def _round_trip(self) -> None:
+        if self._latency:
+            time.sleep(self._latency)
+
+    def execute(self, query: str, params: Sequence[Any] = ()) -> None:
+        self._round_trip()
+        self._cursor.execute(query.replace('%s', '?'), params)
+
+    def executemany(self, query: str, params: Sequence[Sequence[Any]]) -> None:
+        self._round_trip()
+        self._cursor.executemany(query.replace('%s', '?'), params)
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def fetchall(self) -> List[tuple]:
+        self._round_trip()
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size: int) -> List[tuple]:
+        self._round_trip()
+        return self._cursor.fetchmany(size)
+
+    @property
+    def column_names(self) -> tuple:
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class _SQLiteConnection:
+    in_transaction = False
+
+    def __init__(self, database: sqlite3.Connection, latency: float):
+        self._database = database
+        self._latency = latency
+        if latency:
+            time.sleep(latency * 3)  # TCP + auth handshake
+
+    def cursor(self, *args: Any, **kwargs: Any) -> _SQLiteCursor:
+        return _SQLiteCursor(self._database, self._latency)
+
+    def commit(self) -> None:
+        if self._latency:
+            time.sleep(self._latency)
+        self._database.commit()
+
+    def rollback(self) -> None:
+        self._database.rollback()
+
+    def is_connected(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class _FakePreparedStatement:
+    def __init__(self, query: str):
+        self.query = query
+
+    def bind(self, values: Sequence[Any]) -> SimpleNamespace:
+        return SimpleNamespace(prepared=self, values=tuple(values), fetch_size=None)
+
+
+class _FakeResponseFuture:
+    # Mimics the parts of cassandra.cluster.ResponseFuture used by execute_concurrent
+    _col_names = None
+    _col_types = None
+    has_more_pages = False
+
+    def __init__(self, session: "_FakeCassandraSession", statement: Any, params: Any):
+        self._session = session
+        self._statement = statement
+        self._params = params
+
+    def add_callbacks(self, callback: Callable, errback: Optional[Callable] = None, callback_args: tuple = (),
+                      callback_kwargs: Optional[dict] = None, errback_args: tuple = (), errback_kwargs: Optional[dict] = None):
+        def deliver():
+            try:
+                result = self._session.execute(self._statement, self._params)
+            except Exception as err:
+                if errback:
+                    errback(err, *errback_args, **(errback_kwargs or {}))
+                return
+            callback(result.current_rows, *callback_args, **(callback_kwargs or {}))
+        self._session.executor.submit(deliver)
+
+    def clear_callbacks(self) -> None:
+        pass
+
+
+class _FakeCassandraSession:
+    def __init__(self, keyspace: str, latency: float, workers: int = 8):
+        self.keyspace = keyspace
+        self.latency = latency
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.cluster = SimpleNamespace(metadata=SimpleNamespace(keyspaces={keyspace: SimpleNamespace(tables={})}))
+        self._tables: Dict[str, List[tuple]] = {}
+        self._lock = threading.Lock()
+
+    def add_table(self, table: str, schema: Dict[str, str]) -> None:
+        columns = {name: SimpleNamespace(name=name, cql_type=cql_type) for name, cql_type in schema.items()}
+        self.cluster.metadata.keyspaces[self.keyspace].tables[table] = SimpleNamespace(columns=columns)
+        self._tables[f'{self.keyspace}.{table}'] = []
+
+    def prepare(self, query: str) -> _FakePreparedStatement:
+        if self.latency:
+            time.sleep(self.latency)
+        return _FakePreparedStatement(query)
+
+    def execute(self, statement: Any, params: Any = None, paging_state: Optional[bytes] = None, **kwargs: Any) -> SimpleNamespace:
+        if self.latency:
+            time.sleep(self.latency)
+        fetch_size = None
+        if isinstance(statement, SimpleNamespace):
+            statement, params, fetch_size = statement.prepared, statement.values, statement.fetch_size
+        words = statement.query.split()
+        if words[0] == 'INSERT':
+            with self._lock:
+                self._tables[words[2]].append(tuple(params))
+        elif words[0] == 'SELECT':
+            rows = self._tables[words[words.index('FROM') + 1].rstrip(';')]
+            start = int(paging_state or 0)
+            end = start + (fetch_size or len(rows) or 1)
+            next_state = str(end).encode() if end < len(rows) else None
+            return SimpleNamespace(current_rows=rows[start:end], paging_state=next_state, column_names=list(CQL_COLUMNS))
+        return SimpleNamespace(current_rows=[], paging_state=None, column_names=[])
+
+    def execute_async(self, statement: Any, params: Any = None, **kwargs: Any) -> _FakeResponseFuture:
+        return _FakeResponseFuture(self, statement, params)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+
+def bench_mysql(rows: List[Dict[str, Any]], csv_path: str, single: int, batch_size: int, latency: float,
+                pool_size: int = 0, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    from database_automation.mysql_crud import MySQLConnection
+    database = sqlite3.connect(':memory:', check_same_thread=False)
+    with mock.patch('database_automation.mysql_crud.mysql.connector.connect',
+                    lambda **kwargs: _SQLiteConnection(database, latency)):
+        connection = MySQLConnection('localhost', 'bench', 'bench', 'bench', pool_size=pool_size)
+        connection.create_table('bench_single', SQL_COLUMNS)
+        # Each bulk run loads its own table, so every run inserts into an empty table
+        for run_index in range(repeat):
+            connection.create_table(f'bench_bulk_{run_index}', SQL_COLUMNS)
+        results = {
+            'single_insert': time_each(rows[:single], lambda row: connection.insert_record('bench_single', row)),
+            'bulk_insert': time_runs(len(rows), lambda run_index: connection.bulk_insert(
+                f'bench_bulk_{run_index}', csv_path, batch_size=batch_size), repeat),
+            'scan': time_runs(len(rows), lambda run_index: sum(
+                1 for _ in connection.select_iter('bench_bulk_0', batch_size=batch_size)), repeat),
+            'update': time_each(rows[:single], lambda row: connection.update_record(
+                'bench_bulk_0', {'score': row['score'] + 1}, f"id = {row['id']}")),
+        }
+        connection.close()
+    database.close()
+    return results
+
+
+def bench_mongo(rows: List[Dict[str, Any]], csv_path: str, single: int, batch_size: int,
+                latency: float, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    # mongomock has no network hop, so latency is not injected for this backend
+    import mongomock
+    from database_automation.connector import MongoConnector
+    from database_automation.mongo_crud import MongoOperation
+    with mock.patch('pymongo.mongo_client.MongoClient', mongomock.MongoClient):
+        with MongoOperation('mongodb://bench', 'bench') as mongo:
+            connector = MongoConnector(mongo, batch_size=batch_size)
+            results = {
+                'single_insert': time_each(rows[:single], lambda row: mongo.insert_record(dict(row), 'bench_single')),
+                'bulk_insert': time_runs(len(rows), lambda run_index: mongo.bulk_insert(
+                    csv_path, f'bench_bulk_{run_index}', batch_size=batch_size), repeat),
+                'scan': time_runs(len(rows), lambda run_index: sum(
+                    1 for _ in mongo.find_iter(collection_name='bench_bulk_0', batch_size=batch_size)), repeat),
+                'update': time_each(rows[:single], lambda row: connector.update(
+                    'bench_bulk_0', {'score': row['score'] + 1}, {'id': row['id']})),
+            }
+    return results
+
+
+def bench_cassandra(rows: List[Dict[str, Any]], csv_path: str, single: int, batch_size: int,
+                    latency: float, concurrency: int = 50, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    from database_automation.cassandra_crud import CassandraOperation
+    session = _FakeCassandraSession('bench', latency)
+    session.add_table('bench_single', CQL_COLUMNS)
+    for run_index in range(repeat):
+        session.add_table(f'bench_bulk_{run_index}', CQL_COLUMNS)
+    cluster = mock.MagicMock()
+    cluster.return_value.connect.return_value = session
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch('cassandra.cluster.Cluster', cluster))
+        stack.enter_context(mock.patch('builtins.print'))
+        cassandra = CassandraOperation(['127.0.0.1'])
+        cassandra.connect()
+    results = {
+        'single_insert': time_each(rows[:single], lambda row: cassandra.insert_record('bench_single', row)),
+        'bulk_insert': time_runs(len(rows), lambda run_index: cassandra.bulk_insert(
+            csv_path, f'bench_bulk_{run_index}', concurrency=concurrency), repeat),
+        'scan': time_runs(len(rows), lambda run_index: sum(
+            1 for _ in cassandra.fetch_iter('bench_bulk_0', fetch_size=batch_size)), repeat),
+        'update': time_each(rows[:single], lambda row: cassandra.update_record(
+            'bench_bulk_0', 'id', row['id'], {'score': row['score'] + 1})),
+    }
+    session.shutdown()
+    return results
+
+
+def run(backends: Sequence[str] = BACKENDS, rows: int = 10000, single: int = 1000, batch_size: int = 1000,
+        latency: float = 0.0, seed: int = 42, repeat: int = 5) -> Dict[str, Any]:
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1.")
+    dataset = generate_rows(rows, seed)
+    single = min(single, rows)
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = write_csv(dataset, os.path.join(directory, 'bench.csv'))
+        # Warm the CSV reader so the first backend does not pay the one-off import and parser setup cost
+        from database_automation.ingestion import iter_batches
+        for _ in iter_batches(csv_path, batch_size):
+            pass
+        for backend in backends:
+            if backend == 'mysql':
+                results[backend] = bench_mysql(dataset, csv_path, single, batch_size, latency, repeat=repeat)
+            elif backend == 'mysql_pooled':
+                results[backend] = bench_mysql(dataset, csv_path, single, batch_size, latency, pool_size=4, repeat=repeat)
+            elif backend == 'mongo':
+                results[backend] = bench_mongo(dataset, csv_path, single, batch_size, latency, repeat=repeat)
+            elif backend == 'cassandra':
+                results[backend] = bench_cassandra(dataset, csv_path, single, batch_size, latency, repeat=repeat)
+            else:
+                raise ValueError(f"Unknown backend '{backend}'. Expected one of {', '.join(BACKENDS)}.")
+    return {
+        'meta': {
+            'version': _package_version(),
+            'python': platform.python_version(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'rows': rows,
+            'single': single,
+            'batch_size': batch_size,
+            'latency': latency,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def _package_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('dbLinkPro')
+    except Exception:
+        return 'unknown'
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dbLinkPro CRUD and bulk-load paths against local stand-ins.")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--rows', type=int, default=10000, help="rows in the generated dataset")
+    parser.add_argument('--single', type=int, default=1000, help="rows used for single-record insert and update timings")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds of simulated latency per driver round trip")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help="runs of bulk insert and scan, the samples for their percentiles")
+    parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run(args.backends, args.rows, args.single, args.batch_size, args.latency, args.seed, args.repeat)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
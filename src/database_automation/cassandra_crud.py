@@ -1,83 +1,145 @@
-from typing import Any, Dict
-import pandas as pd
-from cassandra.cluster import Cluster
-from cassandra.auth import PlainTextAuthProvider
-import subprocess
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from collections import OrderedDict, deque
+from decimal import Decimal
+import datetime
+import uuid
+from database_automation.conditions import Condition, eq, from_dict
+from database_automation.ingestion import frame_to_rows, iter_batches
+from database_automation.instrumentation import instrument
+from database_automation.provisioning import DockerProvisioner, Provisioner
+from database_automation.resilience import CircuitBreaker, RetryPolicy, is_transient_cassandra_error
+from database_automation.result_cache import ResultCache
+import threading
 import time
 
 
+def _is_integer(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+
+_CQL_VALIDATORS: Dict[str, Callable[[Any], bool]] = {
+    'text': lambda value: isinstance(value, str),
+    'varchar': lambda value: isinstance(value, str),
+    'ascii': lambda value: isinstance(value, str),
+    'inet': lambda value: isinstance(value, str),
+    'int': _is_integer,
+    'bigint': _is_integer,
+    'smallint': _is_integer,
+    'tinyint': _is_integer,
+    'varint': _is_integer,
+    'counter': _is_integer,
+    'float': _is_number,
+    'double': _is_number,
+    'decimal': _is_number,
+    'boolean': lambda value: isinstance(value, bool),
+    'uuid': lambda value: isinstance(value, uuid.UUID),
+    'timeuuid': lambda value: isinstance(value, uuid.UUID),
+    'timestamp': lambda value: isinstance(value, (datetime.datetime, int)) and not isinstance(value, bool),
+    'date': lambda value: isinstance(value, datetime.date),
+    'time': lambda value: isinstance(value, (datetime.time, int)) and not isinstance(value, bool),
+    'blob': lambda value: isinstance(value, (bytes, bytearray)),
+    'list': lambda value: isinstance(value, (list, tuple)),
+    'set': lambda value: isinstance(value, (set, frozenset, list, tuple)),
+    'map': lambda value: isinstance(value, dict),
+    'tuple': lambda value: isinstance(value, tuple),
+}
+
+
+def _validator_for(cql_type: str) -> Callable[[Any], bool]:
+    # Collections validate on their outer type, e.g. 'frozen<list<int>>' -> 'list'
+    base_type = cql_type
+    if base_type.startswith('frozen<'):
+        base_type = base_type[len('frozen<'):-1]
+    base_type = base_type.split('<', 1)[0]
+    # Types without a known Python equivalent are left to the driver to validate on bind
+    return _CQL_VALIDATORS.get(base_type, lambda value: value is not None)
+
+
+def _resolve_condition(condition_column: Union[str, Condition], condition_value: Any,
+                       update_values: Optional[Dict] = None) -> Tuple[Condition, Optional[Dict]]:
+    # update_record('t', 'id', 1, values) and update_record('t', eq('id', 1), values) are both accepted
+    if isinstance(condition_column, Condition):
+        return condition_column, update_values if update_values is not None else condition_value
+    return eq(condition_column, condition_value), update_values
+
+
+def _unset_missing(row: tuple) -> tuple:
+    # An unset cell writes nothing, where a None would write a tombstone for every empty CSV cell
+    if not any(value is None for value in row):
+        return row
+    from cassandra.query import UNSET_VALUE
+    return tuple(UNSET_VALUE if value is None else value for value in row)
+
+
 class CassandraOperation:
-    def __init__(self, contact_points: list, volume: str = "cassandra_data"):
+    def __init__(self, contact_points: list, volume: str = "cassandra_data", statement_cache_size: int = 256,
+                 schema_cache_ttl: float = 300.0, result_cache: Optional[ResultCache] = None,
+                 retry_policy: Optional[RetryPolicy] = None, circuit_breaker: Optional[CircuitBreaker] = None,
+                 connect_timeout: float = 120.0, provisioner: Optional[Provisioner] = None, port: int = 9042):
         self.contact_points = contact_points
         self.schema = None
         self.volume = volume
-
-        if not self._is_cassandra_running():
-            started = self._start_cassandra_container()
-            if not started:
-                raise RuntimeError("Failed to start Cassandra Docker container.")
-            
-    def _is_cassandra_running(self):
-        try:
-            output = subprocess.check_output(["docker", "inspect", "-f", "{{.State.Running}}", "test-cassandra-v2"], stderr=subprocess.DEVNULL)
-            return output.strip() == b"true"
-        except subprocess.CalledProcessError:
-            return False
-
-    def _start_cassandra_container(self):
-        try:
-            # Check if the volume exists
-            volume_exists = subprocess.run(["docker", "volume", "inspect", self.volume], stderr=subprocess.DEVNULL).returncode == 0
-            # Create the volume if it doesn't exist
-            if not volume_exists:
-                subprocess.run(["docker", "volume", "create", self.volume], check=True)
-                print(f"Docker volume {self.volume} created.")
-
-            # Remove any existing container with the same name to avoid conflicts
-            subprocess.run(["docker", "rm", "-f", "test-cassandra-v2"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            # Run the Cassandra container with the volume
-            volume_path = f"{self.volume}:/var/lib/cassandra"
-            container_id = subprocess.check_output([
-                "docker", "run", "--name", "test-cassandra-v2",
-                "-p", "9042:9042",
-                "-v", volume_path,
-                "-d", "cassandra:latest"
-            ], stderr=subprocess.DEVNULL)
-            
-            print(f"Container ID created: {container_id.decode().strip()}")
-            for _ in range(10):  # Retry up to n times 
-                if self._is_cassandra_running():
-                    print("Cassandra is running.")
-                    return True
-                time.sleep(2)  # Check every 2 seconds
-            print("Error: Cassandra did not start in the expected time.")
-            return False
-        except subprocess.CalledProcessError as e:
-            print(f"Error starting Cassandra container: {e}")
-            return False
+        self.statement_cache_size = statement_cache_size
+        self.schema_cache_ttl = schema_cache_ttl
+        self.__statements: OrderedDict = OrderedDict()
+        self.__statements_lock = threading.Lock()
+        self.__schemas: Dict[Tuple[Optional[str], str], Tuple[float, Dict[str, str], Dict[str, Callable[[Any], bool]]]] = {}
+        self.__session: Any = None
+        # With a result_cache, fetch_records returns a list served from the cache until this instance writes to the table
+        self.result_cache = result_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.connect_timeout = connect_timeout
+        self.port = port
+        # Container management is opt-in, e.g. provisioner=DockerProvisioner(volume); without one nothing is spawned
+        self.provisioner = provisioner
+        if provisioner is not None and not provisioner.start():
+            raise RuntimeError("Provisioner failed to start Cassandra.")
 
     def connect(self, username=None, password=None):
+        from cassandra.auth import PlainTextAuthProvider
+        from cassandra.cluster import Cluster
         self.__username = username
         self.__password = password
-        start_time = time.time()
-        timeout = 120
         auth_provider = None
-        message_printed = False
         if self.__username and self.__password:
             auth_provider = PlainTextAuthProvider(username=self.__username, password=self.__password)
-        while time.time() - start_time < timeout:
+
+        def announce(error: BaseException, attempt: int, delay: float) -> None:
+            if attempt == 1:
+                print(f"Error connecting: {error}")
+                print(f"It seems Cassandra isn't ready yet. Give us a minute while we ensure it is fully operational..")
+
+        # Backs off from 0.5s up to 10s between attempts instead of a fixed 5s, within connect_timeout overall.
+        # The circuit breaker is left out so a node that is still starting does not cut the wait short.
+        policy = RetryPolicy(max_attempts=None, base_delay=0.5, max_delay=10.0, deadline=self.connect_timeout,
+                             on_retry=announce)
+        with instrument('cassandra', 'connect') as event, event.phase('connect'):
             try:
-                self.__cluster = Cluster(self.contact_points, auth_provider=auth_provider, port=9042)
-                self.__session = self.__cluster.connect()
-                print("Cassandra is ready.")
-                return self.__session
-            except Exception as e:
-                if not message_printed and 'ConnectionResetError' in str(e):
-                    print(f"Error connecting: {e}")
-                    print(f"It seems Cassandra isn't ready yet. Give us a minute while we ensure it is fully operational..")
-                message_printed = True
-                time.sleep(5)  # Wait for 5 seconds before retrying
-        raise RuntimeError("Cassandra did not become ready in the expected time.")
+                for attempt in policy.attempts(classify=is_transient_cassandra_error):
+                    with attempt:
+                        cluster = Cluster(self.contact_points, auth_provider=auth_provider, port=self.port)
+                        try:
+                            self.__session = cluster.connect()
+                        except Exception:
+                            cluster.shutdown()
+                            raise
+                        self.__cluster = cluster
+            except Exception as err:
+                if is_transient_cassandra_error(err):
+                    raise RuntimeError("Cassandra did not become ready in the expected time.") from err
+                raise
+        self.circuit_breaker.reset()
+        print("Cassandra is ready.")
+        return self.__session
+
+    @property
+    def session(self):
+        return self.__session
 
     def create_keyspace(self, keyspace_name: str, strategy: str = 'SimpleStrategy', replicas: int = 1):
         self.__session.execute(f"CREATE KEYSPACE IF NOT EXISTS {keyspace_name} WITH replication = {{'class': '{strategy}', 'replication_factor' : {replicas}}};")
@@ -90,6 +152,7 @@ class CassandraOperation:
             table = self.__session.keyspace + '.' +  table_name
             schema_str = ', '.join([f"{column} {datatype}" for column, datatype in schema.items()])
             self.__session.execute(f"CREATE TABLE IF NOT EXISTS {table} ({schema_str});")
+            self.invalidate_schema_cache(table_name)
         else:
             raise ValueError("No keyspace selected in the current session.") 
 
@@ -110,6 +173,23 @@ class CassandraOperation:
         schema = {column.name: str(column.cql_type) for column in table.columns.values()}
         return schema
 
+    def _table_validators(self, table_name: str) -> Tuple[Dict[str, str], Dict[str, Callable[[Any], bool]]]:
+        key = (self.__session.keyspace, table_name)
+        cached = self.__schemas.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.schema_cache_ttl:
+            return cached[1], cached[2]
+        schema = self.get_table_schema(table_name)
+        validators = {column: _validator_for(cql_type) for column, cql_type in schema.items()}
+        self.__schemas[key] = (time.monotonic(), schema, validators)
+        return schema, validators
+
+    def invalidate_schema_cache(self, table_name: Optional[str] = None):
+        if table_name is None:
+            self.__schemas.clear()
+            return
+        for key in [key for key in self.__schemas if key[1] == table_name]:
+            del self.__schemas[key]
+
     def switch_keyspace(self, keyspace_name: str):
         if keyspace_name in self.__cluster.metadata.keyspaces:
             self.__session.set_keyspace(keyspace_name)
@@ -118,74 +198,303 @@ class CassandraOperation:
         else:
             raise ValueError(f"Keyspace '{keyspace_name}' does not exist.")
 
+    def _qualify(self, table_name: str) -> str:
+        if '.' in table_name or not self.__session.keyspace:
+            return table_name
+        return self.__session.keyspace + '.' + table_name
+
+    def _execute(self, statement: Any, *args: Any, **kwargs: Any) -> Any:
+        # Every statement built here is idempotent (INSERT is an upsert, UPDATE assigns absolute values), so all are retried
+        for attempt in self.retry_policy.attempts(self.circuit_breaker, is_transient_cassandra_error):
+            with attempt:
+                return self.__session.execute(statement, *args, **kwargs)
+
+    def _invalidate(self, table_name: str) -> None:
+        if self.result_cache is not None:
+            self.result_cache.invalidate('cassandra', self._qualify(table_name))
+
+    def _prepare(self, table: str, columns: Tuple[str, ...], operation: str, query: str):
+        key = (table, columns, operation)
+        with self.__statements_lock:
+            statement = self.__statements.get(key)
+            if statement is not None:
+                self.__statements.move_to_end(key)
+                return statement
+        statement = self.__session.prepare(query)
+        with self.__statements_lock:
+            self.__statements[key] = statement
+            while len(self.__statements) > self.statement_cache_size:
+                self.__statements.popitem(last=False)
+        return statement
+
+    def _insert_statement(self, table: str, columns: Tuple[str, ...]):
+        placeholders = ', '.join(['?'] * len(columns))
+        return self._prepare(table, columns, 'insert', f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders});")
+
     def insert_record(self, table_name: str, record: Dict):
-        table = self.__session.keyspace + '.' + table_name
-        columns = ', '.join(record.keys())
-        values = ', '.join([f"'{value}'" if isinstance(value, str) else str(value) for value in record.values()])
-        query = f"INSERT INTO {table} ({columns}) VALUES ({values});"
-        self.__session.execute(query)
-
-    def bulk_insert(self, datafile: str, table_name: str):
-        if datafile.endswith('.csv'):
-            dataframe = pd.read_csv(datafile, encoding='utf-8')
-        elif datafile.endswith(".xlsx"):
-            dataframe = pd.read_excel(datafile, encoding='utf-8')  
-        for _, row in dataframe.iterrows():
-            record = row.to_dict()
-            print(record)
-            self.insert_record(table_name, record)
+        with instrument('cassandra', 'insert_record', table_name) as event:
+            statement = self._insert_statement(self._qualify(table_name), tuple(record.keys()))
+            params = tuple(record.values())
+            with event.phase('execute'):
+                self._execute(statement, params)
+            event.record(1, params)
+            self._invalidate(table_name)
+
+    def bulk_insert(self, datafile: str, table_name: str, concurrency: int = 50,
+                    partition_key: Optional[Union[str, List[str]]] = None, batch_size: int = 20,
+                    chunk_size: int = 10000, dtype: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # chunk_size rows are read from the file at a time; batch_size caps each unlogged partition batch
+        with instrument('cassandra', 'bulk_insert', table_name) as event:
+            chunks = (frame_to_rows(chunk) for chunk in iter_batches(datafile, chunk_size, dtype))
+            rows = self._prepared_rows(self._qualify(table_name), chunks, event)
+            if partition_key is None:
+                requests: Iterable = ((statement, row, [index]) for index, statement, _, row in rows)
+            else:
+                keys = [partition_key] if isinstance(partition_key, str) else list(partition_key)
+                requests = self._partition_batches(rows, keys, batch_size, concurrency * batch_size)
+            with event.phase('execute'):
+                report = self._execute_concurrently(requests, concurrency)
+            event.record(report['rows'])
+            self._invalidate(table_name)
+            return report
+
+    def insert_rows(self, table_name: str, rows: Union[Iterable[Dict[str, Any]], Any],
+                    concurrency: int = 50) -> Dict[str, Any]:
+        # rows is an iterable of dicts or a DataFrame; failures are reported per row, as for bulk_insert
+        with instrument('cassandra', 'insert_rows', table_name) as event:
+            if hasattr(rows, 'itertuples'):
+                chunks: Iterable = [frame_to_rows(rows)]
+            else:
+                chunks = ((list(row.keys()), [tuple(row.values())]) for row in rows)
+            prepared = self._prepared_rows(self._qualify(table_name), chunks, event)
+            requests = ((statement, row, [index]) for index, statement, _, row in prepared)
+            with event.phase('execute'):
+                report = self._execute_concurrently(requests, concurrency)
+            event.record(report['rows'])
+            self._invalidate(table_name)
+            return report
+
+    def _prepared_rows(self, table: str, chunks: Iterable[Tuple[List[str], List[tuple]]],
+                       event: Any) -> Iterator[Tuple[int, Any, Tuple[str, ...], tuple]]:
+        # Each chunk is bound to a statement for its own columns; JSONL chunks take their column order from their first record
+        index = 0
+        for chunk_columns, values in chunks:
+            columns = tuple(chunk_columns)
+            statement = self._insert_statement(table, columns)
+            for row in event.measure(values):
+                yield index, statement, columns, _unset_missing(row)
+                index += 1
+
+    def _partition_batches(self, rows: Iterable[Tuple[int, Any, Tuple[str, ...], tuple]], keys: List[str],
+                           batch_size: int, window: int) -> Iterator[Tuple[Any, tuple, List[int]]]:
+        # Groups rows sharing a partition key into UNLOGGED batches, flushing the buffer every `window` rows
+        buffered: Dict[tuple, List[Tuple[int, Any, tuple]]] = {}
+        positions: Dict[Tuple[str, ...], List[int]] = {}
+        pending = 0
+        for index, statement, columns, row in rows:
+            if columns not in positions:
+                missing = [key for key in keys if key not in columns]
+                if missing:
+                    raise ValueError(f"Partition key column(s) {missing} missing from the data.")
+                positions[columns] = [columns.index(key) for key in keys]
+            group = buffered.setdefault(tuple(row[position] for position in positions[columns]), [])
+            group.append((index, statement, row))
+            pending += 1
+            if len(group) >= batch_size:
+                yield self._unlogged_batch(group)
+                pending -= len(group)
+                group.clear()
+            if pending >= window:
+                for group in buffered.values():
+                    if group:
+                        yield self._unlogged_batch(group)
+                buffered.clear()
+                pending = 0
+        for group in buffered.values():
+            if group:
+                yield self._unlogged_batch(group)
+
+    @staticmethod
+    def _unlogged_batch(group: List[Tuple[int, Any, tuple]]) -> Tuple[Any, tuple, List[int]]:
+        from cassandra.query import BatchStatement, BatchType
+        batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+        for _, statement, row in group:
+            batch.add(statement, row)
+        return batch, (), [index for index, _, _ in group]
+
+    def _execute_concurrently(self, requests: Iterable[Tuple[Any, tuple, List[int]]], concurrency: int) -> Dict[str, Any]:
+        from cassandra.concurrent import execute_concurrent
+        # execute_concurrent yields results in submission order, so row indices are matched FIFO
+        in_flight: deque = deque()
+
+        def statements():
+            for statement, params, indices in requests:
+                in_flight.append(indices)
+                yield statement, params
+
+        report: Dict[str, Any] = {'rows': 0, 'failed': []}
+        results = execute_concurrent(self.__session, statements(), concurrency=concurrency,
+                                     raise_on_first_error=False, results_generator=True)
+        for success, result in results:
+            indices = in_flight.popleft()
+            if success:
+                report['rows'] += len(indices)
+            else:
+                report['failed'].extend({'row': index, 'error': repr(result)} for index in indices)
+        return report
+
+    def _select_statement(self, table_name: str):
+        table = self._qualify(table_name)
+        return self._prepare(table, (), 'select', f"SELECT * FROM {table};")
 
     def fetch_records(self, table_name: str):
-        query = f"SELECT * FROM {table_name};"
-        rows = self.__session.execute(query)
-        return rows
+        cache, cache_key = self.result_cache, None
+        if cache is not None:
+            cache_key = cache.key('cassandra', self._qualify(table_name), 'SELECT *')
+            hit, rows = cache.get(cache_key)
+            if hit:
+                return list(rows)
+        with instrument('cassandra', 'fetch_records', table_name) as event:
+            with event.phase('execute'):
+                rows = self._execute(self._select_statement(table_name))
+            if cache is not None and cache_key is not None:
+                # Every page is fetched so the whole result can be cached
+                with event.phase('fetch'):
+                    rows = list(rows)
+                event.record(len(rows))
+                cache.put(cache_key, rows)
+                return list(rows)
+            # Only the first page has been fetched at this point; later pages load as the result is iterated
+            event.record(len(rows.current_rows or ()))
+            return rows
 
-    def update_record(self, table_name: str, condition_column: str, condition_value: Any, update_values: Dict):
-        schema = self.get_table_schema(table_name)
+    def fetch_pages(self, table_name: str, columns: Optional[List[str]] = None,
+                    where: Optional[Union[Dict[str, Any], Condition]] = None,
+                    fetch_size: int = 5000, paging_state: Optional[bytes] = None, dataframe: bool = False,
+                    token_range: Optional[Tuple[int, int]] = None,
+                    partition_key: Optional[Union[str, List[str]]] = None) -> Iterator[Tuple[Any, Optional[bytes]]]:
+        # where is {column: value} for equality on each column, or a Condition
+        # Yields (page, paging_state); pass a saved paging_state back in to resume after that page
+        # token_range=(start, end) limits the scan to token(partition_key) in (start, end]
+        table = self._qualify(table_name)
+        if isinstance(where, dict):
+            where = from_dict(where) if where else None
+        projection = ', '.join(columns) if columns else '*'
+        query = f"SELECT {projection} FROM {table}"
+        clauses: List[str] = []
+        params: Tuple[Any, ...] = ()
+        if where is not None:
+            text, params = where.compile('cql')
+            clauses.append(text)
+        key_columns = tuple(clauses)
+        if token_range is not None:
+            if not partition_key:
+                raise ValueError("token_range needs the table's partition_key.")
+            token = f"token({', '.join([partition_key] if isinstance(partition_key, str) else partition_key)})"
+            clauses += [f"{token} > ?", f"{token} <= ?"]
+            key_columns += (token,)
+            params += tuple(token_range)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        statement = self._prepare(table, key_columns, f"select:{projection}", query + ";")
+        bound = statement.bind(params)
+        bound.fetch_size = fetch_size
+        with instrument('cassandra', 'fetch_pages', table_name) as event:
+            while True:
+                with event.phase('fetch'):
+                    result = self._execute(bound, paging_state=paging_state)
+                paging_state = result.paging_state
+                rows = result.current_rows
+                event.record(len(rows))
+                if dataframe:
+                    import pandas as pd
+                    yield pd.DataFrame.from_records(rows, columns=result.column_names), paging_state
+                else:
+                    yield rows, paging_state
+                if not paging_state:
+                    return
+
+    def fetch_iter(self, table_name: str, columns: Optional[List[str]] = None,
+                   where: Optional[Union[Dict[str, Any], Condition]] = None,
+                   fetch_size: int = 5000, paging_state: Optional[bytes] = None, dataframe: bool = False,
+                   token_range: Optional[Tuple[int, int]] = None,
+                   partition_key: Optional[Union[str, List[str]]] = None) -> Iterator[Any]:
+        for page, _ in self.fetch_pages(table_name, columns, where, fetch_size, paging_state, dataframe,
+                                        token_range, partition_key):
+            if dataframe:
+                yield page
+            else:
+                yield from page
+
+    def _update_statement(self, table_name: str, condition: Condition, update_values: Optional[Dict]) -> Tuple[Any, tuple]:
+        if not update_values:
+            raise ValueError("update_values must name at least one column to update.")
+        schema, validators = self._table_validators(table_name)
 
         # Check condition value format
-        if condition_column not in schema:
-            raise ValueError(f"Condition column '{condition_column}' not found in table schema.")
+        for condition_column, condition_value in condition.terms():
+            if condition_column not in schema:
+                raise ValueError(f"Condition column '{condition_column}' not found in table schema.")
 
-        if not self._is_value_valid(schema[condition_column], condition_value):
-            raise ValueError(f"Condition value '{condition_value}' does not match schema type '{schema[condition_column]}'.")
+            if not validators[condition_column](condition_value):
+                raise ValueError(f"Condition value '{condition_value}' does not match schema type '{schema[condition_column]}'.")
 
         # Check update values format
         for key, value in update_values.items():
             if key not in schema:
                 raise ValueError(f"Update column '{key}' not found in table schema.")
 
-            if not self._is_value_valid(schema[key], value):
+            if not validators[key](value):
                 raise ValueError(f"Update value '{value}' for column '{key}' does not match schema type '{schema[key]}'.")
 
         # Construct update query
-        set_values = ', '.join([f"{key} = '{value}'" if isinstance(value, str) else f"{key} = {value}" for key, value in update_values.items()])
-        if isinstance(condition_value, str):
-            condition_value_str = f"'{condition_value}'"
-        else:
-            condition_value_str = str(condition_value)
+        table = self._qualify(table_name)
+        columns = tuple(update_values.keys())
+        set_values = ', '.join([f"{key} = ?" for key in columns])
+        where, condition_params = condition.compile('cql')
+        query = f"UPDATE {table} SET {set_values} WHERE {where};"
+        statement = self._prepare(table, columns + (where,), 'update', query)
+        return statement, tuple(update_values.values()) + condition_params
 
-        query = f"UPDATE {table_name} SET {set_values} WHERE {condition_column} = {condition_value_str};"
-        self.__session.execute(query)
+    def update_record(self, table_name: str, condition_column: Union[str, Condition], condition_value: Any = None,
+                      update_values: Optional[Dict] = None):
+        condition, update_values = _resolve_condition(condition_column, condition_value, update_values)
+        with instrument('cassandra', 'update_record', table_name) as event:
+            statement, params = self._update_statement(table_name, condition, update_values)
+            with event.phase('execute'):
+                self._execute(statement, params)
+            event.record(1, params)
+            self._invalidate(table_name)
 
-    def delete_record(self, table_name: str, condition_column: str, condition_value: Any):
-        query = f"DELETE FROM {table_name} WHERE {condition_column} = '{condition_value}';"
-        self.__session.execute(query)
+    def _delete_statement(self, table_name: str, condition: Condition) -> Tuple[Any, tuple]:
+        table = self._qualify(table_name)
+        where, params = condition.compile('cql')
+        query = f"DELETE FROM {table} WHERE {where};"
+        return self._prepare(table, (where,), 'delete', query), params
+
+    def delete_record(self, table_name: str, condition_column: Union[str, Condition], condition_value: Any = None):
+        condition, _ = _resolve_condition(condition_column, condition_value)
+        with instrument('cassandra', 'delete_record', table_name) as event:
+            statement, params = self._delete_statement(table_name, condition)
+            with event.phase('execute'):
+                self._execute(statement, params)
+            event.record(1)
+            self._invalidate(table_name)
 
     def _is_value_valid(self, expected_type: str, value: Any) -> bool:
-        # Implement your validation logic here based on expected_type and value
-        # Example: Check if value matches expected_type
-        return isinstance(value, str) if expected_type == 'text' else isinstance(value, int) if expected_type == 'int' else False
+        return _validator_for(expected_type)(value)
 
     def close(self):
         if self.__session:
             self.__session.shutdown()
-        self.stop_container()
+        # Only a container this instance provisioned is torn down
+        if self.provisioner is not None:
+            self.provisioner.stop()
 
     def stop_container(self):
-        try:
-            subprocess.run(["docker", "stop", "test-cassandra-v2"], check=True)
-            subprocess.run(["docker", "rm", "test-cassandra-v2"], check=True)
-            print("Cassandra container stopped and removed.")
-        except subprocess.CalledProcessError as e:
-            print(f"Error stopping Cassandra container: {e}")
+        # An explicit request, so the named container is stopped even if this instance did not start it
+        provisioner = self.provisioner or DockerProvisioner(volume=self.volume)
+        if isinstance(provisioner, DockerProvisioner):
+            provisioner.stop(force=True)
+        else:
+            provisioner.stop()
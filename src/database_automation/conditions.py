@@ -0,0 +1,155 @@
+from typing import Any, Iterable, Iterator, List, Tuple
+import re
+
+
+# Placeholder style per dialect; mysql.connector/aiomysql use %s, prepared CQL statements use ?
+PLACEHOLDERS = {'mysql': '%s', 'cql': '?'}
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$')
+
+
+def _column(name: str) -> str:
+    # Column names are written into the statement text, so anything that is not a plain identifier is refused
+    if not isinstance(name, str) or not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid column name: {name!r}")
+    return name
+
+
+class Condition:
+    # Compiles to statement text that depends only on the shape of the condition; values travel separately
+    def compile(self, dialect: str = 'mysql') -> Tuple[str, Tuple[Any, ...]]:
+        if dialect not in PLACEHOLDERS:
+            raise ValueError(f"Unsupported dialect: {dialect}")
+        params: List[Any] = []
+        text = self._compile(dialect, params)
+        return text, tuple(params)
+
+    def _compile(self, dialect: str, params: List[Any]) -> str:
+        raise NotImplementedError
+
+    def terms(self) -> Iterator[Tuple[str, Any]]:
+        # (column, value) for every bound value, e.g. to validate values against a table schema
+        raise NotImplementedError
+
+    def __and__(self, other: "Condition") -> "Condition":
+        return and_(self, other)
+
+    def __or__(self, other: "Condition") -> "Condition":
+        return or_(self, other)
+
+    def __repr__(self) -> str:
+        text, params = self.compile()
+        return f"<Condition {text!r} {params!r}>"
+
+
+class _Comparison(Condition):
+    def __init__(self, column: str, operator: str, value: Any):
+        self.column = _column(column)
+        self.operator = operator
+        self.value = value
+
+    def _compile(self, dialect: str, params: List[Any]) -> str:
+        if self.value is None and dialect == 'mysql' and self.operator in ('=', '!='):
+            # `= NULL` matches nothing in SQL
+            return f"{self.column} IS {'NOT ' if self.operator == '!=' else ''}NULL"
+        params.append(self.value)
+        return f"{self.column} {self.operator} {PLACEHOLDERS[dialect]}"
+
+    def terms(self) -> Iterator[Tuple[str, Any]]:
+        yield self.column, self.value
+
+
+class _In(Condition):
+    def __init__(self, column: str, values: Iterable[Any]):
+        self.column = _column(column)
+        self.values = list(values)
+
+    def _compile(self, dialect: str, params: List[Any]) -> str:
+        if dialect == 'cql':
+            # CQL binds the whole list to one marker, so the text is the same for any number of values
+            params.append(self.values)
+            return f"{self.column} IN ?"
+        if not self.values:
+            return "1 = 0"
+        params.extend(self.values)
+        return f"{self.column} IN ({', '.join([PLACEHOLDERS[dialect]] * len(self.values))})"
+
+    def terms(self) -> Iterator[Tuple[str, Any]]:
+        for value in self.values:
+            yield self.column, value
+
+
+class _Group(Condition):
+    joiner: str
+    conditions: List[Condition]
+
+    def __init__(self, joiner: str, conditions: Tuple[Condition, ...]):
+        if not conditions:
+            raise ValueError(f"{joiner.lower()}_() needs at least one condition.")
+        parts: List[Condition] = []
+        for condition in conditions:
+            if not isinstance(condition, Condition):
+                raise TypeError(f"Expected a Condition, got {type(condition).__name__}.")
+            # (a AND b) AND c is flattened, so CQL, which has no parentheses, still gets a flat conjunction
+            parts.extend(condition.conditions if isinstance(condition, _Group) and condition.joiner == joiner else [condition])
+        self.joiner = joiner
+        self.conditions = parts
+
+    def _compile(self, dialect: str, params: List[Any]) -> str:
+        if self.joiner == 'OR' and dialect == 'cql' and len(self.conditions) > 1:
+            raise ValueError("CQL has no OR; use in_() on a single column instead.")
+        texts = []
+        for condition in self.conditions:
+            text = condition._compile(dialect, params)
+            texts.append(f"({text})" if isinstance(condition, _Group) and len(condition.conditions) > 1 else text)
+        return f" {self.joiner} ".join(texts)
+
+    def terms(self) -> Iterator[Tuple[str, Any]]:
+        for condition in self.conditions:
+            yield from condition.terms()
+
+
+def eq(column: str, value: Any) -> Condition:
+    return _Comparison(column, '=', value)
+
+
+def ne(column: str, value: Any) -> Condition:
+    return _Comparison(column, '!=', value)
+
+
+def lt(column: str, value: Any) -> Condition:
+    return _Comparison(column, '<', value)
+
+
+def le(column: str, value: Any) -> Condition:
+    return _Comparison(column, '<=', value)
+
+
+def gt(column: str, value: Any) -> Condition:
+    return _Comparison(column, '>', value)
+
+
+def ge(column: str, value: Any) -> Condition:
+    return _Comparison(column, '>=', value)
+
+
+def in_(column: str, values: Iterable[Any]) -> Condition:
+    return _In(column, values)
+
+
+def between(column: str, low: Any, high: Any) -> Condition:
+    # Inclusive on both ends, like SQL BETWEEN
+    return and_(ge(column, low), le(column, high))
+
+
+def and_(*conditions: Condition) -> Condition:
+    return _Group('AND', conditions)
+
+
+def or_(*conditions: Condition) -> Condition:
+    return _Group('OR', conditions)
+
+
+def from_dict(values: dict) -> Condition:
+    # {'region': 'eu', 'id': 1} -> region = ? AND id = ?
+    return and_(*(eq(column, value) for column, value in values.items()))
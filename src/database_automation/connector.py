@@ -0,0 +1,411 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple, Union, runtime_checkable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+import atexit
+import queue
+import threading
+import time
+import warnings
+import weakref
+from database_automation.conditions import Condition
+
+
+@runtime_checkable
+class Connector(Protocol):
+    # `target` is a table or collection name; `conditions` is whatever the backend filters with
+    def insert(self, target: str, record: Dict[str, Any]) -> None: ...
+
+    def bulk_insert(self, target: str, rows: Iterable[Dict[str, Any]]) -> Any: ...
+
+    def iter_select(self, target: str, conditions: Any = None, batch_size: int = 1000) -> Iterator[Any]: ...
+
+    def update(self, target: str, values: Dict[str, Any], conditions: Any) -> None: ...
+
+    def delete(self, target: str, conditions: Any) -> None: ...
+
+    def close(self) -> None: ...
+
+
+@runtime_checkable
+class UpsertConnector(Connector, Protocol):
+    # Needed wherever rows are written by key (IncrementalSync and ConnectorSink with key=...)
+    def upsert(self, target: str, rows: Iterable[Dict[str, Any]], key: Union[str, Sequence[str]]) -> Any: ...
+
+
+def _require_upsert(connector: Connector) -> UpsertConnector:
+    if not isinstance(connector, UpsertConnector):
+        raise TypeError(f"{type(connector).__name__} has no upsert(target, rows, key), which writing by key needs.")
+    return connector
+
+
+def _single_condition(conditions: Union[Dict[str, Any], Condition]) -> Tuple[Any, ...]:
+    # Returns the leading arguments for update_record/delete_record
+    if isinstance(conditions, Condition):
+        return (conditions,)
+    if not isinstance(conditions, dict) or len(conditions) != 1:
+        raise ValueError("Cassandra conditions must be a Condition or a dict with exactly one column.")
+    return next(iter(conditions.items()))
+
+
+def _report_errors(report: Any) -> Any:
+    # Mongo reports per-batch 'errors' and Cassandra per-row 'failed' instead of raising
+    if isinstance(report, dict):
+        return report.get('errors') or report.get('failed')
+    return None
+
+
+def _failed_rows(report: Any, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # The records a report says were not written; a failure it cannot place is taken to cover every record
+    errors = _report_errors(report)
+    if not errors:
+        return []
+    positions = set()
+    for error in errors:
+        if isinstance(error, dict) and 'row' in error:
+            # Cassandra: one entry per failed row
+            positions.add(error['row'])
+        elif isinstance(error, dict) and 'offset' in error:
+            # Mongo: one entry per batch, with the server's writeErrors indexed within that batch
+            details = error.get('error')
+            if isinstance(details, list) and all(isinstance(detail, dict) and 'index' in detail for detail in details):
+                positions.update(error['offset'] + detail['index'] for detail in details)
+            else:
+                positions.update(range(error['offset'], error['offset'] + error['size']))
+        else:
+            return list(rows)
+    return [rows[position] for position in sorted(positions) if position < len(rows)]
+
+
+def _rows_written(report: Any, attempted: int) -> int:
+    # Mongo reports 'inserted' and Cassandra/MySQL 'rows'; a report without either is taken to cover every row
+    if isinstance(report, dict):
+        for field in ('inserted', 'rows'):
+            if isinstance(report.get(field), int):
+                return report[field]
+    return attempted
+
+
+def _key_columns(key: Union[str, Sequence[str]]) -> List[str]:
+    return [key] if isinstance(key, str) else list(key)
+
+
+class MySQLConnector:
+    # conditions: SQL WHERE clause string or a Condition
+    def __init__(self, connection: Any, batch_size: int = 1000):
+        self.connection = connection
+        self.batch_size = batch_size
+
+    def insert(self, target: str, record: Dict[str, Any]) -> None:
+        self.connection.insert_record(target, record)
+
+    def bulk_insert(self, target: str, rows: Iterable[Dict[str, Any]]) -> Any:
+        return self.connection.bulk_insert(target, rows, batch_size=self.batch_size)
+
+    def upsert(self, target: str, rows: Iterable[Dict[str, Any]], key: Union[str, Sequence[str]]) -> Any:
+        # MySQL resolves collisions on the table's own primary/unique keys, so `key` only has to match one of them
+        return self.connection.bulk_insert(target, rows, batch_size=self.batch_size, upsert=True)
+
+    def write_frame(self, frame: Any, target: str) -> Any:
+        # bulk_insert converts DataFrame slices column-wise, without a dict per row
+        return self.connection.bulk_insert(target, frame, batch_size=self.batch_size)
+
+    def iter_select(self, target: str, conditions: Any = None, batch_size: int = 1000) -> Iterator[Any]:
+        return self.connection.select_iter(target, conditions, batch_size=batch_size)
+
+    def update(self, target: str, values: Dict[str, Any], conditions: Any) -> None:
+        self.connection.update_record(target, values, conditions)
+
+    def delete(self, target: str, conditions: Any) -> None:
+        self.connection.delete_record(target, conditions)
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class MongoConnector:
+    # conditions: MongoDB filter document
+    def __init__(self, operation: Any, batch_size: int = 1000):
+        self.operation = operation
+        self.batch_size = batch_size
+
+    def insert(self, target: str, record: Dict[str, Any]) -> None:
+        self.operation.insert_record(record, target)
+
+    def bulk_insert(self, target: str, rows: Iterable[Dict[str, Any]]) -> Any:
+        return self.operation.insert_rows(rows, target, batch_size=self.batch_size)
+
+    def upsert(self, target: str, rows: Iterable[Dict[str, Any]], key: Union[str, Sequence[str]]) -> Any:
+        columns = _key_columns(key)
+        writer = self.operation.bulk_writer(target, batch_size=self.batch_size, flush_interval=None)
+        with writer:
+            for row in rows:
+                writer.upsert({column: row[column] for column in columns}, dict(row))
+        return writer.stats
+
+    def write_frame(self, frame: Any, target: str) -> Any:
+        return self.operation.insert_rows(frame, target, batch_size=self.batch_size)
+
+    def iter_select(self, target: str, conditions: Any = None, batch_size: int = 1000) -> Iterator[Any]:
+        return self.operation.find_iter(conditions, target, batch_size=batch_size)
+
+    def update(self, target: str, values: Dict[str, Any], conditions: Any) -> None:
+        self.operation.update_many(conditions, values, target)
+
+    def delete(self, target: str, conditions: Any) -> None:
+        self.operation.delete_many(conditions, target)
+
+    def close(self) -> None:
+        self.operation.close()
+
+
+class CassandraConnector:
+    # conditions: a Condition or {column: value} on the partition key; iter_select also accepts None for a full scan
+    def __init__(self, operation: Any, concurrency: int = 50):
+        self.operation = operation
+        self.concurrency = concurrency
+
+    def insert(self, target: str, record: Dict[str, Any]) -> None:
+        self.operation.insert_record(target, record)
+
+    def bulk_insert(self, target: str, rows: Iterable[Dict[str, Any]]) -> Any:
+        return self.operation.insert_rows(target, rows, concurrency=self.concurrency)
+
+    def upsert(self, target: str, rows: Iterable[Dict[str, Any]], key: Union[str, Sequence[str]]) -> Any:
+        # A CQL INSERT already overwrites the row with the same primary key
+        return self.bulk_insert(target, rows)
+
+    def write_frame(self, frame: Any, target: str) -> Any:
+        # Every row shares the frame's columns, so one prepared statement covers the whole frame
+        return self.operation.insert_rows(target, frame, concurrency=self.concurrency)
+
+    def iter_select(self, target: str, conditions: Any = None, batch_size: int = 1000) -> Iterator[Any]:
+        return self.operation.fetch_iter(target, where=conditions, fetch_size=batch_size)
+
+    def update(self, target: str, values: Dict[str, Any], conditions: Any) -> None:
+        self.operation.update_record(target, *_single_condition(conditions), values)
+
+    def delete(self, target: str, conditions: Any) -> None:
+        self.operation.delete_record(target, *_single_condition(conditions))
+
+    def close(self) -> None:
+        self.operation.close()
+
+
+_DONE = object()
+
+
+class FanOutWriter:
+    def __init__(self, targets: List[Tuple[str, Connector, str]], batch_size: int = 1000, max_pending_batches: int = 4):
+        # targets: (name, connector, table/collection); each backend gets its own bounded queue
+        self.targets = targets
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        # The input is read once; a slow backend blocks the reader once its queue is full
+        queues: Dict[str, queue.Queue] = {name: queue.Queue(self.max_pending_batches) for name, _, _ in self.targets}
+        reports: Dict[str, Dict[str, Any]] = {name: {'rows': 0, 'batches': 0, 'errors': []} for name, _, _ in self.targets}
+
+        def drain(name: str, connector: Connector, target: str) -> None:
+            pending = queues[name]
+            while True:
+                batch = pending.get()
+                if batch is _DONE:
+                    return
+                try:
+                    report = connector.bulk_insert(target, batch)
+                except Exception as err:
+                    reports[name]['errors'].append({'batch': reports[name]['batches'], 'error': repr(err)})
+                else:
+                    # Mongo and Cassandra return per-row failures instead of raising
+                    reports[name]['rows'] += _rows_written(report, len(batch))
+                    errors = _report_errors(report)
+                    if errors:
+                        reports[name]['errors'].append({'batch': reports[name]['batches'], 'error': errors})
+                reports[name]['batches'] += 1
+
+        iterator = iter(rows)
+        with ThreadPoolExecutor(max_workers=len(self.targets)) as executor:
+            workers = [executor.submit(drain, name, connector, target) for name, connector, target in self.targets]
+            try:
+                for batch in iter(lambda: list(islice(iterator, self.batch_size)), []):
+                    for pending in queues.values():
+                        pending.put(batch)
+            finally:
+                for pending in queues.values():
+                    pending.put(_DONE)
+            for worker in workers:
+                worker.result()
+        return reports
+
+
+_FLUSH = object()
+_CLOSE = object()
+
+
+def _flush_loop(writer_ref: Callable[[], Any], pending: queue.Queue) -> None:
+    while True:
+        item = pending.get()
+        writer = writer_ref()
+        if writer is None:
+            pending.task_done()
+            return
+        if writer._batch(item):
+            return
+        del writer
+
+
+def _close_at_exit(writer_ref: Callable[[], Any]) -> None:
+    writer = writer_ref()
+    if writer is not None:
+        writer.close()
+
+
+def _writer_collected(pending: queue.Queue, exit_hook: Callable[[], None]) -> None:
+    # Wakes the idle flusher thread so it exits, and drops the exit hook of the collected writer
+    atexit.unregister(exit_hook)
+    pending.put(_CLOSE)
+
+
+class BufferedWriter:
+    # Write-behind buffer: insert() only enqueues, and a background thread writes records through bulk_insert
+    # in batches of up to batch_size, or whatever has arrived max_latency seconds after the first record.
+    # The backend is used from the flusher thread, so give the writer its own connection or a pooled MySQLConnection.
+    def __init__(self, backend: Any, max_queue: int = 10000, batch_size: int = 500, max_latency: float = 0.05,
+                 on_error: Optional[Callable[[str, List[Dict[str, Any]], Any], None]] = None,
+                 put_timeout: Optional[float] = None):
+        if batch_size < 1 or max_queue < 1:
+            raise ValueError("batch_size and max_queue must be at least 1.")
+        self.connector = as_connector(backend)
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        # on_error(target, records, error) gets the records of a batch that were not written: all of them when
+        # bulk_insert raised, only the failed ones when it reported partial success
+        self.on_error = on_error
+        # A full queue blocks insert() (back-pressure); with put_timeout it raises queue.Full after that long
+        self.put_timeout = put_timeout
+        self.stats: Dict[str, int] = {'enqueued': 0, 'written': 0, 'failed': 0, 'batches': 0}
+        self.last_error: Any = None
+        self.__queue: queue.Queue = queue.Queue(max_queue)
+        self.__closed = False
+        self.__lock = threading.Lock()
+        # The thread and the exit hook only hold weak references, so a writer that is dropped without close() is
+        # still collected; the thread only holds it strongly while writing, so by then every record is written
+        self.__thread = threading.Thread(target=_flush_loop, args=(weakref.ref(self), self.__queue),
+                                         name='dblinkpro-buffered-writer', daemon=True)
+        self.__thread.start()
+        # Records still buffered at interpreter exit are written before the process ends
+        self.__exit_hook = partial(_close_at_exit, weakref.ref(self))
+        atexit.register(self.__exit_hook)
+        self.__finalizer = weakref.finalize(self, _writer_collected, self.__queue, self.__exit_hook)
+        self.__finalizer.atexit = False
+
+    @property
+    def pending(self) -> int:
+        return self.__queue.qsize()
+
+    def insert(self, target: str, record: Dict[str, Any]) -> None:
+        if self.__closed:
+            raise RuntimeError("BufferedWriter is closed.")
+        self.__queue.put((target, record), timeout=self.put_timeout)
+        with self.__lock:
+            self.stats['enqueued'] += 1
+
+    def flush(self) -> None:
+        # Returns once every record enqueued before the call has been written or handed to on_error
+        if self.__closed:
+            return
+        self.__queue.put(_FLUSH)
+        self.__queue.join()
+
+    def close(self) -> None:
+        if self.__closed:
+            return
+        self.__closed = True
+        atexit.unregister(self.__exit_hook)
+        self.__finalizer.detach()
+        self.__queue.put(_CLOSE)
+        self.__thread.join()
+        # An insert() racing with close() can land behind the close marker; it is written here
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self.__queue.get_nowait())
+            except queue.Empty:
+                break
+        self._write([item for item in leftovers if item is not _FLUSH and item is not _CLOSE])
+
+    def __enter__(self) -> "BufferedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _batch(self, item: Any) -> bool:
+        # Writes the batch that starts with item; returns True once the close marker has been taken
+        pending = self.__queue
+        taken = 1
+        stop = item is _CLOSE
+        records = []
+        if item is not _CLOSE and item is not _FLUSH:
+            records.append(item)
+            deadline = time.monotonic() + self.max_latency
+            while len(records) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is _FLUSH:
+                    break
+                if item is _CLOSE:
+                    stop = True
+                    break
+                records.append(item)
+        self._write(records)
+        for _ in range(taken):
+            pending.task_done()
+        return stop
+
+    def _write(self, records: List[Tuple[str, Dict[str, Any]]]) -> None:
+        # Grouped by target and column set, since one bulk statement needs rows of the same shape
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for target, record in records:
+            groups.setdefault((target, tuple(record)), []).append(record)
+        for (target, _), rows in groups.items():
+            try:
+                report = self.connector.bulk_insert(target, rows)
+            except Exception as err:
+                errors, failed = err, rows
+            else:
+                # Mongo and Cassandra write what they can and report the rest, so only those records count as failed
+                errors = _report_errors(report)
+                failed = _failed_rows(report, rows)
+            with self.__lock:
+                self.stats['batches'] += 1
+                self.stats['failed'] += len(failed)
+                self.stats['written'] += len(rows) - len(failed)
+                if errors:
+                    self.last_error = errors
+            if failed and self.on_error is not None:
+                try:
+                    self.on_error(target, failed, errors)
+                except Exception as err:
+                    warnings.warn(f"BufferedWriter on_error callback {self.on_error!r} failed: {err}", RuntimeWarning)
+
+
+def as_connector(backend: Any, **options: Any) -> Connector:
+    if isinstance(backend, Connector):
+        return backend
+    # Matched by class name so wrapping one backend never imports the other drivers
+    adapters: Dict[str, Callable[..., Connector]] = {
+        'MySQLConnection': MySQLConnector, 'MongoOperation': MongoConnector, 'CassandraOperation': CassandraConnector
+    }
+    for cls in type(backend).__mro__:
+        if cls.__name__ in adapters:
+            return adapters[cls.__name__](backend, **options)
+    raise TypeError(f"No Connector adapter for {type(backend).__name__}.")
@@ -0,0 +1,131 @@
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+from itertools import islice
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+CSV_EXTENSIONS = ('.csv',)
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+def _apply_dtype(frame: "pd.DataFrame", dtype: Optional[Dict[str, Any]]) -> "pd.DataFrame":
+    if not dtype:
+        return frame
+    return frame.astype({column: kind for column, kind in dtype.items() if column in frame.columns})
+
+
+def _iter_csv(path: str, batch_size: int, dtype: Optional[Dict[str, Any]], encoding: str) -> Iterator["pd.DataFrame"]:
+    import pandas as pd
+    with pd.read_csv(path, encoding=encoding, chunksize=batch_size, dtype=dtype) as reader:
+        yield from reader
+
+
+def _iter_jsonl(path: str, batch_size: int, dtype: Optional[Dict[str, Any]], encoding: str) -> Iterator["pd.DataFrame"]:
+    import pandas as pd
+    with pd.read_json(path, lines=True, chunksize=batch_size, encoding=encoding, dtype=dtype or True) as reader:
+        yield from reader
+
+
+def _iter_parquet(path: str, batch_size: int, dtype: Optional[Dict[str, Any]]) -> Iterator["pd.DataFrame"]:
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path)
+    # iter_batches decodes one row group at a time
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield _apply_dtype(record_batch.to_pandas(), dtype)
+
+
+def _iter_excel(path: str, batch_size: int, dtype: Optional[Dict[str, Any]], sheet_name: Union[int, str]) -> Iterator["pd.DataFrame"]:
+    import pandas as pd
+    from openpyxl import load_workbook
+    # read_only mode streams rows from the sheet XML instead of loading the workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(column) for column in header]
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                return
+            yield _apply_dtype(pd.DataFrame.from_records(chunk, columns=columns), dtype)
+    finally:
+        workbook.close()
+
+
+def iter_batches(path: str, batch_size: int = 10000, dtype: Optional[Dict[str, Any]] = None,
+                 encoding: str = 'utf-8', sheet_name: Union[int, str] = 0) -> Iterator["pd.DataFrame"]:
+    # Yields DataFrames of at most batch_size rows, so memory use does not grow with the file size
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    lowered = path.lower()
+    if lowered.endswith(CSV_EXTENSIONS):
+        return _iter_csv(path, batch_size, dtype, encoding)
+    if lowered.endswith(PARQUET_EXTENSIONS):
+        return _iter_parquet(path, batch_size, dtype)
+    if lowered.endswith(JSONL_EXTENSIONS):
+        return _iter_jsonl(path, batch_size, dtype, encoding)
+    if lowered.endswith(EXCEL_EXTENSIONS):
+        return _iter_excel(path, batch_size, dtype, sheet_name)
+    raise ValueError(f"Unsupported file type for '{path}'. Expected CSV, Parquet, JSONL or Excel.")
+
+
+async def iter_in_executor(iterator: Iterator[Any]) -> AsyncIterator[Any]:
+    # Each next() runs on the loop's default executor, so file parsing and frame conversion never block the event loop
+    import asyncio
+    loop = asyncio.get_running_loop()
+    iterator = iter(iterator)
+    done = object()
+    try:
+        while True:
+            item = await loop.run_in_executor(None, next, iterator, done)
+            if item is done:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            # Closes the underlying file when the caller stops early
+            await loop.run_in_executor(None, close)
+
+
+def column_values(series: "pd.Series") -> List[Any]:
+    # One numpy pass per column: native Python scalars out, NaN/NaT/NA as None
+    import numpy as np
+    import pandas as pd
+    kind = series.dtype.kind
+    if kind in 'iub' and isinstance(series.dtype, np.dtype):
+        return series.to_numpy().tolist()
+    if kind == 'f' and isinstance(series.dtype, np.dtype):
+        array = series.to_numpy()
+        values = array.tolist()
+        for position in np.flatnonzero(np.isnan(array)).tolist():
+            values[position] = None
+        return values
+    if kind in 'Mm' and isinstance(series.dtype, np.dtype):
+        # Microsecond precision converts straight to datetime/timedelta objects, with NaT as None
+        unit = 'datetime64[us]' if kind == 'M' else 'timedelta64[us]'
+        return series.to_numpy().astype(unit).astype(object).tolist()
+    if kind == 'M':
+        # tz-aware timestamps keep their zone
+        values = [value.to_pydatetime() if value is not None and value is not pd.NaT else None
+                  for value in series.to_numpy(dtype=object).tolist()]
+    else:
+        # object and extension dtypes (Int64, string, boolean, category)
+        values = series.to_numpy(dtype=object).tolist()
+    missing = series.isna().to_numpy()
+    if missing.any():
+        for position in np.flatnonzero(missing).tolist():
+            values[position] = None
+    return values
+
+
+def frame_to_rows(frame: "pd.DataFrame") -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    # Conversion work scales with the number of columns; rows are assembled by zip instead of per-cell Python code
+    columns = [column_values(frame.iloc[:, position]) for position in range(frame.shape[1])]
+    return [str(column) for column in frame.columns], list(zip(*columns)) if columns else [() for _ in range(len(frame))]
@@ -0,0 +1,264 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import threading
+import time
+import warnings
+
+
+# Process-wide hook list; every CRUD class emits one OperationEvent per call to each hook
+_hooks: List[Callable[["OperationEvent"], None]] = []
+_hooks_lock = threading.Lock()
+
+PHASES = ('connect', 'execute', 'fetch')
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def add_hook(hook: Callable[["OperationEvent"], None]) -> Callable[["OperationEvent"], None]:
+    with _hooks_lock:
+        _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook: Callable[["OperationEvent"], None]) -> None:
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def clear_hooks() -> None:
+    with _hooks_lock:
+        _hooks.clear()
+
+
+def payload_size(value: Any) -> int:
+    # Approximate wire size; exact encoding differs per driver
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 8
+    if isinstance(value, dict):
+        return sum(payload_size(key) + payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(payload_size(item) for item in value)
+    return len(str(value))
+
+
+class _Phase:
+    __slots__ = ('event', 'name', 'start')
+
+    def __init__(self, event: "OperationEvent", name: str):
+        self.event = event
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        timings = self.event.timings
+        timings[self.name] = timings.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+@dataclass
+class OperationEvent:
+    backend: str
+    operation: str
+    target: Optional[str] = None
+    rows: int = 0
+    bytes: int = 0
+    duration: float = 0.0
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[BaseException] = None
+    enabled: bool = True
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def record(self, rows: int = 0, payload: Any = None) -> None:
+        self.rows += rows
+        if self.enabled and payload is not None:
+            self.bytes += payload_size(payload)
+
+    def measure(self, rows: Iterable[Any]) -> Iterable[Any]:
+        # Counts bytes of each row as it streams past; a no-op when no hook is registered
+        if not self.enabled:
+            return rows
+        return self._measured(rows)
+
+    def _measured(self, rows: Iterable[Any]) -> Iterator[Any]:
+        for row in rows:
+            self.bytes += payload_size(row)
+            yield row
+
+
+def _emit(event: OperationEvent) -> None:
+    with _hooks_lock:
+        hooks = list(_hooks)
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception as err:
+            warnings.warn(f"Instrumentation hook {hook!r} failed: {err}", RuntimeWarning)
+
+
+@contextmanager
+def instrument(backend: str, operation: str, target: Optional[str] = None) -> Iterator[OperationEvent]:
+    event = OperationEvent(backend, operation, target, enabled=bool(_hooks))
+    start = time.perf_counter()
+    try:
+        yield event
+    except GeneratorExit:
+        # A streaming generator closed early is not a failed operation
+        raise
+    except BaseException as err:
+        event.error = err
+        raise
+    finally:
+        event.duration = time.perf_counter() - start
+        if event.enabled:
+            _emit(event)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def copy(self) -> "Histogram":
+        histogram = Histogram(self.buckets)
+        histogram.counts = list(self.counts)
+        histogram.count = self.count
+        histogram.sum = self.sum
+        return histogram
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        running = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+    def quantile(self, fraction: float) -> float:
+        # Upper bound of the bucket holding the requested rank, as Prometheus' histogram_quantile does at bucket edges
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        for bound, running in self.cumulative():
+            if running >= rank:
+                return bound if bound != float('inf') else self.buckets[-1]
+        return self.buckets[-1]
+
+
+class HistogramCollector:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.__series: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.__lock = threading.Lock()
+
+    def __call__(self, event: OperationEvent) -> None:
+        key = (event.backend, event.operation, event.target or '')
+        with self.__lock:
+            series = self.__series.get(key)
+            if series is None:
+                series = self.__series[key] = {'duration': Histogram(self.buckets), 'phases': {},
+                                               'rows': 0, 'bytes': 0, 'errors': 0}
+            series['duration'].observe(event.duration)
+            for name, seconds in event.timings.items():
+                phase = series['phases'].get(name)
+                if phase is None:
+                    phase = series['phases'][name] = Histogram(self.buckets)
+                phase.observe(seconds)
+            series['rows'] += event.rows
+            series['bytes'] += event.bytes
+            series['errors'] += event.error is not None
+
+    def series(self) -> List[Tuple[Tuple[str, str, str], Dict[str, Any]]]:
+        # Copied under the lock, so a concurrent observe cannot leave a bucket count, sum and count out of step
+        with self.__lock:
+            return [
+                (key, {'duration': series['duration'].copy(),
+                       'phases': {name: phase.copy() for name, phase in series['phases'].items()},
+                       'rows': series['rows'], 'bytes': series['bytes'], 'errors': series['errors']})
+                for key, series in self.__series.items()
+            ]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        def summary(histogram: Histogram) -> Dict[str, float]:
+            return {'count': histogram.count, 'sum': histogram.sum, 'p50': histogram.quantile(0.5),
+                    'p95': histogram.quantile(0.95), 'p99': histogram.quantile(0.99)}
+
+        return [
+            {'backend': backend, 'operation': operation, 'target': target, 'rows': series['rows'],
+             'bytes': series['bytes'], 'errors': series['errors'], 'duration': summary(series['duration']),
+             'phases': {name: summary(phase) for name, phase in series['phases'].items()}}
+            for (backend, operation, target), series in self.series()
+        ]
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__series.clear()
+
+    def to_prometheus(self, prefix: str = 'dblinkpro') -> str:
+        return prometheus_text(self, prefix)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels: str) -> str:
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def prometheus_text(collector: HistogramCollector, prefix: str = 'dblinkpro') -> str:
+    # Prometheus text exposition format 0.0.4
+    series = collector.series()
+    lines = [
+        f'# HELP {prefix}_operation_duration_seconds Wall time of each operation.',
+        f'# TYPE {prefix}_operation_duration_seconds histogram',
+    ]
+    for (backend, operation, target), data in series:
+        labels = dict(backend=backend, operation=operation, target=target)
+        histogram = data['duration']
+        for bound, running in histogram.cumulative():
+            lines.append(f'{prefix}_operation_duration_seconds_bucket{_labels(**labels, le=_format_bound(bound))} {running}')
+        lines.append(f'{prefix}_operation_duration_seconds_sum{_labels(**labels)} {histogram.sum}')
+        lines.append(f'{prefix}_operation_duration_seconds_count{_labels(**labels)} {histogram.count}')
+
+    lines.append(f'# HELP {prefix}_operation_phase_seconds Time spent connecting, executing and fetching.')
+    lines.append(f'# TYPE {prefix}_operation_phase_seconds histogram')
+    for (backend, operation, target), data in series:
+        for name, histogram in data['phases'].items():
+            labels = dict(backend=backend, operation=operation, target=target, phase=name)
+            for bound, running in histogram.cumulative():
+                lines.append(f'{prefix}_operation_phase_seconds_bucket{_labels(**labels, le=_format_bound(bound))} {running}')
+            lines.append(f'{prefix}_operation_phase_seconds_sum{_labels(**labels)} {histogram.sum}')
+            lines.append(f'{prefix}_operation_phase_seconds_count{_labels(**labels)} {histogram.count}')
+
+    for metric, key, description in (('rows', 'rows', 'Rows written or read.'),
+                                     ('bytes', 'bytes', 'Approximate payload bytes written or read.'),
+                                     ('errors', 'errors', 'Operations that raised an error.')):
+        lines.append(f'# HELP {prefix}_operation_{metric}_total {description}')
+        lines.append(f'# TYPE {prefix}_operation_{metric}_total counter')
+        for (backend, operation, target), data in series:
+            lines.append(f'{prefix}_operation_{metric}_total{_labels(backend=backend, operation=operation, target=target)} {data[key]}')
+    return '\n'.join(lines) + '\n'
@@ -1,60 +1,392 @@
-from typing import Any
-import pandas as pd
-from pymongo.mongo_client import MongoClient
-import json
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from itertools import islice
+from database_automation.ingestion import frame_to_rows, iter_batches
+from database_automation.instrumentation import instrument
+from database_automation.resilience import CircuitBreaker, RetryPolicy, is_transient_mongo_error
+import threading
+import time
+import warnings
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Process-wide MongoClient registry; every MongoOperation with the same URL and options shares one client
+_clients: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], list] = {}
+_clients_lock = threading.Lock()
+
+
+def _hashable(value: Any) -> Any:
+    # List and dict options such as compressors=['zstd'] become tuples, so they can be part of the registry key
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_hashable(item) for item in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else tuple(items)
+    return value
+
+
+def _acquire_client(client_url: str, options: Dict[str, Any]) -> Tuple[Any, Tuple]:
+    key = (client_url, _hashable(options))
+    with _clients_lock:
+        entry = _clients.get(key)
+        if entry is None:
+            from pymongo.mongo_client import MongoClient
+            entry = _clients[key] = [MongoClient(client_url, **options), 0]
+        entry[1] += 1
+        return entry[0], key
+
+
+def _release_client(key: Tuple) -> None:
+    with _clients_lock:
+        entry = _clients.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del _clients[key]
+    entry[0].close()
+
+
+def _frame_to_documents(frame: "pd.DataFrame") -> List[Dict[str, Any]]:
+    columns, rows = frame_to_rows(frame)
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def _frame_batches(frame: "pd.DataFrame", batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    for offset in range(0, len(frame), batch_size):
+        yield _frame_to_documents(frame.iloc[offset:offset + batch_size])
+
+
+def _insert_batch(collection: Any, documents: List[Dict[str, Any]]) -> Tuple[int, Any]:
+    if not documents:
+        return 0, None
+    from pymongo.errors import BulkWriteError, PyMongoError
+    try:
+        return len(collection.insert_many(documents, ordered=False).inserted_ids), None
+    except BulkWriteError as err:
+        return err.details.get('nInserted', 0), err.details.get('writeErrors', [])
+    except PyMongoError as err:
+        return 0, str(err)
+
+
+def _documents_to_frame(documents: List[Dict[str, Any]]) -> "pd.DataFrame":
+    import pandas as pd
+    columns: Dict[str, None] = {}
+    for document in documents:
+        columns.update(dict.fromkeys(document))
+    return pd.DataFrame({column: [document.get(column) for document in documents] for column in columns})
+
+
+def _iter_cursor(open_cursor: Callable[[], Any], batch_size: int, dataframe: bool, operation: str, target: str,
+                 attempts: Iterable[Any]) -> Iterator[Any]:
+    with instrument('mongo', operation, target) as event:
+        # Only the first batch is retried; once documents have been handed out a failure has to propagate
+        for attempt in attempts:
+            with attempt:
+                cursor = open_cursor()
+                try:
+                    with event.phase('fetch'):
+                        documents = list(islice(cursor, batch_size))
+                except BaseException:
+                    # The retry opens a new cursor, so this one would otherwise stay open on the server
+                    cursor.close()
+                    raise
+        try:
+            while documents:
+                event.record(len(documents))
+                if dataframe:
+                    yield _documents_to_frame(documents)
+                else:
+                    yield from documents
+                with event.phase('fetch'):
+                    documents = list(islice(cursor, batch_size))
+        finally:
+            # Also runs when the caller stops early, so the server-side cursor is not left open until GC
+            cursor.close()
+
+
+def _tally(stats: Dict[str, Any], result: Mapping[str, Any]) -> None:
+    stats['matched'] += result.get('nMatched', 0)
+    stats['modified'] += result.get('nModified', 0)
+    stats['upserted'] += result.get('nUpserted', 0)
+    stats['deleted'] += result.get('nRemoved', 0)
+    stats['inserted'] += result.get('nInserted', 0)
+
+
+class MongoBulkWriter:
+    def __init__(self, collection: Any, batch_size: int = 1000, flush_interval: Optional[float] = 5.0):
+        self.collection = collection
+        self.batch_size = batch_size
+        # Buffered operations are sent at most flush_interval seconds after the oldest one was added, by a timer
+        # thread if no further operation arrives; None flushes on size and on exit only
+        self.flush_interval = flush_interval
+        self.stats: Dict[str, Any] = {'matched': 0, 'modified': 0, 'upserted': 0, 'deleted': 0, 'inserted': 0, 'errors': []}
+        self.__operations: List[Any] = []
+        self.__oldest = 0.0
+        self.__timer: Optional[threading.Timer] = None
+        self.__lock = threading.RLock()
+
+    def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False) -> None:
+        from pymongo import UpdateOne
+        self._add(UpdateOne(filter, update, upsert=upsert))
+
+    def replace_one(self, filter: Dict[str, Any], document: Dict[str, Any], upsert: bool = False) -> None:
+        from pymongo import ReplaceOne
+        self._add(ReplaceOne(filter, document, upsert=upsert))
+
+    def upsert(self, filter: Dict[str, Any], document: Dict[str, Any]) -> None:
+        from pymongo import UpdateOne
+        self._add(UpdateOne(filter, {'$set': document}, upsert=True))
+
+    def delete_one(self, filter: Dict[str, Any]) -> None:
+        from pymongo import DeleteOne
+        self._add(DeleteOne(filter))
+
+    def _add(self, operation: Any) -> None:
+        with self.__lock:
+            if not self.__operations:
+                self.__oldest = time.monotonic()
+            self.__operations.append(operation)
+            due = self.flush_interval is not None and time.monotonic() - self.__oldest >= self.flush_interval
+            if len(self.__operations) >= self.batch_size or due:
+                self.flush()
+            elif self.flush_interval is not None and self.__timer is None:
+                self.__timer = threading.Timer(self.flush_interval - (time.monotonic() - self.__oldest), self._flush_due)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def _flush_due(self) -> None:
+        # Runs on the timer thread, where an exception would otherwise go unnoticed
+        try:
+            self.flush()
+        except Exception as err:
+            warnings.warn(f"MongoBulkWriter interval flush failed: {err}", RuntimeWarning)
+
+    def flush(self) -> Dict[str, Any]:
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            operations, self.__operations = self.__operations, []
+            if not operations:
+                return self.stats
+            from pymongo.errors import BulkWriteError
+            with instrument('mongo', 'bulk_write', getattr(self.collection, 'name', None)) as event:
+                try:
+                    with event.phase('execute'):
+                        result = self.collection.bulk_write(operations, ordered=False).bulk_api_result
+                    _tally(self.stats, result)
+                except BulkWriteError as err:
+                    _tally(self.stats, err.details)
+                    self.stats['errors'].extend(err.details.get('writeErrors', []))
+                except Exception as err:
+                    # Nothing was acknowledged, so the operations go back to the front of the buffer for the next flush
+                    self.__operations[:0] = operations
+                    self.stats['errors'].append(str(err))
+                    raise
+                event.record(len(operations))
+            return self.stats
+
+    def __len__(self) -> int:
+        return len(self.__operations)
+
+    def __enter__(self) -> "MongoBulkWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
 
 
 class MongoOperation:
-    __collection = None  # private/protected variable
-    __database = None
-    
-    def __init__(self, client_url: str, database_name: str, collection_name: str = None):
+    def __init__(self, client_url: str, database_name: str, collection_name: Optional[str] = None,
+                 max_pool_size: int = 100, min_pool_size: int = 0, retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None, **client_options: Any):
         self.client_url = client_url
         self.database_name = database_name
         self.collection_name = collection_name
-       
+        self.client_options = {'maxPoolSize': max_pool_size, 'minPoolSize': min_pool_size, **client_options}
+        self.__client = None
+        self.__client_key = None
+        self.__collections: Dict[str, Any] = {}
+        self.database = None
+        # Applied to connect() and to reads; pymongo's own retryWrites still covers single writes
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+
+    def _attempts(self) -> Iterator[Any]:
+        return self.retry_policy.attempts(self.circuit_breaker, is_transient_mongo_error)
+
     def create_mongo_client(self, collection = None):
-        client = MongoClient(self.client_url)
+        if self.__client is None:
+            self.__client, self.__client_key = _acquire_client(self.client_url, self.client_options)
+        return self.__client
+
+    def connect(self) -> Any:
+        # MongoClient connects lazily; ping makes server selection happen now, under the retry policy
+        client = self.create_mongo_client()
+        with instrument('mongo', 'connect') as event, event.phase('connect'):
+            for attempt in self._attempts():
+                with attempt:
+                    client.admin.command('ping')
         return client
-    
+
     def create_database(self, collection = None):
-        if MongoOperation.__database is None:
+        if self.database is None:
             client = self.create_mongo_client(collection)
             self.database = client[self.database_name]
-        return self.database 
-    
+        return self.database
+
     def create_collection(self, collection = None):
-        if MongoOperation.__collection is None:
-            database = self.create_database(collection)
-            self.collection = database[self.collection_name]
-            MongoOperation.__collection = collection
-        
-        if MongoOperation.__collection != collection:
+        collection_name = collection or self.collection_name
+        handle = self.__collections.get(collection_name)
+        if handle is None:
             database = self.create_database(collection)
-            self.collection = database[self.collection_name]
-            MongoOperation.__collection = collection
-            
-        return self.collection
-    
+            handle = self.__collections[collection_name] = database[collection_name]
+        self.collection = handle
+        return handle
+
+    def close(self) -> None:
+        if self.__client_key is not None:
+            _release_client(self.__client_key)
+        self.__client = self.__client_key = None
+        self.__collections.clear()
+        self.database = None
+
+    def __enter__(self) -> "MongoOperation":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def bulk_writer(self, collection_name: Optional[str] = None, batch_size: int = 1000,
+                    flush_interval: Optional[float] = 5.0) -> MongoBulkWriter:
+        return MongoBulkWriter(self.create_collection(collection_name), batch_size, flush_interval)
+
+    def find_iter(self, filter: Optional[Dict[str, Any]] = None, collection_name: Optional[str] = None,
+                  projection: Optional[Any] = None, sort: Optional[List[Tuple[str, int]]] = None,
+                  batch_size: int = 1000, hint: Optional[Any] = None, dataframe: bool = False) -> Iterator[Any]:
+        # Yields documents, or DataFrame chunks of batch_size rows when dataframe=True
+        collection = self.create_collection(collection_name)
+
+        def open_cursor():
+            cursor = collection.find(filter or {}, projection, batch_size=batch_size)
+            if sort:
+                cursor = cursor.sort(sort)
+            if hint is not None:
+                cursor = cursor.hint(hint)
+            return cursor
+
+        return _iter_cursor(open_cursor, batch_size, dataframe, 'find_iter', collection.name, self._attempts())
+
+    def aggregate_iter(self, pipeline: List[Dict[str, Any]], collection_name: Optional[str] = None, batch_size: int = 1000,
+                       hint: Optional[Any] = None, dataframe: bool = False) -> Iterator[Any]:
+        options: Dict[str, Any] = {'batchSize': batch_size}
+        if hint is not None:
+            options['hint'] = hint
+        collection = self.create_collection(collection_name)
+        return _iter_cursor(lambda: collection.aggregate(pipeline, **options), batch_size, dataframe,
+                            'aggregate_iter', collection.name, self._attempts())
+
     def insert_record(self, record: dict, collection_name: str) -> Any:
-        if isinstance(record, list):
-            for data in record:
-                if not isinstance(data, dict):
-                    raise TypeError("record must be in the dict")    
-            collection = self.create_collection(collection_name)
-            collection.insert_many(record)
-        elif isinstance(record, dict):
-            collection = self.create_collection(collection_name)
-            collection.insert_one(record)
-    
-    def bulk_insert(self, datafile, collection_name: str = None):
+        with instrument('mongo', 'insert_record', collection_name) as event:
+            if isinstance(record, list):
+                for data in record:
+                    if not isinstance(data, dict):
+                        raise TypeError("record must be in the dict")
+                collection = self.create_collection(collection_name)
+                with event.phase('execute'):
+                    collection.insert_many(record)
+                event.record(len(record), record)
+            elif isinstance(record, dict):
+                collection = self.create_collection(collection_name)
+                with event.phase('execute'):
+                    collection.insert_one(record)
+                event.record(1, record)
+
+    def insert_rows(self, rows: Union[Iterable[Dict[str, Any]], Any], collection_name: Optional[str] = None,
+                    batch_size: int = 1000) -> Dict[str, Any]:
+        # rows is an iterable of dicts or a DataFrame; as for bulk_insert, failures are reported per batch, here
+        # with the batch's offset and size so callers can tell which rows were not written
+        collection = self.create_collection(collection_name)
+        if hasattr(rows, 'itertuples'):
+            batches: Iterable[List[Dict[str, Any]]] = _frame_batches(rows, batch_size)
+        else:
+            iterator = iter(rows)
+            # insert_many adds _id to each document in place, so the caller's dicts are copied first
+            batches = iter(lambda: [dict(row) for row in islice(iterator, batch_size)], [])
+        report: Dict[str, Any] = {'inserted': 0, 'errors': []}
+        with instrument('mongo', 'insert_rows', collection.name) as event:
+            offset = 0
+            for index, documents in enumerate(batches):
+                with event.phase('execute'):
+                    inserted, error = _insert_batch(collection, documents)
+                report['inserted'] += inserted
+                if error is not None:
+                    report['errors'].append({'batch': index, 'offset': offset, 'size': len(documents),
+                                             'inserted': inserted, 'error': error})
+                offset += len(documents)
+            event.record(report['inserted'])
+        return report
+
+    # values are applied with $set, which is idempotent, so both calls run under the retry policy
+    def update_many(self, filter: Dict[str, Any], values: Dict[str, Any], collection_name: Optional[str] = None) -> int:
+        collection = self.create_collection(collection_name)
+        with instrument('mongo', 'update_many', collection.name) as event:
+            for attempt in self._attempts():
+                with attempt, event.phase('execute'):
+                    modified = collection.update_many(filter, {'$set': values}).modified_count
+            event.record(modified)
+        return modified
+
+    def delete_many(self, filter: Dict[str, Any], collection_name: Optional[str] = None) -> int:
+        collection = self.create_collection(collection_name)
+        with instrument('mongo', 'delete_many', collection.name) as event:
+            for attempt in self._attempts():
+                with attempt, event.phase('execute'):
+                    deleted = collection.delete_many(filter).deleted_count
+            event.record(deleted)
+        return deleted
+
+    def bulk_insert(self, datafile, collection_name: Optional[str] = None, batch_size: int = 1000, workers: int = 0,
+                    dtype: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # workers > 0 pipelines batches on a thread pool while the next chunk is being read
         self.path = datafile
-        
-        if self.path.endswith('.csv'):
-            dataframe = pd.read_csv(self.path, encoding='utf-8')
-        elif self.path.endswith(".xlsx"):
-            dataframe = pd.read_excel(self.path, encoding='utf-8')
-            
-        datajson = json.loads(dataframe.to_json(orient='records'))
-        collection = self.create_collection()
-        collection.insert_many(datajson)
+        collection = self.create_collection(collection_name)
+        report: Dict[str, Any] = {'inserted': 0, 'errors': []}
+        with instrument('mongo', 'bulk_insert', collection.name) as event:
+            batches = enumerate(event.measure(_frame_to_documents(frame)) for frame in iter_batches(self.path, batch_size, dtype))
+            if workers <= 0:
+                for index, documents in batches:
+                    documents = list(documents)
+                    with event.phase('execute'):
+                        result = _insert_batch(collection, documents)
+                    self._record_batch(report, index, *result)
+            else:
+                in_flight: deque = deque()
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for index, documents in batches:
+                        in_flight.append((index, executor.submit(_insert_batch, collection, list(documents))))
+                        if len(in_flight) >= workers * 2:
+                            self._drain_one(report, in_flight, event)
+                    while in_flight:
+                        self._drain_one(report, in_flight, event)
+            event.record(report['inserted'])
+        return report
+
+    def _drain_one(self, report: Dict[str, Any], in_flight: deque, event: Any) -> None:
+        # Execute time here is time spent blocked on the server, not the summed time of overlapping batches
+        index, future = in_flight.popleft()
+        with event.phase('execute'):
+            result = future.result()
+        self._record_batch(report, index, *result)
+
+    @staticmethod
+    def _record_batch(report: Dict[str, Any], index: int, inserted: int, error: Any) -> None:
+        report['inserted'] += inserted
+        if error is not None:
+            report['errors'].append({'batch': index, 'inserted': inserted, 'error': error})
+
@@ -1,51 +1,341 @@
 import mysql.connector
 from mysql.connector import errorcode
-from typing import Optional, Any, List, Dict, Union
+from contextlib import contextmanager
+from collections import deque
+from typing import Optional, Any, List, Dict, Set, Union, Callable, Iterable, Iterator, Tuple
+from database_automation.conditions import Condition
+from database_automation.instrumentation import instrument
+from database_automation.resilience import (
+    NO_RETRY, CircuitBreaker, RetryPolicy, is_mysql_connectivity_error, is_transient_mysql_error
+)
+from database_automation.result_cache import ResultCache
+from database_automation.sql import _iter_row_batches, _rowcount, _where
+import threading
+import time
+
+
+def _execute(cursor: Any, query: str, params: Tuple[Any, ...] = ()) -> None:
+    # Without values the query is sent as is, so a literal % in a raw condition string keeps working
+    if params:
+        cursor.execute(query, params)
+    else:
+        cursor.execute(query)
+
+
+class MySQLConnectionPool:
+    def __init__(self, factory: Callable[[], Any], pool_size: int = 5, timeout: float = 30.0,
+                 pre_ping: bool = True, max_lifetime: Optional[float] = None):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1.")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self.max_lifetime = max_lifetime
+        self.__factory = factory
+        self.__idle: deque = deque()
+        self.__created_at: Dict[int, float] = {}
+        self.__slots = threading.BoundedSemaphore(pool_size)
+        self.__lock = threading.Lock()
+        self.__closed = False
+
+    def get(self) -> Any:
+        if self.__closed:
+            raise RuntimeError("Connection pool is closed.")
+        if not self.__slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Timed out after {self.timeout}s waiting for a pooled connection.")
+        try:
+            while True:
+                with self.__lock:
+                    connection = self.__idle.pop() if self.__idle else None
+                if connection is None:
+                    connection = self.__factory()
+                    with self.__lock:
+                        self.__created_at[id(connection)] = time.monotonic()
+                    return connection
+                if self._is_expired(connection) or (self.pre_ping and not self._is_alive(connection)):
+                    self._discard(connection)
+                    continue
+                return connection
+        except BaseException:
+            self.__slots.release()
+            raise
+
+    def put(self, connection: Any) -> None:
+        try:
+            if self.__closed or self._is_expired(connection):
+                self._discard(connection)
+                return
+            try:
+                if connection.in_transaction:
+                    connection.rollback()
+            except mysql.connector.Error:
+                self._discard(connection)
+                return
+            with self.__lock:
+                self.__idle.append(connection)
+        finally:
+            self.__slots.release()
+
+    def discard(self, connection: Any) -> None:
+        # For a checked-out connection that must not be reused, e.g. one with an unread result set
+        try:
+            self._discard(connection)
+        finally:
+            self.__slots.release()
+
+    def close(self) -> None:
+        self.__closed = True
+        with self.__lock:
+            idle = list(self.__idle)
+            self.__idle.clear()
+        for connection in idle:
+            self._discard(connection)
+
+    def _is_expired(self, connection: Any) -> bool:
+        if self.max_lifetime is None:
+            return False
+        created_at = self.__created_at.get(id(connection))
+        return created_at is None or time.monotonic() - created_at > self.max_lifetime
+
+    def _is_alive(self, connection: Any) -> bool:
+        try:
+            return bool(connection.is_connected())
+        except mysql.connector.Error:
+            return False
+
+    def _discard(self, connection: Any) -> None:
+        with self.__lock:
+            self.__created_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except mysql.connector.Error:
+            pass
+
+
+class _ConnectionState(threading.local):
+    connection: Optional[Any] = None
+    cursor: Optional[Any] = None
+    session_depth = 0
+    in_transaction = False
+    savepoints = 0
+
+    def __init__(self) -> None:
+        # Tables written inside the current transaction(), invalidated again once it commits
+        self.touched: Set[str] = set()
+
 
 class MySQLConnection:
-    def __init__(self, host: str, user: str, password: str, database: str = None, port: int = 3306):
+    def __init__(self, host: str, user: str, password: str, database: Optional[str] = None, port: int = 3306,
+                 pool_size: int = 0, pool_timeout: float = 30.0, pool_pre_ping: bool = True,
+                 pool_max_lifetime: Optional[float] = None, pool: Optional[MySQLConnectionPool] = None,
+                 result_cache: Optional[ResultCache] = None, retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
         self.__host = host
         self.__user = user
         self.__password = password
         self.__database = database
         self.__port = port
-        self.__connection: Optional[Any] = None
-        self.__cursor: Optional[Any] = None
+        # The checked-out connection, cursor and session/transaction depth are per thread, so threads sharing one
+        # pooled instance each get their own connection
+        self.__state = _ConnectionState()
+        # pool_size=0 keeps the original connect/disconnect-per-call behaviour
+        if pool is None and pool_size > 0:
+            pool = MySQLConnectionPool(self._open_connection, pool_size=pool_size, timeout=pool_timeout,
+                                       pre_ping=pool_pre_ping, max_lifetime=pool_max_lifetime)
+        self.__pool = pool
+        # select_record results are served from result_cache until a write through this instance touches the table
+        self.result_cache = result_cache
+        # Connects and idempotent statements (create_table, select_record, update_record, delete_record) are retried
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
 
-    def connect(self) -> None:
+    @property
+    def pool(self) -> Optional[MySQLConnectionPool]:
+        return self.__pool
+
+    def _invalidate(self, table_name: str) -> None:
+        if self.result_cache is not None:
+            self.result_cache.invalidate('mysql', table_name)
+            # Another thread can re-cache the pre-commit rows before this transaction commits
+            if self.__state.in_transaction:
+                self.__state.touched.add(table_name)
+
+    def _commit(self) -> None:
+        # Inside transaction() every statement is committed together when the block exits
+        if not self.__state.in_transaction:
+            self.__state.connection.commit()  # type: ignore
+
+    def _rollback(self) -> None:
+        if not self.__state.in_transaction:
+            self.__state.connection.rollback()  # type: ignore
+
+    def _attempts(self) -> Iterator[Any]:
+        # Inside session() a failed statement may have left the shared connection unusable, so it is not retried
+        policy = NO_RETRY if self.__state.session_depth else self.retry_policy
+        return policy.attempts(self.circuit_breaker, is_transient_mysql_error, is_mysql_connectivity_error)
+
+    def _open_connection(self) -> Any:
+        # One attempt that raises the driver error as is, so the caller's retry loop and breaker can classify it
         try:
-            self.__connection = mysql.connector.connect(
+            return mysql.connector.connect(
                 host=self.__host,
                 user=self.__user,
                 password=self.__password,
                 database=self.__database if self.__database else None,
                 port=self.__port
             )
-            self.__cursor = self.__connection.cursor()
         except mysql.connector.Error as err:
-            if err.errno == errorcode.ER_BAD_DB_ERROR and self.__database:
-                self.create_database()
-                self.__connection = mysql.connector.connect(
-                    host=self.__host,
-                    user=self.__user,
-                    password=self.__password,
-                    database=self.__database,
-                    port=self.__port
-                )
-                self.__cursor = self.__connection.cursor()
-            else:
-                raise Exception(f"Error connecting to the database: {err}")
+            if err.errno != errorcode.ER_BAD_DB_ERROR or not self.__database:
+                raise
+        self.create_database()
+        return mysql.connector.connect(
+            host=self.__host,
+            user=self.__user,
+            password=self.__password,
+            database=self.__database,
+            port=self.__port
+        )
+
+    def connect(self) -> None:
+        try:
+            for attempt in self.retry_policy.attempts(self.circuit_breaker, is_transient_mysql_error,
+                                                     is_mysql_connectivity_error):
+                with attempt:
+                    connection = self._open_connection()
+        except mysql.connector.Error as err:
+            raise Exception(f"Error connecting to the database: {err}")
+        self.__state.connection = connection
+        self.__state.cursor = connection.cursor()
 
     def disconnect(self) -> None:
         try:
-            if self.__connection and self.__connection.is_connected():
-                if self.__cursor:
-                    self.__cursor.close()
-                if self.__connection:
-                    self.__connection.close() # type: ignore
+            if self.__state.connection and self.__state.connection.is_connected():
+                if self.__state.cursor:
+                    self.__state.cursor.close()
+                if self.__state.connection:
+                    self.__state.connection.close() # type: ignore
         except mysql.connector.Error as err:
             raise Exception(f"Error disconnecting from the database: {err}")
 
+    def close(self) -> None:
+        if self.__pool is None:
+            self.disconnect()
+            return
+        self.__state.session_depth = 0
+        self.__state.in_transaction = False
+        self._checkin()
+        self.__pool.close()
+
+    def _checkout(self, retry: bool = False) -> None:
+        # retry=True is for callers without their own retry loop; inside one, connect errors go to that loop instead
+        if self.__state.session_depth:
+            return
+        if retry:
+            try:
+                for attempt in self._attempts():
+                    with attempt:
+                        self._checkout()
+            except mysql.connector.Error as err:
+                raise Exception(f"Error connecting to the database: {err}")
+            return
+        if self.__pool is None:
+            self.__state.connection = self._open_connection()
+        else:
+            self.__state.connection = self.__pool.get()
+        self.__state.cursor = self.__state.connection.cursor()
+
+    def _checkin(self) -> None:
+        if self.__state.session_depth:
+            return
+        if self.__pool is None:
+            self.disconnect()
+            return
+        connection, cursor = self.__state.connection, self.__state.cursor
+        self.__state.connection = self.__state.cursor = None
+        if connection is None:
+            return
+        try:
+            if cursor:
+                cursor.close()
+        except mysql.connector.Error:
+            pass
+        finally:
+            self.__pool.put(connection)
+
+    def _discard(self) -> None:
+        # Drops the checked-out connection instead of reusing it; shutdown() closes the socket without reading
+        # whatever the server is still sending
+        connection, self.__state.connection, self.__state.cursor = self.__state.connection, None, None
+        if connection is None:
+            return
+        connection.shutdown()
+        if self.__pool is not None:
+            self.__pool.discard(connection)
+
+    @contextmanager
+    def session(self) -> Iterator["MySQLConnection"]:
+        # Holds one connection for every CRUD call made inside the block
+        with self._session():
+            yield self
+
+    @contextmanager
+    def _session(self, event: Optional[Any] = None) -> Iterator["MySQLConnection"]:
+        if event is None:
+            self._checkout(retry=True)
+        else:
+            with event.phase('connect'):
+                self._checkout(retry=True)
+        self.__state.session_depth += 1
+        try:
+            yield self
+        finally:
+            self.__state.session_depth -= 1
+            self._checkin()
+
+    @contextmanager
+    def transaction(self, isolation_level: Optional[str] = None,
+                    readonly: Optional[bool] = None) -> Iterator["MySQLConnection"]:
+        # CRUD calls in the block share one connection and one commit; an exception rolls all of them back.
+        # A nested transaction() becomes a savepoint, so only the inner block is undone when it fails.
+        if self.__state.in_transaction:
+            with self.savepoint():
+                yield self
+            return
+        with instrument('mysql', 'transaction') as event, self._session(event):
+            with event.phase('execute'):
+                if self.__state.connection.in_transaction:  # type: ignore
+                    # A SELECT earlier in session() leaves an implicit transaction open
+                    self.__state.connection.commit()  # type: ignore
+                self.__state.connection.start_transaction(isolation_level=isolation_level, readonly=readonly)  # type: ignore
+            self.__state.in_transaction = True
+            try:
+                yield self
+                with event.phase('execute'):
+                    self.__state.connection.commit()  # type: ignore
+            except BaseException:
+                self.__state.connection.rollback()  # type: ignore
+                raise
+            finally:
+                self.__state.in_transaction = False
+                self.__state.savepoints = 0
+                touched, self.__state.touched = self.__state.touched, set()
+            for table_name in touched:
+                self._invalidate(table_name)
+
+    @contextmanager
+    def savepoint(self, name: Optional[str] = None) -> Iterator[str]:
+        if not self.__state.in_transaction:
+            raise RuntimeError("savepoint() must be used inside transaction().")
+        self.__state.savepoints += 1
+        name = name or f'sp_{self.__state.savepoints}'
+        self.__state.cursor.execute(f'SAVEPOINT {name}')  # type: ignore
+        try:
+            yield name
+        except BaseException:
+            self.__state.cursor.execute(f'ROLLBACK TO SAVEPOINT {name}')  # type: ignore
+            raise
+        self.__state.cursor.execute(f'RELEASE SAVEPOINT {name}')  # type: ignore
+
     def create_database(self) -> None:
         try:
             temp_connection = mysql.connector.connect(
@@ -64,71 +354,220 @@ class MySQLConnection:
             raise Exception(f"Failed to create database: {err}")
 
     def create_table(self, table_name: str, columns: Dict[str, str]) -> None:
-        try:
-            self.connect()
-            if self.__cursor and self.__connection:
-                columns_str = ', '.join([f'{col} {data_type}' for col, data_type in columns.items()])
-                create_table_query = f'CREATE TABLE IF NOT EXISTS {table_name} ({columns_str})'
-                self.__cursor.execute(create_table_query)
-                self.__connection.commit()
-        except mysql.connector.Error as err:
-            raise Exception(f"Failed to create table: {err}")
-        finally:
-            self.disconnect()
+        with instrument('mysql', 'create_table', table_name) as event:
+            try:
+                for attempt in self._attempts():
+                    with attempt:
+                        try:
+                            with event.phase('connect'):
+                                self._checkout()
+                            if self.__state.cursor and self.__state.connection:
+                                columns_str = ', '.join([f'{col} {data_type}' for col, data_type in columns.items()])
+                                create_table_query = f'CREATE TABLE IF NOT EXISTS {table_name} ({columns_str})'
+                                with event.phase('execute'):
+                                    self.__state.cursor.execute(create_table_query)
+                                    self._commit()
+                        finally:
+                            self._checkin()
+            except mysql.connector.Error as err:
+                raise Exception(f"Failed to create table: {err}")
 
     def insert_record(self, table_name: str, record: Dict[str, Any]) -> None:
-        try:
-            self.connect()
-            if self.__cursor and self.__connection:
-                columns = ', '.join(record.keys())
-                values = tuple(record.values())
-                placeholders = ', '.join(['%s'] * len(record))
-                insert_query = f'INSERT INTO {table_name} ({columns}) VALUES ({placeholders})'
-                self.__cursor.execute(insert_query, values)
-                self.__connection.commit()
-        except mysql.connector.Error as err:
-            raise Exception(f"Failed to insert record: {err}")
-        finally:
-            self.disconnect()
+        with instrument('mysql', 'insert_record', table_name) as event:
+            try:
+                with event.phase('connect'):
+                    self._checkout(retry=True)
+                if self.__state.cursor and self.__state.connection:
+                    columns = ', '.join(record.keys())
+                    values = tuple(record.values())
+                    placeholders = ', '.join(['%s'] * len(record))
+                    insert_query = f'INSERT INTO {table_name} ({columns}) VALUES ({placeholders})'
+                    with event.phase('execute'):
+                        self.__state.cursor.execute(insert_query, values)
+                        self._commit()
+                    event.record(1, values)
+                self._invalidate(table_name)
+            except mysql.connector.Error as err:
+                raise Exception(f"Failed to insert record: {err}")
+            finally:
+                self._checkin()
 
-    def select_record(self, table_name: str, conditions: str = None) -> List[List[Any]]:
-        try:
-            self.connect()
-            if self.__cursor:
-                select_query = f'SELECT * FROM {table_name}'
-                if conditions:
-                    select_query += f' WHERE {conditions}'
-                self.__cursor.execute(select_query)
-                records = self.__cursor.fetchall()
-                return [record for record in records] #returns list of tuples
-            return []
-        except mysql.connector.Error as err:
-            raise Exception(f"Failed to select record: {err}")
-        finally:
-            self.disconnect()
+    def bulk_insert(self, table_name: str, rows: Union[str, Iterable[Dict[str, Any]], Any],
+                    batch_size: int = 1000, dtype: Optional[Dict[str, Any]] = None,
+                    upsert: bool = False) -> Dict[str, float]:
+        # rows may be a CSV/Parquet/JSONL/Excel path, a pandas DataFrame or any iterable of dicts
+        # upsert=True overwrites rows that collide on the table's primary or unique keys
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        start_time = time.perf_counter()
+        total_rows = 0
+        batches = 0
+        with instrument('mysql', 'bulk_insert', table_name) as event, self._session(event):
+            for columns, values in _iter_row_batches(rows, batch_size, dtype):
+                placeholders = ', '.join(['%s'] * len(columns))
+                insert_query = f'INSERT INTO {table_name} ({", ".join(columns)}) VALUES ({placeholders})'
+                if upsert:
+                    insert_query += ' ON DUPLICATE KEY UPDATE ' + ', '.join(f'{column} = VALUES({column})' for column in columns)
+                try:
+                    with event.phase('execute'):
+                        self.__state.cursor.executemany(insert_query, values)  # type: ignore
+                        self._commit()
+                except mysql.connector.Error as err:
+                    self._rollback()
+                    self._invalidate(table_name)
+                    raise Exception(f"Failed to bulk insert records after {total_rows} rows: {err}")
+                event.record(len(values), values)
+                total_rows += len(values)
+                batches += 1
+        self._invalidate(table_name)
+        elapsed = time.perf_counter() - start_time
+        return {
+            'rows': total_rows,
+            'batches': batches,
+            'seconds': elapsed,
+            'rows_per_sec': total_rows / elapsed if elapsed > 0 else 0.0,
+        }
 
-    def update_record(self, table_name: str, record: Dict[str, Any], conditions: str) -> None:
-        try:
-            self.connect()
-            if self.__cursor and self.__connection:
-                set_clause = ', '.join([f'{key}=%s' for key in record.keys()])
-                values = tuple(record.values())
-                update_query = f'UPDATE {table_name} SET {set_clause} WHERE {conditions}'
-                self.__cursor.execute(update_query, values)
-                self.__connection.commit()
-        except mysql.connector.Error as err:
-            raise Exception(f"Failed to update record: {err}")
-        finally:
-            self.disconnect()
+    def select_record(self, table_name: str, conditions: Union[str, Condition, None] = None) -> List[List[Any]]:
+        where, params = _where(conditions)
+        cache, cache_key = self.result_cache, None
+        # Reads inside a transaction may see uncommitted rows, so they neither use nor fill the cache
+        if cache is not None and not self.__state.in_transaction:
+            cache_key = cache.key('mysql', table_name, where, params)
+            hit, rows = cache.get(cache_key)
+            if hit:
+                return list(rows)
+        with instrument('mysql', 'select_record', table_name) as event:
+            try:
+                for attempt in self._attempts():
+                    with attempt:
+                        try:
+                            rows = []
+                            with event.phase('connect'):
+                                self._checkout()
+                            if self.__state.cursor:
+                                with event.phase('execute'):
+                                    _execute(self.__state.cursor, f'SELECT * FROM {table_name}{where}', params)
+                                with event.phase('fetch'):
+                                    rows = self.__state.cursor.fetchall() #returns list of tuples
+                                event.record(len(rows), rows)
+                                if cache is not None and cache_key is not None:
+                                    cache.put(cache_key, list(rows))
+                        finally:
+                            self._checkin()
+            except mysql.connector.Error as err:
+                raise Exception(f"Failed to select record: {err}")
+        # The retry loop only ends after an attempt that succeeded
+        return rows
 
-    def delete_record(self, table_name: str, conditions: str) -> None:
-        try:
-            self.connect()
-            if self.__cursor and self.__connection:
-                delete_query = f'DELETE FROM {table_name} WHERE {conditions}'
-                self.__cursor.execute(delete_query)
-                self.__connection.commit()
-        except mysql.connector.Error as err:
-            raise Exception(f"Failed to delete record: {err}")
-        finally:
-            self.disconnect()
+    def select_iter(self, table_name: str, conditions: Union[str, Condition, None] = None, batch_size: int = 1000,
+                    batches: bool = False, dataframe: bool = False, params: Optional[Tuple[Any, ...]] = None,
+                    order_by: Optional[str] = None, dictionary: bool = False) -> Iterator[Any]:
+        # Streams rows through fetchmany; the connection stays checked out until the generator is exhausted or closed
+        # params fill %s placeholders in conditions; dictionary=True yields {column: value} rows
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        where, params = _where(conditions, params)
+        select_query = f'SELECT * FROM {table_name}{where}'
+        if order_by:
+            select_query += f' ORDER BY {order_by}'
+        with instrument('mysql', 'select_iter', table_name) as event, self._session(event):
+            cursor = self.__state.connection.cursor(dictionary=True) if dictionary else self.__state.connection.cursor()  # type: ignore
+            exhausted = False
+            try:
+                with event.phase('execute'):
+                    _execute(cursor, select_query, params)
+                while True:
+                    with event.phase('fetch'):
+                        rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        exhausted = True
+                        break
+                    event.record(len(rows), rows)
+                    if dataframe:
+                        import pandas as pd
+                        yield pd.DataFrame.from_records(rows, columns=list(cursor.column_names))
+                    elif batches:
+                        yield rows
+                    else:
+                        yield from rows
+            except mysql.connector.Error as err:
+                raise Exception(f"Failed to select records: {err}")
+            finally:
+                if not exhausted and self.__state.session_depth == 1:
+                    # Stopped early: dropping the connection is cheaper than reading the rest of the result
+                    self._discard()
+                else:
+                    try:
+                        # Inside the caller's session() the connection is still needed, so the cursor is drained
+                        while not exhausted and cursor.fetchmany(batch_size):
+                            pass
+                        cursor.close()
+                    except mysql.connector.Error:
+                        pass
+
+    def key_range(self, table_name: str, column: str) -> Tuple[Any, Any]:
+        # MIN/MAX of an indexed column are read from the ends of the index, not by scanning the table
+        with instrument('mysql', 'key_range', table_name) as event:
+            try:
+                for attempt in self._attempts():
+                    with attempt:
+                        try:
+                            with event.phase('connect'):
+                                self._checkout()
+                            with event.phase('execute'):
+                                self.__state.cursor.execute(f'SELECT MIN({column}), MAX({column}) FROM {table_name}')  # type: ignore
+                                low, high = self.__state.cursor.fetchone()  # type: ignore
+                        finally:
+                            self._checkin()
+            except mysql.connector.Error as err:
+                raise Exception(f"Failed to read key range: {err}")
+        return low, high
+
+    def update_record(self, table_name: str, record: Dict[str, Any], conditions: Union[str, Condition]) -> None:
+        # Retried on transient errors: SET assigns absolute values, so replaying the statement is harmless
+        where, params = _where(conditions)
+        if not where:
+            raise ValueError("update_record requires conditions; pass a condition matching every row to update all rows.")
+        with instrument('mysql', 'update_record', table_name) as event:
+            try:
+                for attempt in self._attempts():
+                    with attempt:
+                        try:
+                            with event.phase('connect'):
+                                self._checkout()
+                            if self.__state.cursor and self.__state.connection:
+                                set_clause = ', '.join([f'{key}=%s' for key in record.keys()])
+                                values = tuple(record.values()) + params
+                                update_query = f'UPDATE {table_name} SET {set_clause}{where}'
+                                with event.phase('execute'):
+                                    self.__state.cursor.execute(update_query, values)
+                                    self._commit()
+                                event.record(_rowcount(self.__state.cursor), values)
+                        finally:
+                            self._checkin()
+                self._invalidate(table_name)
+            except mysql.connector.Error as err:
+                raise Exception(f"Failed to update record: {err}")
+
+    def delete_record(self, table_name: str, conditions: Union[str, Condition]) -> None:
+        where, params = _where(conditions)
+        if not where:
+            raise ValueError("delete_record requires conditions; pass a condition matching every row to delete all rows.")
+        with instrument('mysql', 'delete_record', table_name) as event:
+            try:
+                for attempt in self._attempts():
+                    with attempt:
+                        try:
+                            with event.phase('connect'):
+                                self._checkout()
+                            if self.__state.cursor and self.__state.connection:
+                                with event.phase('execute'):
+                                    _execute(self.__state.cursor, f'DELETE FROM {table_name}{where}', params)
+                                    self._commit()
+                                event.record(_rowcount(self.__state.cursor))
+                        finally:
+                            self._checkin()
+                self._invalidate(table_name)
+            except mysql.connector.Error as err:
+                raise Exception(f"Failed to delete record: {err}")
@@ -0,0 +1,266 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+import csv
+import datetime
+import os
+import time
+from database_automation.connector import _failed_rows, _report_errors, _require_upsert, as_connector
+
+
+# Murmur3Partitioner token bounds; the minimum token is never assigned to a row
+MIN_TOKEN = -2 ** 63
+MAX_TOKEN = 2 ** 63 - 1
+
+
+@dataclass(frozen=True)
+class Partition:
+    # backend: 'mysql', 'cassandra' or 'mongo'; target: table or collection
+    # mysql: conditions is a WHERE clause with %s placeholders filled from params
+    # cassandra: conditions is the partition key column(s), params the (start, end] token range
+    # mongo: conditions is the _id range filter document
+    backend: str
+    target: str
+    index: int
+    conditions: Any = None
+    params: Tuple[Any, ...] = ()
+
+
+def mysql_partitions(connection: Any, table_name: str, key: str, count: int) -> List[Partition]:
+    # Equal-width ranges over an integer primary key; gaps in the key make some ranges smaller than others
+    if count < 1:
+        raise ValueError("count must be at least 1.")
+    low, high = connection.key_range(table_name, key)
+    if low is None:
+        return [Partition('mysql', table_name, 0)]
+    if not isinstance(low, int) or not isinstance(high, int):
+        raise ValueError(f"Column '{key}' must be an integer key to be split into ranges.")
+    step = max(1, -(-(high - low + 1) // count))
+    partitions = []
+    for index, start in enumerate(range(low, high + 1, step)):
+        end = start + step
+        if end > high:
+            partitions.append(Partition('mysql', table_name, index, f"{key} >= %s AND {key} <= %s", (start, high)))
+        else:
+            partitions.append(Partition('mysql', table_name, index, f"{key} >= %s AND {key} < %s", (start, end)))
+    return partitions
+
+
+def cassandra_partitions(table_name: str, partition_key: Union[str, List[str]], count: int) -> List[Partition]:
+    if count < 1:
+        raise ValueError("count must be at least 1.")
+    keys = (partition_key,) if isinstance(partition_key, str) else tuple(partition_key)
+    width = MAX_TOKEN - MIN_TOKEN
+    bounds = [MIN_TOKEN + width * index // count for index in range(count)] + [MAX_TOKEN]
+    return [Partition('cassandra', table_name, index, keys, (bounds[index], bounds[index + 1])) for index in range(count)]
+
+
+def mongo_partitions(operation: Any, collection_name: str, count: int, samples_per_partition: int = 20) -> List[Partition]:
+    # Split points come from a random $sample of _id values, so planning does not scan the collection
+    if count < 1:
+        raise ValueError("count must be at least 1.")
+    collection = operation.create_collection(collection_name)
+    pipeline = [{'$sample': {'size': count * samples_per_partition}}, {'$project': {'_id': 1}}]
+    ids = sorted({document['_id'] for document in collection.aggregate(pipeline)})
+    splits = sorted({ids[len(ids) * index // count] for index in range(1, count)}) if len(ids) >= count else []
+    bounds: List[Any] = [None] + splits + [None]
+    partitions = []
+    for index in range(len(bounds) - 1):
+        low, high = bounds[index], bounds[index + 1]
+        condition: Dict[str, Any] = {}
+        if low is not None:
+            condition['$gte'] = low
+        if high is not None:
+            condition['$lt'] = high
+        partitions.append(Partition('mongo', collection_name, index, {'_id': condition} if condition else {}))
+    return partitions
+
+
+def _read_mysql(backend: Any, partition: Partition, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    return backend.select_iter(partition.target, partition.conditions, batch_size, batches=True,
+                               params=partition.params or None, dictionary=True)
+
+
+def _read_cassandra(backend: Any, partition: Partition, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    pages = backend.fetch_pages(partition.target, fetch_size=batch_size, token_range=partition.params,
+                                partition_key=list(partition.conditions))
+    for page, _ in pages:
+        yield [row._asdict() if hasattr(row, '_asdict') else dict(row) for row in page]
+
+
+def _read_mongo(backend: Any, partition: Partition, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    documents = backend.find_iter(partition.conditions, partition.target, batch_size=batch_size)
+    return iter(lambda: list(islice(documents, batch_size)), [])
+
+
+_READERS: Dict[str, Callable[[Any, Partition, int], Iterator[List[Dict[str, Any]]]]] = {
+    'mysql': _read_mysql,
+    'cassandra': _read_cassandra,
+    'mongo': _read_mongo,
+}
+
+_SHARD_SCALARS = (type(None), bool, int, float, str, bytes, Decimal, datetime.date, datetime.time, datetime.timedelta,
+                  list, tuple, dict)
+
+
+def _shard_value(value: Any) -> Any:
+    # Driver types such as ObjectId or UUID are written as their string form
+    return value if isinstance(value, _SHARD_SCALARS) else str(value)
+
+
+def _conform(table: Any, schema: Any) -> Any:
+    import pyarrow as pa
+    columns = [table.column(field.name).cast(field.type) if field.name in table.column_names
+               else pa.nulls(table.num_rows, field.type) for field in schema]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class _ParquetShard:
+    def __init__(self, path: str):
+        self.path = path
+        self.__writer: Any = None
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist([{column: _shard_value(value) for column, value in row.items()} for row in rows])
+        if self.__writer is None:
+            self.__writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            schema = pa.unify_schemas([self.__writer.schema, table.schema])
+            if not schema.equals(self.__writer.schema):
+                self._widen(schema)
+            table = _conform(table, schema)
+        self.__writer.write_table(table)
+
+    def _widen(self, schema: Any) -> None:
+        # A column that was all null so far, or absent, now has values: the rows already written are rewritten with
+        # the wider schema, which happens at most once per such column
+        import pyarrow.parquet as pq
+        self.__writer.close()
+        written = pq.read_table(self.path)
+        self.__writer = pq.ParquetWriter(self.path, schema)
+        self.__writer.write_table(_conform(written, schema))
+
+    def close(self) -> Optional[str]:
+        if self.__writer is None:
+            return None
+        self.__writer.close()
+        return self.path
+
+
+class _CSVShard:
+    def __init__(self, path: str):
+        self.path = path
+        self.__file: Any = None
+        self.__writer: Any = None
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if self.__writer is None:
+            self.__file = open(self.path, 'w', newline='', encoding='utf-8')
+            self.__writer = csv.DictWriter(self.__file, fieldnames=list(rows[0].keys()))
+            self.__writer.writeheader()
+        self.__writer.writerows({column: _shard_value(value) for column, value in row.items()} for row in rows)
+
+    def close(self) -> Optional[str]:
+        if self.__file is None:
+            return None
+        self.__file.close()
+        return self.path
+
+
+class ShardSink:
+    # One file per partition, e.g. part-00003.parquet; a CSV shard takes its columns from the partition's first batch,
+    # a Parquet shard widens its schema when later batches bring new columns or values for all-null ones
+    def __init__(self, directory: str, format: str = 'parquet', prefix: str = 'part'):
+        if format not in ('parquet', 'csv'):
+            raise ValueError(f"Unsupported shard format: {format}")
+        self.directory = directory
+        self.format = format
+        self.prefix = prefix
+
+    def open(self, index: int) -> Any:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.prefix}-{index:05d}.{self.format}")
+        return _ParquetShard(path) if self.format == 'parquet' else _CSVShard(path)
+
+
+class _ConnectorWriter:
+    def __init__(self, backend: Any, target: str, key: Optional[Union[str, Sequence[str]]]):
+        self.backend = backend
+        self.connector = as_connector(backend)
+        self.target = target
+        self.key = key
+        if key:
+            _require_upsert(self.connector)
+        self.errors: List[Any] = []
+
+    def write(self, rows: List[Dict[str, Any]]) -> int:
+        # Returns how many of the rows the target reported as not written
+        if self.key:
+            report = _require_upsert(self.connector).upsert(self.target, rows, self.key)
+        else:
+            report = self.connector.bulk_insert(self.target, rows)
+        errors = _report_errors(report)
+        if errors:
+            self.errors.append(errors)
+        return len(_failed_rows(report, rows))
+
+    def close(self) -> Dict[str, Any]:
+        self.connector.close()
+        return {'target': self.target, 'errors': self.errors}
+
+
+class ConnectorSink:
+    # factory builds the target backend inside each worker, since connections cannot be shared across processes
+    def __init__(self, factory: Callable[[], Any], target: str, key: Optional[Union[str, Sequence[str]]] = None):
+        self.factory = factory
+        self.target = target
+        self.key = key
+
+    def open(self, index: int) -> _ConnectorWriter:
+        return _ConnectorWriter(self.factory(), self.target, self.key)
+
+
+def _run_partition(source: Callable[[], Any], partition: Partition, sink: Any, batch_size: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    backend = source()
+    rows = failed = 0
+    try:
+        writer = sink.open(partition.index)
+        try:
+            for batch in _READERS[partition.backend](backend, partition, batch_size):
+                # File shards return None; a connector writer returns the rows its target rejected
+                rejected = writer.write(batch) or 0
+                rows += len(batch) - rejected
+                failed += rejected
+        finally:
+            output = writer.close()
+    finally:
+        backend.close()
+    return {'partition': partition.index, 'rows': rows, 'failed': failed, 'output': output,
+            'seconds': time.perf_counter() - started}
+
+
+def run_partitioned(source: Callable[[], Any], partitions: List[Partition], sink: Any, workers: int = 4,
+                    executor: str = 'process', batch_size: int = 5000) -> Dict[str, Any]:
+    # source builds a connected backend in each worker; with executor='process' source, partitions and sink
+    # are pickled, so source must be a module-level function or a functools.partial
+    if executor not in ('process', 'thread'):
+        raise ValueError(f"Unsupported executor: {executor}")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    started = time.perf_counter()
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        futures = [pool.submit(_run_partition, source, partition, sink, batch_size) for partition in partitions]
+        results = [future.result() for future in as_completed(futures)]
+    results.sort(key=lambda result: result['partition'])
+    return {
+        'rows': sum(result['rows'] for result in results),
+        'failed': sum(result['failed'] for result in results),
+        'partitions': results,
+        'seconds': time.perf_counter() - started,
+    }
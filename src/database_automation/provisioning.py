@@ -0,0 +1,119 @@
+from typing import Iterable, Protocol, runtime_checkable
+from database_automation.resilience import RetryPolicy
+import socket
+import subprocess
+
+
+# CQL v4 OPTIONS request: version, flags, stream id (2 bytes), opcode 0x05, body length 0
+_CQL_OPTIONS_FRAME = b'\x04\x00\x00\x00\x05\x00\x00\x00\x00'
+_CQL_SUPPORTED = 0x06
+_CQL_ERROR = 0x00
+
+
+@runtime_checkable
+class Provisioner(Protocol):
+    # start() returns once the database accepts CQL connections, or False if it could not be brought up
+    def start(self) -> bool: ...
+
+    def stop(self) -> None: ...
+
+
+def probe_cql(host: str, port: int = 9042, timeout: float = 1.0) -> bool:
+    # True once the native transport answers a CQL frame; an open port alone is not enough during startup
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.sendall(_CQL_OPTIONS_FRAME)
+            header = b''
+            while len(header) < 9:
+                chunk = sock.recv(9 - len(header))
+                if not chunk:
+                    return False
+                header += chunk
+    except OSError:
+        return False
+    # A server that only speaks an older protocol version answers with an ERROR frame, which still means it is up
+    return bool(header[0] & 0x80) and header[4] in (_CQL_SUPPORTED, _CQL_ERROR)
+
+
+def wait_for_cql(hosts: Iterable[str], port: int = 9042, timeout: float = 180.0, probe_timeout: float = 1.0) -> bool:
+    hosts = list(hosts)
+    policy = RetryPolicy(max_attempts=None, base_delay=0.05, max_delay=2.0, deadline=timeout)
+    try:
+        for attempt in policy.attempts():
+            with attempt:
+                if not any(probe_cql(host, port, probe_timeout) for host in hosts):
+                    raise ConnectionRefusedError(f"No CQL listener on port {port} at {', '.join(hosts)}.")
+    except ConnectionRefusedError:
+        return False
+    return True
+
+
+class DockerProvisioner:
+    def __init__(self, volume: str = "cassandra_data", container_name: str = "test-cassandra-v2",
+                 image: str = "cassandra:latest", port: int = 9042, host: str = "127.0.0.1",
+                 ready_timeout: float = 180.0):
+        self.volume = volume
+        self.container_name = container_name
+        self.image = image
+        self.port = port
+        self.host = host
+        self.ready_timeout = ready_timeout
+        # True only while a container run by start() is up; stop() leaves anything else alone
+        self.started = False
+
+    def is_running(self) -> bool:
+        try:
+            output = subprocess.check_output(["docker", "inspect", "-f", "{{.State.Running}}", self.container_name], stderr=subprocess.DEVNULL)
+            return output.strip() == b"true"
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return False
+
+    def start(self) -> bool:
+        # An already reachable node needs no docker calls at all
+        if probe_cql(self.host, self.port):
+            return True
+        if not self.is_running():
+            if not self._run_container():
+                return False
+            self.started = True
+        if wait_for_cql([self.host], self.port, self.ready_timeout):
+            print("Cassandra is running.")
+            return True
+        print("Error: Cassandra did not start in the expected time.")
+        return False
+
+    def _run_container(self) -> bool:
+        try:
+            # Check if the volume exists
+            volume_exists = subprocess.run(["docker", "volume", "inspect", self.volume], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+            # Create the volume if it doesn't exist
+            if not volume_exists:
+                subprocess.run(["docker", "volume", "create", self.volume], check=True, stdout=subprocess.DEVNULL)
+                print(f"Docker volume {self.volume} created.")
+
+            # Remove any existing container with the same name to avoid conflicts
+            subprocess.run(["docker", "rm", "-f", self.container_name], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            # Run the Cassandra container with the volume
+            container_id = subprocess.check_output([
+                "docker", "run", "--name", self.container_name,
+                "-p", f"{self.port}:9042",
+                "-v", f"{self.volume}:/var/lib/cassandra",
+                "-d", self.image
+            ], stderr=subprocess.DEVNULL)
+            print(f"Container ID created: {container_id.decode().strip()}")
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            print(f"Error starting Cassandra container: {e}")
+            return False
+
+    def stop(self, force: bool = False) -> None:
+        # A node that was already reachable or running belongs to someone else; force=True stops it anyway
+        if not self.started and not force:
+            return
+        self.started = False
+        try:
+            subprocess.run(["docker", "stop", self.container_name], check=True)
+            subprocess.run(["docker", "rm", self.container_name], check=True)
+            print("Cassandra container stopped and removed.")
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            print(f"Error stopping Cassandra container: {e}")
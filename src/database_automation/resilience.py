@@ -0,0 +1,208 @@
+from typing import Any, Callable, Iterator, Optional
+from itertools import count
+import random
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+# MySQL client/server error numbers that mean the server is unreachable or going away; these open the breaker
+MYSQL_CONNECTIVITY_ERRNOS = frozenset({
+    1040,  # ER_CON_COUNT_ERROR
+    1053,  # ER_SERVER_SHUTDOWN
+    2002,  # CR_CONNECTION_ERROR
+    2003,  # CR_CONN_HOST_ERROR
+    2006,  # CR_SERVER_GONE_ERROR
+    2013,  # CR_SERVER_LOST
+    2055,  # CR_SERVER_LOST_EXTENDED
+    4031,  # ER_CLIENT_INTERACTION_TIMEOUT
+})
+
+# Deadlocks and lock timeouts are worth retrying too, but they are ordinary contention, not an unhealthy server
+MYSQL_TRANSIENT_ERRNOS = MYSQL_CONNECTIVITY_ERRNOS | frozenset({
+    1205,  # ER_LOCK_WAIT_TIMEOUT
+    1213,  # ER_LOCK_DEADLOCK
+})
+
+
+def _is_transient_os_error(error: BaseException) -> bool:
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def is_transient_mysql_error(error: BaseException) -> bool:
+    # mysql.connector reports socket failures as errno 2003/2013; a pool TimeoutError is not a backend failure
+    return getattr(error, 'errno', None) in MYSQL_TRANSIENT_ERRNOS
+
+
+def is_mysql_connectivity_error(error: BaseException) -> bool:
+    return getattr(error, 'errno', None) in MYSQL_CONNECTIVITY_ERRNOS
+
+
+def is_transient_mongo_error(error: BaseException) -> bool:
+    if _is_transient_os_error(error):
+        return True
+    from pymongo.errors import AutoReconnect, ConnectionFailure, NetworkTimeout, PyMongoError
+    if isinstance(error, (AutoReconnect, ConnectionFailure, NetworkTimeout)):
+        return True
+    return isinstance(error, PyMongoError) and error.has_error_label('RetryableWriteError')
+
+
+def is_transient_cassandra_error(error: BaseException) -> bool:
+    if _is_transient_os_error(error):
+        return True
+    from cassandra import OperationTimedOut, ReadTimeout, Unavailable, WriteTimeout
+    from cassandra.cluster import NoHostAvailable
+    return isinstance(error, (NoHostAvailable, OperationTimedOut, Unavailable, ReadTimeout, WriteTimeout))
+
+
+class CircuitBreaker:
+    # closed -> open after failure_threshold consecutive transient failures; one trial call is let through after reset_timeout
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1.")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.__failures = 0
+        self.__opened_at: Optional[float] = None
+        self.__trial_running = False
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.__lock:
+            if self.__opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.__opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def before_call(self) -> None:
+        with self.__lock:
+            if self.__opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self.__opened_at)
+            if remaining > 0 or self.__trial_running:
+                raise CircuitOpenError(f"Circuit is open; failing fast for another {max(remaining, 0):.1f}s.")
+            self.__trial_running = True
+
+    def record_success(self) -> None:
+        with self.__lock:
+            self.__failures = 0
+            self.__opened_at = None
+            self.__trial_running = False
+
+    def record_failure(self) -> None:
+        with self.__lock:
+            self.__failures += 1
+            self.__trial_running = False
+            if self.__opened_at is not None or self.__failures >= self.failure_threshold:
+                self.__opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        self.record_success()
+
+
+class _Attempt:
+    def __init__(self, retrying: "_Retrying", number: int):
+        self.retrying = retrying
+        self.number = number
+        self.succeeded = False
+        self.delay = 0.0
+
+    def __enter__(self) -> "_Attempt":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is None:
+            self.succeeded = True
+            if self.retrying.breaker is not None:
+                self.retrying.breaker.record_success()
+            return False
+        return self.retrying.should_retry(self, exc_value)
+
+
+class _Retrying:
+    def __init__(self, policy: "RetryPolicy", breaker: Optional[CircuitBreaker], classify: Callable[[BaseException], bool],
+                 trips_breaker: Optional[Callable[[BaseException], bool]] = None):
+        self.policy = policy
+        self.breaker = breaker
+        self.classify = classify
+        self.trips_breaker = trips_breaker or classify
+        self.started = time.monotonic()
+
+    def should_retry(self, attempt: _Attempt, error: BaseException) -> bool:
+        if not isinstance(error, Exception) or isinstance(error, CircuitOpenError):
+            return False
+        if self.breaker is not None:
+            # The backend answered, so a permanent error or contention still counts as the backend being up
+            if self.trips_breaker(error):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+        if not self.classify(error):
+            return False
+        policy = self.policy
+        if policy.max_attempts is not None and attempt.number >= policy.max_attempts:
+            return False
+        attempt.delay = policy.backoff(attempt.number)
+        if policy.deadline is not None:
+            remaining = policy.deadline - (time.monotonic() - self.started)
+            if remaining <= 0:
+                return False
+            attempt.delay = min(attempt.delay, remaining)
+        if policy.on_retry is not None:
+            policy.on_retry(error, attempt.number, attempt.delay)
+        return True
+
+    def __iter__(self) -> Iterator[_Attempt]:
+        for number in count(1):
+            if self.breaker is not None:
+                self.breaker.before_call()
+            attempt = _Attempt(self, number)
+            yield attempt
+            if attempt.succeeded:
+                return
+            time.sleep(attempt.delay)
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: Optional[int] = 3, base_delay: float = 0.1, max_delay: float = 10.0,
+                 multiplier: float = 2.0, jitter: bool = True, deadline: Optional[float] = None,
+                 on_retry: Optional[Callable[[BaseException, int, float], None]] = None):
+        if max_attempts is not None and max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+        if max_attempts is None and deadline is None:
+            raise ValueError("Set max_attempts, deadline or both.")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.on_retry = on_retry
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: uniform over [0, capped exponential], so clients that failed together do not retry together
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def attempts(self, breaker: Optional[CircuitBreaker] = None,
+                 classify: Callable[[BaseException], bool] = _is_transient_os_error,
+                 trips_breaker: Optional[Callable[[BaseException], bool]] = None) -> Iterator[_Attempt]:
+        # for attempt in policy.attempts(...):
+        #     with attempt:
+        #         ...  # transient errors are swallowed and retried; anything else propagates
+        # trips_breaker narrows which errors count as breaker failures; by default every transient error does
+        return iter(_Retrying(self, breaker, classify, trips_breaker))
+
+    def call(self, function: Callable[..., Any], *args: Any, breaker: Optional[CircuitBreaker] = None,
+             classify: Callable[[BaseException], bool] = _is_transient_os_error, **kwargs: Any) -> Any:
+        for attempt in self.attempts(breaker, classify):
+            with attempt:
+                return function(*args, **kwargs)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
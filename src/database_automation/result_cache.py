@@ -0,0 +1,88 @@
+from typing import Any, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+from database_automation.instrumentation import payload_size
+import threading
+import time
+
+
+# Fixed per-entry cost added to the payload estimate so many tiny results still count against max_bytes
+ENTRY_OVERHEAD = 256
+
+
+def normalize_query(query: Optional[str]) -> str:
+    # Only surrounding whitespace is trimmed; inner whitespace may sit inside a string literal ('a  b' is not 'a b')
+    return query.strip() if query else ''
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: Optional[float] = 60.0):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1.")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.__entries: OrderedDict = OrderedDict()
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+        self.__stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    @staticmethod
+    def key(backend: str, table: str, query: Optional[str] = None, params: Tuple = ()) -> Tuple[str, str, str, Hashable]:
+        return backend, table, normalize_query(query), tuple(params)
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__stats['misses'] += 1
+                return False, None
+            expires_at, size, value = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove(key)
+                self.__stats['expirations'] += 1
+                self.__stats['misses'] += 1
+                return False, None
+            self.__entries.move_to_end(key)
+            self.__stats['hits'] += 1
+            return True, value
+
+    def put(self, key: Tuple, value: Any) -> None:
+        size = payload_size(value) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            # Caching it would evict everything else
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.__lock:
+            if key in self.__entries:
+                self._remove(key)
+            self.__entries[key] = (expires_at, size, value)
+            self.__bytes += size
+            while self.__bytes > self.max_bytes:
+                oldest = next(iter(self.__entries))
+                self._remove(oldest)
+                self.__stats['evictions'] += 1
+
+    def invalidate(self, backend: str, table: str) -> int:
+        with self.__lock:
+            keys = [key for key in self.__entries if key[0] == backend and key[1] == table]
+            for key in keys:
+                self._remove(key)
+            self.__stats['invalidations'] += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+    def _remove(self, key: Tuple) -> None:
+        self.__bytes -= self.__entries.pop(key)[1]
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self.__lock:
+            lookups = self.__stats['hits'] + self.__stats['misses']
+            return {**self.__stats, 'entries': len(self.__entries), 'bytes': self.__bytes,
+                    'hit_ratio': self.__stats['hits'] / lookups if lookups else 0.0}
+
+    def __len__(self) -> int:
+        return len(self.__entries)
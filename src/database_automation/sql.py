@@ -0,0 +1,49 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from itertools import islice
+from database_automation.conditions import Condition
+
+
+# SQL helpers shared by mysql_crud and async_mysql_crud; nothing here imports a driver, so the async extra works alone
+
+
+def _iter_row_batches(rows: Any, batch_size: int,
+                      dtype: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[List[str], List[Tuple[Any, ...]]]]:
+    if isinstance(rows, str):
+        from database_automation.ingestion import frame_to_rows, iter_batches
+        for chunk in iter_batches(rows, batch_size=batch_size, dtype=dtype):
+            yield frame_to_rows(chunk)
+    elif hasattr(rows, 'itertuples'):
+        from database_automation.ingestion import frame_to_rows
+        for offset in range(0, len(rows), batch_size):
+            yield frame_to_rows(rows.iloc[offset:offset + batch_size])
+    else:
+        iterator = iter(rows)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            columns = list(batch[0].keys())
+            try:
+                values = [tuple(record[column] for column in columns) for record in batch]
+            except KeyError as err:
+                raise ValueError(f"All records in a batch must have the same columns, missing {err}.")
+            yield columns, values
+
+
+def _where(conditions: Union[str, Condition, None],
+           params: Optional[Tuple[Any, ...]] = None) -> Tuple[str, Tuple[Any, ...]]:
+    # conditions is raw SQL (with %s markers filled from params) or a Condition compiled to text plus values
+    if isinstance(conditions, Condition):
+        if params:
+            raise ValueError("params can only be combined with a raw SQL condition string.")
+        text, params = conditions.compile('mysql')
+        return f' WHERE {text}', params
+    if conditions:
+        return f' WHERE {conditions}', tuple(params or ())
+    return '', tuple(params or ())
+
+
+def _rowcount(cursor: Any) -> int:
+    # rowcount is -1 when the driver cannot tell
+    count = getattr(cursor, 'rowcount', -1)
+    return count if isinstance(count, int) and count > 0 else 0
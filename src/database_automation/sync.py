@@ -0,0 +1,148 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from decimal import Decimal
+import datetime
+import json
+import os
+import tempfile
+import threading
+from database_automation.connector import _report_errors, _require_upsert, as_connector
+from database_automation.instrumentation import instrument
+
+
+class SyncError(Exception):
+    def __init__(self, message: str, watermark: Any):
+        super().__init__(message)
+        # The last watermark that every target has acknowledged; the next run resumes after it
+        self.watermark = watermark
+
+
+_DECODERS: Dict[str, Callable[[str], Any]] = {
+    'datetime': datetime.datetime.fromisoformat,
+    'date': datetime.date.fromisoformat,
+    'decimal': Decimal,
+}
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return {'type': 'datetime', 'value': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'type': 'date', 'value': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'type': 'decimal', 'value': str(value)}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        return _DECODERS[value['type']](value['value'])
+    return value
+
+
+class WatermarkStore:
+    # A JSON file of {sync name: watermark}; each write replaces the whole file atomically, so a crash leaves the old state
+    def __init__(self, path: str):
+        self.path = path
+        self.__lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save(self, state: Dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.watermarks-', suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                json.dump(state, f, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def get(self, name: str) -> Any:
+        with self.__lock:
+            return _decode(self._load().get(name))
+
+    def set(self, name: str, value: Any) -> None:
+        with self.__lock:
+            state = self._load()
+            state[name] = _encode(value)
+            self._save(state)
+
+    def reset(self, name: str) -> None:
+        with self.__lock:
+            state = self._load()
+            if state.pop(name, None) is not None:
+                self._save(state)
+
+
+class IncrementalSync:
+    def __init__(self, source: Any, table: str, column: str, targets: List[Tuple[str, Any, str]], store: WatermarkStore,
+                 key: Optional[Union[str, Sequence[str]]] = None, batch_size: int = 1000, name: Optional[str] = None):
+        # source: MySQLConnection; targets: (name, connector or backend, table/collection) as for FanOutWriter
+        # Without a key, column must be unique and only ever increase (an auto-increment id) and rows are appended.
+        # With a key, rows are upserted and rows equal to the watermark are re-read, so an updated_at column works even
+        # when several rows share a timestamp.
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        # Appending is only safe with one target: after a partial failure the next run would append the batch again
+        # to the targets that had already taken it
+        if not key and len(targets) > 1:
+            raise ValueError("Syncing to several targets needs a key, so a batch retried after a failure is upserted.")
+        self.source = source
+        self.table = table
+        self.column = column
+        self.targets = [(target_name, as_connector(connector), target) for target_name, connector, target in targets]
+        if key:
+            for _, connector, _ in self.targets:
+                _require_upsert(connector)
+        self.store = store
+        self.key = key
+        self.batch_size = batch_size
+        self.name = name or table
+
+    def _changes(self, watermark: Any):
+        conditions, params = None, None
+        if watermark is not None:
+            conditions = f"{self.column} {'>=' if self.key else '>'} %s"
+            params = (watermark,)
+        return self.source.select_iter(self.table, conditions, self.batch_size, batches=True, params=params,
+                                       order_by=self.column, dictionary=True)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> Any:
+        for target_name, connector, target in self.targets:
+            if self.key:
+                report = _require_upsert(connector).upsert(target, rows, self.key)
+            else:
+                report = connector.bulk_insert(target, rows)
+            errors = _report_errors(report)
+            if errors:
+                return f"{target_name}: {errors!r}"
+        return None
+
+    def run(self) -> Dict[str, Any]:
+        # Reads only rows past the stored watermark and advances it after each batch every target has accepted
+        watermark = self.store.get(self.name)
+        report: Dict[str, Any] = {'rows': 0, 'batches': 0, 'watermark': watermark}
+        with instrument('sync', 'run', self.table) as event:
+            batches = self._changes(watermark)
+            try:
+                for rows in batches:
+                    error = self._write(rows)
+                    if error is not None:
+                        raise SyncError(f"Sync '{self.name}' stopped at watermark {watermark!r}; {error}", watermark)
+                    watermark = rows[-1][self.column]
+                    self.store.set(self.name, watermark)
+                    report['rows'] += len(rows)
+                    report['batches'] += 1
+                    report['watermark'] = watermark
+            finally:
+                batches.close()
+            event.record(report['rows'])
+        return report
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import MagicMock
+from database_automation.async_cassandra_crud import AsyncCassandraOperation
+
+
+class FakeResponseFuture:
+    def __init__(self, pages=None, error=None):
+        self.pages = list(pages or [[]])
+        self.error = error
+        self.has_more_pages = len(self.pages) > 1
+
+    def add_callbacks(self, callback, errback):
+        self.callback, self.errback = callback, errback
+        self._deliver()
+
+    def start_fetching_next_page(self):
+        self.pages.pop(0)
+        self.has_more_pages = len(self.pages) > 1
+        self._deliver()
+
+    def _deliver(self):
+        if self.error is not None:
+            self.errback(self.error)
+        else:
+            self.callback(self.pages[0])
+
+
+class TestAsyncCassandraOperation(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cassandra = AsyncCassandraOperation(contact_points=['127.0.0.1'], max_concurrency=2)
+        self.session = MagicMock()
+        self.session.keyspace = 'test_keyspace'
+        self.cassandra.operation._CassandraOperation__session = self.session
+
+    async def test_insert_record_awaits_execute_async(self):
+        self.session.execute_async.return_value = FakeResponseFuture()
+
+        await self.cassandra.insert_record('test_table', {'id': 1, 'name': 'John'})
+
+        self.session.prepare.assert_called_once_with('INSERT INTO test_keyspace.test_table (id, name) VALUES (?, ?);')
+        self.session.execute_async.assert_called_once_with(self.session.prepare.return_value, (1, 'John'))
+
+    async def test_execute_propagates_driver_errors(self):
+        self.session.execute_async.return_value = FakeResponseFuture(error=RuntimeError('unavailable'))
+
+        with self.assertRaises(RuntimeError):
+            await self.cassandra.delete_record('test_table', 'id', 1)
+
+    async def test_fetch_iter_follows_pages(self):
+        self.session.execute_async.return_value = FakeResponseFuture(pages=[[(1, 'John')], [(2, 'Jane')]])
+
+        rows = await self.cassandra.fetch_records('test_table', fetch_size=1)
+
+        self.assertEqual(rows, [(1, 'John'), (2, 'Jane')])
+        self.assertEqual(self.session.prepare.return_value.bind.return_value.fetch_size, 1)
+
+    async def test_fetch_pages_returns_paging_state(self):
+        first = MagicMock(current_rows=[(1, 'John')], paging_state=b'p1')
+        second = MagicMock(current_rows=[(2, 'Jane')], paging_state=None)
+        self.session.execute.side_effect = [first, second]
+
+        pages = [page async for page in self.cassandra.fetch_pages('test_table', fetch_size=1)]
+
+        self.assertEqual(pages, [([(1, 'John')], b'p1'), ([(2, 'Jane')], None)])
+
+    async def test_create_table_and_writes_invalidate_the_result_cache(self):
+        cache = MagicMock()
+        self.cassandra.operation.result_cache = cache
+        self.session.execute_async.return_value = FakeResponseFuture()
+
+        await self.cassandra.create_table('test_table', {'id': 'int PRIMARY KEY'})
+        await self.cassandra.insert_record('test_table', {'id': 1})
+        await self.cassandra.delete_record('test_table', 'id', 1)
+
+        self.session.execute.assert_called_once_with('CREATE TABLE IF NOT EXISTS test_keyspace.test_table (id int PRIMARY KEY);')
+        self.assertEqual(cache.invalidate.call_args_list, [(('cassandra', 'test_keyspace.test_table'),)] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
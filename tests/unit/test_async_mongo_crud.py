@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import patch, AsyncMock, MagicMock
+from database_automation.async_mongo_crud import AsyncMongoOperation
+
+
+class AsyncCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        self.iterator = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class TestAsyncMongoOperation(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        patcher = patch('database_automation.async_mongo_crud.AsyncIOMotorClient')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.collection = self.mock_client_class.return_value.__getitem__.return_value.__getitem__.return_value
+        self.collection.insert_one = AsyncMock()
+
+    async def test_insert_record_reuses_client(self):
+        async with AsyncMongoOperation('mongodb://localhost:27017/', 'test_db', max_pool_size=10) as mongo:
+            await mongo.insert_record({'name': 'John'}, 'people')
+            await mongo.insert_record({'name': 'Jane'}, 'people')
+
+        self.mock_client_class.assert_called_once_with('mongodb://localhost:27017/', maxPoolSize=10, minPoolSize=0)
+        self.assertEqual(self.collection.insert_one.await_count, 2)
+        self.mock_client_class.return_value.close.assert_called_once()
+
+    async def test_find_iter_dataframe_chunks(self):
+        self.collection.find.return_value = AsyncCursor([{'_id': i, 'name': f'name{i}'} for i in range(3)])
+
+        async with AsyncMongoOperation('mongodb://localhost:27017/', 'test_db') as mongo:
+            chunks = [chunk async for chunk in mongo.find_iter(collection_name='people', batch_size=2, dataframe=True)]
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(chunks[1]['name'].tolist(), ['name2'])
+
+    async def test_aggregate_iter_passes_hint(self):
+        self.collection.aggregate.return_value = AsyncCursor([{'_id': 'a', 'total': 3}])
+
+        async with AsyncMongoOperation('mongodb://localhost:27017/', 'test_db') as mongo:
+            documents = [document async for document in mongo.aggregate_iter(
+                [{'$group': {'_id': '$kind', 'total': {'$sum': 1}}}], 'people', batch_size=50, hint='kind_1')]
+
+        self.assertEqual(documents, [{'_id': 'a', 'total': 3}])
+        self.collection.aggregate.assert_called_once_with([{'$group': {'_id': '$kind', 'total': {'$sum': 1}}}],
+                                                          batchSize=50, hint='kind_1')
+
+    async def test_bulk_writer_flushes_on_size_and_keeps_failed_batches(self):
+        self.collection.bulk_write = AsyncMock(side_effect=[
+            MagicMock(bulk_api_result={'nUpserted': 2}), ConnectionError('reset'), MagicMock(bulk_api_result={'nUpserted': 1})])
+
+        async with AsyncMongoOperation('mongodb://localhost:27017/', 'test_db') as mongo:
+            writer = mongo.bulk_writer('people', batch_size=2, flush_interval=None)
+            await writer.upsert({'id': 1}, {'name': 'John'})
+            await writer.upsert({'id': 2}, {'name': 'Jane'})
+            await writer.upsert({'id': 3}, {'name': 'Doe'})
+            with self.assertRaises(ConnectionError):
+                await writer.flush()
+            self.assertEqual(len(writer), 1)
+            async with writer:
+                pass
+
+        self.assertEqual(self.collection.bulk_write.await_count, 3)
+        self.assertEqual(len(self.collection.bulk_write.await_args_list[2].args[0]), 1)
+        self.assertEqual(writer.stats['upserted'], 3)
+        self.assertEqual(len(writer), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+from database_automation.async_mysql_crud import AsyncMySQLConnection
+
+
+class TestAsyncMySQLConnection(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.connection = MagicMock()
+        self.connection.commit = AsyncMock()
+        self.cursor = MagicMock()
+        self.cursor.execute = AsyncMock()
+        self.cursor.executemany = AsyncMock()
+        self.cursor.fetchall = AsyncMock(return_value=[(1, 'John')])
+        self.connection.cursor.return_value.__aenter__.return_value = self.cursor
+        self.pool = MagicMock()
+        self.pool.wait_closed = AsyncMock()
+        self.pool.acquire.return_value.__aenter__.return_value = self.connection
+        patcher = patch('database_automation.async_mysql_crud.aiomysql.create_pool', AsyncMock(return_value=self.pool))
+        self.mock_create_pool = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.db_conn = AsyncMySQLConnection(host='127.0.0.1', user='root', password='password',
+                                            database='test_db', pool_size=4)
+
+    async def test_crud_reuses_pool(self):
+        async with self.db_conn:
+            await self.db_conn.insert_record('test_table', {'id': 1, 'name': 'John'})
+            result = await self.db_conn.select_record('test_table', 'id=1')
+
+        self.mock_create_pool.assert_awaited_once()
+        self.assertEqual(self.mock_create_pool.call_args[1]['maxsize'], 4)
+        self.cursor.execute.assert_any_await('INSERT INTO test_table (id, name) VALUES (%s, %s)', (1, 'John'))
+        self.cursor.execute.assert_any_await('SELECT * FROM test_table WHERE id=1')
+        self.assertEqual(result, [(1, 'John')])
+        self.pool.close.assert_called_once()
+        self.pool.wait_closed.assert_awaited_once()
+
+    async def test_concurrent_first_calls_share_one_pool(self):
+        async def slow_create_pool(**kwargs):
+            await asyncio.sleep(0.01)
+            return self.pool
+        self.mock_create_pool.side_effect = slow_create_pool
+
+        await asyncio.gather(*(self.db_conn.insert_record('test_table', {'id': i}) for i in range(5)))
+
+        self.mock_create_pool.assert_awaited_once()
+        self.assertEqual(self.cursor.execute.await_count, 5)
+        await self.db_conn.close()
+
+    async def test_select_iter_streams_rows(self):
+        self.cursor.fetchmany = AsyncMock(side_effect=[[(1, 'John'), (2, 'Jane')], [(3, 'Doe')], []])
+
+        async with self.db_conn:
+            rows = [row async for row in self.db_conn.select_iter('test_table', batch_size=2)]
+
+        self.assertEqual(rows, [(1, 'John'), (2, 'Jane'), (3, 'Doe')])
+        self.cursor.fetchall.assert_not_awaited()
+
+    async def test_bulk_insert_commits_per_batch(self):
+        async with self.db_conn:
+            stats = await self.db_conn.bulk_insert('test_table', [{'id': i} for i in range(3)], batch_size=2)
+
+        self.assertEqual(stats, {'rows': 3, 'batches': 2})
+        self.assertEqual(self.connection.commit.await_count, 2)
+
+    async def test_bulk_insert_reads_rows_off_the_event_loop(self):
+        threads = []
+
+        def rows():
+            for i in range(3):
+                threads.append(threading.current_thread())
+                yield {'id': i}
+
+        async with self.db_conn:
+            await self.db_conn.bulk_insert('test_table', rows(), batch_size=2)
+
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.main_thread(), threads)
+
+
+if __name__ == '__main__':
+    unittest.main()
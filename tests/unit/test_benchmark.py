@@ -0,0 +1,37 @@
+import json
+import os
+import tempfile
+import unittest
+from database_automation import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_generate_rows_is_deterministic(self):
+        self.assertEqual(benchmark.generate_rows(50, seed=7), benchmark.generate_rows(50, seed=7))
+        self.assertNotEqual(benchmark.generate_rows(50, seed=7), benchmark.generate_rows(50, seed=8))
+
+    def test_summarize_percentiles(self):
+        stats = benchmark.summarize([0.001 * i for i in range(1, 101)], rows=100)
+        self.assertAlmostEqual(stats['p50_ms'], 51.0)
+        self.assertAlmostEqual(stats['p99_ms'], 99.0)
+        self.assertEqual(stats['calls'], 100)
+
+    def test_main_writes_results_for_every_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            self.assertEqual(benchmark.main(['--rows', '60', '--single', '10', '--batch-size', '25', '--repeat', '3',
+                                             '--output', output]), 0)
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(report['meta']['rows'], 60)
+        self.assertEqual(set(report['results']), set(benchmark.BACKENDS))
+        for backend in benchmark.BACKENDS:
+            self.assertEqual(set(report['results'][backend]), {'single_insert', 'bulk_insert', 'scan', 'update'})
+            for operation in ('bulk_insert', 'scan'):
+                # Percentiles come from one sample per run
+                self.assertEqual(report['results'][backend][operation]['calls'], 3)
+                self.assertEqual(report['results'][backend][operation]['rows'], 180)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+import os
+import tempfile
+import unittest
+import uuid
+from unittest.mock import patch, MagicMock
+from cassandra.query import UNSET_VALUE
+from database_automation.cassandra_crud import CassandraOperation
+from database_automation.conditions import eq, in_
+
+
+class TestCassandraOperation(unittest.TestCase):
+
+    def setUp(self):
+        self.cassandra = CassandraOperation(contact_points=['127.0.0.1'], statement_cache_size=2)
+        self.session = MagicMock()
+        self.session.keyspace = 'test_keyspace'
+        self.session.prepare.side_effect = lambda query: MagicMock(query=query)
+        self.cassandra._CassandraOperation__session = self.session
+
+    def test_insert_record_binds_prepared_statement(self):
+        self.cassandra.insert_record('test_table', {'id': 1, 'name': 'John'})
+        self.cassandra.insert_record('test_table', {'id': 2, 'name': 'Jane'})
+
+        self.session.prepare.assert_called_once_with(
+            'INSERT INTO test_keyspace.test_table (id, name) VALUES (?, ?);'
+        )
+        statement = self.session.execute.call_args[0][0]
+        self.assertEqual(statement.query, 'INSERT INTO test_keyspace.test_table (id, name) VALUES (?, ?);')
+        self.session.execute.assert_called_with(statement, (2, 'Jane'))
+
+    def test_delete_record_binds_condition_value(self):
+        self.cassandra.delete_record('test_table', 'id', 1)
+
+        self.session.prepare.assert_called_once_with('DELETE FROM test_keyspace.test_table WHERE id = ?;')
+        self.assertEqual(self.session.execute.call_args[0][1], (1,))
+
+    def test_statement_cache_evicts_least_recently_used(self):
+        self.cassandra.insert_record('test_table', {'id': 1})
+        self.cassandra.insert_record('test_table', {'name': 'John'})
+        self.cassandra.insert_record('test_table', {'id': 2})
+        self.cassandra.delete_record('test_table', 'id', 1)
+        self.cassandra.insert_record('test_table', {'name': 'Jane'})
+
+        self.assertEqual(self.session.prepare.call_count, 4)
+
+    def _write_csv(self, content):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    @patch('cassandra.concurrent.execute_concurrent')
+    def test_bulk_insert_reports_failed_rows(self, mock_execute_concurrent):
+        path = self._write_csv('id,name\n1,John\n2,\n3,Doe\n')
+        error = RuntimeError('write timeout')
+
+        def execute(session, statements, **kwargs):
+            statements = list(statements)
+            self.assertEqual([params for _, params in statements], [(1, 'John'), (2, UNSET_VALUE), (3, 'Doe')])
+            self.assertEqual(kwargs['concurrency'], 8)
+            self.assertFalse(kwargs['raise_on_first_error'])
+            return iter([(True, None), (False, error), (True, None)])
+        mock_execute_concurrent.side_effect = execute
+
+        report = self.cassandra.bulk_insert(path, 'test_table', concurrency=8)
+
+        self.assertEqual(report['rows'], 2)
+        self.assertEqual(report['failed'], [{'row': 1, 'error': repr(error)}])
+
+    @patch('cassandra.query.BatchStatement')
+    @patch('cassandra.concurrent.execute_concurrent')
+    def test_bulk_insert_groups_rows_by_partition_key(self, mock_execute_concurrent, mock_batch):
+        path = self._write_csv('region,id\neu,1\nus,2\neu,3\neu,4\n')
+        mock_execute_concurrent.side_effect = lambda session, statements, **kwargs: iter(
+            [(True, None) for _ in list(statements)]
+        )
+
+        report = self.cassandra.bulk_insert(path, 'test_table', partition_key='region', batch_size=2)
+
+        self.assertEqual(report, {'rows': 4, 'failed': []})
+        added = [call[0][1] for call in mock_batch.return_value.add.call_args_list]
+        self.assertEqual(added, [('eu', 1), ('eu', 3), ('eu', 4), ('us', 2)])
+
+    @patch('cassandra.concurrent.execute_concurrent')
+    def test_bulk_insert_prepares_each_chunk_for_its_own_columns(self, mock_execute_concurrent):
+        handle, path = tempfile.mkstemp(suffix='.jsonl')
+        with os.fdopen(handle, 'w') as f:
+            f.write('{"id": 1, "name": "a"}\n{"name": "b", "id": 2}\n')
+        self.addCleanup(os.remove, path)
+        bound = []
+
+        def execute(session, statements, **kwargs):
+            bound.extend((statement.query, params) for statement, params in statements)
+            return iter([(True, None) for _ in bound])
+        mock_execute_concurrent.side_effect = execute
+
+        report = self.cassandra.bulk_insert(path, 'test_table', chunk_size=1)
+
+        self.assertEqual(report, {'rows': 2, 'failed': []})
+        self.assertEqual(bound, [
+            ('INSERT INTO test_keyspace.test_table (id, name) VALUES (?, ?);', (1, 'a')),
+            ('INSERT INTO test_keyspace.test_table (name, id) VALUES (?, ?);', ('b', 2)),
+        ])
+
+    @patch('cassandra.concurrent.execute_concurrent')
+    def test_insert_rows_binds_each_record_and_invalidates_cache(self, mock_execute_concurrent):
+        from database_automation.result_cache import ResultCache
+        self.cassandra.result_cache = ResultCache()
+        self.cassandra.result_cache.put(self.cassandra.result_cache.key('cassandra', 'test_keyspace.test_table', 'SELECT *'), [])
+        bound = []
+
+        def execute(session, statements, **kwargs):
+            bound.extend((statement.query, params) for statement, params in statements)
+            return iter([(True, None) for _ in bound])
+        mock_execute_concurrent.side_effect = execute
+
+        report = self.cassandra.insert_rows('test_table', [{'id': 1, 'name': 'a'}, {'name': 'b', 'id': 2}])
+
+        self.assertEqual(report, {'rows': 2, 'failed': []})
+        self.assertEqual([params for _, params in bound], [(1, 'a'), ('b', 2)])
+        self.assertEqual(bound[1][0], 'INSERT INTO test_keyspace.test_table (name, id) VALUES (?, ?);')
+        self.assertEqual(len(self.cassandra.result_cache), 0)
+
+    def test_fetch_pages_resumes_from_paging_state(self):
+        first, second = MagicMock(), MagicMock()
+        first.current_rows, first.paging_state = [(1, 'John')], b'page-2'
+        second.current_rows, second.paging_state = [(2, 'Jane')], None
+        self.session.execute.side_effect = [first, second]
+
+        pages = list(self.cassandra.fetch_pages('test_table', columns=['id', 'name'], where={'region': 'eu'},
+                                                fetch_size=1, paging_state=b'page-1'))
+
+        self.session.prepare.assert_called_once_with('SELECT id, name FROM test_keyspace.test_table WHERE region = ?;')
+        self.assertEqual(pages, [([(1, 'John')], b'page-2'), ([(2, 'Jane')], None)])
+        paging_states = [call[1]['paging_state'] for call in self.session.execute.call_args_list]
+        self.assertEqual(paging_states, [b'page-1', b'page-2'])
+
+    def test_fetch_pages_limits_scan_to_token_range(self):
+        result = MagicMock()
+        result.current_rows, result.paging_state = [(1, 'eu')], None
+        self.session.execute.return_value = result
+        statement = MagicMock()
+        self.session.prepare.side_effect = None
+        self.session.prepare.return_value = statement
+
+        list(self.cassandra.fetch_pages('test_table', token_range=(-10, 10), partition_key=['id', 'region']))
+
+        query = 'SELECT * FROM test_keyspace.test_table WHERE token(id, region) > ? AND token(id, region) <= ?;'
+        self.session.prepare.assert_called_once_with(query)
+        statement.bind.assert_called_once_with((-10, 10))
+        with self.assertRaises(ValueError):
+            next(self.cassandra.fetch_pages('test_table', token_range=(-10, 10)))
+
+    def test_fetch_iter_dataframe_chunks(self):
+        result = MagicMock()
+        result.current_rows, result.paging_state = [(1, 'John'), (2, 'Jane')], None
+        result.column_names = ['id', 'name']
+        self.session.execute.return_value = result
+
+        chunks = list(self.cassandra.fetch_iter('test_table', dataframe=True))
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0]['name'].tolist(), ['John', 'Jane'])
+
+    def test_condition_statements_are_prepared_once(self):
+        with patch.object(self.cassandra, 'get_table_schema', return_value={'id': 'int', 'region': 'text', 'name': 'text'}):
+            self.cassandra.update_record('test_table', eq('region', 'eu') & in_('id', [1, 2]), {'name': 'John'})
+            self.cassandra.update_record('test_table', eq('region', 'us') & in_('id', [3, 4, 5]), {'name': 'Jane'})
+            with self.assertRaises(ValueError):
+                self.cassandra.update_record('test_table', in_('id', ['x']), {'name': 'Doe'})
+        self.cassandra.delete_record('test_table', in_('id', [1, 2]))
+
+        self.assertEqual([call.args[0] for call in self.session.prepare.call_args_list], [
+            'UPDATE test_keyspace.test_table SET name = ? WHERE region = ? AND id IN ?;',
+            'DELETE FROM test_keyspace.test_table WHERE id IN ?;',
+        ])
+        self.assertEqual([call.args[1] for call in self.session.execute.call_args_list],
+                         [('John', 'eu', [1, 2]), ('Jane', 'us', [3, 4, 5]), ([1, 2],)])
+
+    def test_update_record_needs_update_values(self):
+        for args in ((eq('id', 1),), (eq('id', 1), None, {}), ('id', 1)):
+            with self.subTest(args=args), self.assertRaises(ValueError):
+                self.cassandra.update_record('test_table', *args)
+        self.session.execute.assert_not_called()
+
+    def test_update_record_caches_table_schema(self):
+        with patch.object(self.cassandra, 'get_table_schema', return_value={'id': 'int', 'name': 'text'}) as mock_schema:
+            self.cassandra.update_record('test_table', 'id', 1, {'name': 'John'})
+            self.cassandra.update_record('test_table', 'id', 2, {'name': 'Jane'})
+            mock_schema.assert_called_once_with('test_table')
+
+            self.cassandra.invalidate_schema_cache('test_table')
+            self.cassandra.update_record('test_table', 'id', 3, {'name': 'Doe'})
+            self.assertEqual(mock_schema.call_count, 2)
+
+    def test_update_record_schema_cache_ttl(self):
+        self.cassandra.schema_cache_ttl = 0
+        with patch.object(self.cassandra, 'get_table_schema', return_value={'id': 'int', 'name': 'text'}) as mock_schema:
+            self.cassandra.update_record('test_table', 'id', 1, {'name': 'John'})
+            self.cassandra.update_record('test_table', 'id', 2, {'name': 'Jane'})
+            self.assertEqual(mock_schema.call_count, 2)
+
+    def test_update_record_rejects_mismatched_types(self):
+        schema = {'id': 'uuid', 'active': 'boolean', 'tags': 'set<text>'}
+        with patch.object(self.cassandra, 'get_table_schema', return_value=schema):
+            with self.assertRaises(ValueError):
+                self.cassandra.update_record('test_table', 'id', 'not-a-uuid', {'active': True})
+            with self.assertRaises(ValueError):
+                self.cassandra.update_record('test_table', 'id', uuid.uuid4(), {'active': 1})
+            self.cassandra.update_record('test_table', 'id', uuid.uuid4(), {'active': True, 'tags': {'a'}})
+        self.session.execute.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from database_automation.conditions import and_, between, eq, from_dict, gt, in_, le, ne, or_
+
+
+class TestConditions(unittest.TestCase):
+
+    def test_statement_text_does_not_depend_on_values(self):
+        first = (eq('region', 'eu') & gt('age', 30)).compile()
+        second = (eq('region', 'us') & gt('age', 65)).compile()
+
+        self.assertEqual(first, ('region = %s AND age > %s', ('eu', 30)))
+        self.assertEqual(first[0], second[0])
+        self.assertEqual(second[1], ('us', 65))
+
+    def test_mixed_groups_are_parenthesized(self):
+        condition = or_(eq('a', 1), and_(eq('b', 2), le('c', 3))) & ne('d', None)
+
+        self.assertEqual(condition.compile(), ('(a = %s OR (b = %s AND c <= %s)) AND d IS NOT NULL', (1, 2, 3)))
+
+    def test_in_and_between(self):
+        self.assertEqual(in_('id', [1, 2, 3]).compile(), ('id IN (%s, %s, %s)', (1, 2, 3)))
+        self.assertEqual(in_('id', []).compile(), ('1 = 0', ()))
+        self.assertEqual(between('age', 18, 30).compile('cql'), ('age >= ? AND age <= ?', (18, 30)))
+
+    def test_cql_binds_in_lists_to_one_marker(self):
+        condition = from_dict({'region': 'eu'}) & in_('id', [1, 2])
+
+        self.assertEqual(condition.compile('cql'), ('region = ? AND id IN ?', ('eu', [1, 2])))
+        self.assertEqual(list(condition.terms()), [('region', 'eu'), ('id', 1), ('id', 2)])
+        with self.assertRaises(ValueError):
+            (eq('a', 1) | eq('b', 2)).compile('cql')
+
+    def test_rejects_unsafe_column_names(self):
+        for column in ('id; DROP TABLE users', 'name = name OR 1', ''):
+            with self.assertRaises(ValueError):
+                eq(column, 1)
+        self.assertEqual(eq('people.id', 1).compile(), ('people.id = %s', (1,)))
+
+
+if __name__ == '__main__':
+    unittest.main()
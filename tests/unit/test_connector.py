@@ -0,0 +1,268 @@
+import gc
+import queue
+import threading
+import time
+import unittest
+import weakref
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock
+from database_automation.connector import (
+    BufferedWriter, CassandraConnector, Connector, FanOutWriter, MongoConnector, MySQLConnector, as_connector
+)
+from database_automation.mongo_crud import MongoBulkWriter
+from database_automation.mysql_crud import MySQLConnection
+
+
+class TestConnectorAdapters(unittest.TestCase):
+
+    def test_adapters_satisfy_protocol(self):
+        for adapter in (MySQLConnector, MongoConnector, CassandraConnector):
+            self.assertIsInstance(adapter(MagicMock()), Connector)
+
+    def test_as_connector_picks_adapter(self):
+        connector = as_connector(MySQLConnection('127.0.0.1', 'root', 'password'), batch_size=10)
+        self.assertIsInstance(connector, MySQLConnector)
+        self.assertEqual(connector.batch_size, 10)
+        with self.assertRaises(TypeError):
+            as_connector(object())
+
+    def test_mysql_adapter_maps_signatures(self):
+        connection = MagicMock()
+        connector = MySQLConnector(connection, batch_size=500)
+
+        connector.insert('people', {'id': 1})
+        connector.bulk_insert('people', [{'id': 2}])
+        connector.update('people', {'name': 'Doe'}, 'id=1')
+        connector.delete('people', 'id=1')
+
+        connection.insert_record.assert_called_once_with('people', {'id': 1})
+        connection.bulk_insert.assert_called_once_with('people', [{'id': 2}], batch_size=500)
+        connection.update_record.assert_called_once_with('people', {'name': 'Doe'}, 'id=1')
+        connection.delete_record.assert_called_once_with('people', 'id=1')
+
+    def test_mongo_adapter_uses_public_operation_methods(self):
+        operation = MagicMock()
+        connector = MongoConnector(operation, batch_size=500)
+
+        connector.bulk_insert('people', [{'id': 2}])
+        connector.update('people', {'name': 'Doe'}, {'id': 1})
+        connector.delete('people', {'id': 1})
+
+        operation.insert_rows.assert_called_once_with([{'id': 2}], 'people', batch_size=500)
+        operation.update_many.assert_called_once_with({'id': 1}, {'name': 'Doe'}, 'people')
+        operation.delete_many.assert_called_once_with({'id': 1}, 'people')
+        operation.create_collection.assert_not_called()
+
+    def test_cassandra_adapter_requires_single_condition(self):
+        operation = MagicMock()
+        connector = CassandraConnector(operation)
+
+        connector.update('people', {'name': 'Doe'}, {'id': 1})
+        operation.update_record.assert_called_once_with('people', 'id', 1, {'name': 'Doe'})
+        with self.assertRaises(ValueError):
+            connector.delete('people', {'id': 1, 'name': 'Doe'})
+
+    def test_write_frame_uses_bulk_paths(self):
+        frame = pd.DataFrame({'id': [1, 2, 3], 'score': [1.5, np.nan, 2.5]})
+
+        mysql = MagicMock()
+        MySQLConnector(mysql, batch_size=2).write_frame(frame, 'people')
+        mysql.bulk_insert.assert_called_once_with('people', frame, batch_size=2)
+
+        mongo = MagicMock()
+        MongoConnector(mongo, batch_size=2).write_frame(frame, 'people')
+        mongo.insert_rows.assert_called_once_with(frame, 'people', batch_size=2)
+
+        cassandra = MagicMock()
+        CassandraConnector(cassandra, concurrency=8).write_frame(frame, 'people')
+        cassandra.insert_rows.assert_called_once_with('people', frame, concurrency=8)
+
+    def test_upsert_routes_to_each_backend(self):
+        mysql = MagicMock()
+        MySQLConnector(mysql, batch_size=10).upsert('people', [{'id': 1}], 'id')
+        mysql.bulk_insert.assert_called_once_with('people', [{'id': 1}], batch_size=10, upsert=True)
+
+        collection = MagicMock()
+        collection.bulk_write.return_value.bulk_api_result = {'nUpserted': 1, 'nMatched': 1}
+        mongo = MagicMock()
+        mongo.bulk_writer.side_effect = lambda target, batch_size, flush_interval: MongoBulkWriter(collection, batch_size, flush_interval)
+        stats = MongoConnector(mongo).upsert('people', [{'id': 1, 'name': 'John'}, {'id': 2, 'name': 'Jane'}], ['id'])
+        operations = collection.bulk_write.call_args.args[0]
+        self.assertEqual([operation._filter for operation in operations], [{'id': 1}, {'id': 2}])
+        self.assertEqual((stats['upserted'], stats['matched']), (1, 1))
+
+        cassandra = MagicMock()
+        CassandraConnector(cassandra).upsert('people', [{'id': 1}], 'id')
+        cassandra.insert_rows.assert_called_once_with('people', [{'id': 1}], concurrency=50)
+
+
+class TestFanOutWriter(unittest.TestCase):
+
+    def test_writes_every_batch_to_every_backend(self):
+        written = {'mysql': [], 'mongo': []}
+        lock = threading.Lock()
+
+        def backend(name):
+            connector = MagicMock()
+
+            def bulk_insert(target, rows):
+                with lock:
+                    written[name].append((target, list(rows)))
+            connector.bulk_insert.side_effect = bulk_insert
+            return connector
+
+        rows = ({'id': i} for i in range(5))
+        writer = FanOutWriter([('mysql', backend('mysql'), 'people'), ('mongo', backend('mongo'), 'people_docs')],
+                              batch_size=2, max_pending_batches=1)
+
+        reports = writer.write(rows)
+
+        self.assertEqual(reports['mysql'], {'rows': 5, 'batches': 3, 'errors': []})
+        self.assertEqual([target for target, _ in written['mongo']], ['people_docs'] * 3)
+        self.assertEqual([row for _, batch in written['mysql'] for row in batch], [{'id': i} for i in range(5)])
+
+    def test_backend_errors_are_reported_per_batch(self):
+        failing = MagicMock()
+        failing.bulk_insert.side_effect = [RuntimeError('down'), None]
+        healthy = MagicMock()
+
+        reports = FanOutWriter([('failing', failing, 't'), ('healthy', healthy, 't')], batch_size=1).write([{'id': 1}, {'id': 2}])
+
+        self.assertEqual(reports['failing']['rows'], 1)
+        self.assertEqual(reports['failing']['errors'], [{'batch': 0, 'error': repr(RuntimeError('down'))}])
+        self.assertEqual(reports['healthy']['rows'], 2)
+
+    def test_failures_in_returned_reports_are_counted(self):
+        # Mongo and Cassandra return their failures instead of raising
+        mongo = MagicMock()
+        mongo.bulk_insert.return_value = {'inserted': 1, 'errors': [{'batch': 0, 'inserted': 1, 'error': ['E11000']}]}
+        cassandra = MagicMock()
+        cassandra.bulk_insert.return_value = {'rows': 2, 'failed': []}
+
+        reports = FanOutWriter([('mongo', mongo, 'c'), ('cassandra', cassandra, 't')], batch_size=2).write(
+            [{'id': 1}, {'id': 1}])
+
+        self.assertEqual(reports['mongo']['rows'], 1)
+        self.assertEqual(reports['mongo']['errors'], [{'batch': 0, 'error': [{'batch': 0, 'inserted': 1, 'error': ['E11000']}]}])
+        self.assertEqual(reports['cassandra'], {'rows': 2, 'batches': 1, 'errors': []})
+
+
+class TestBufferedWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = MagicMock()
+        self.backend.bulk_insert.return_value = {'rows': 0}
+
+    def written(self):
+        return [(call.args[0], call.args[1]) for call in self.backend.bulk_insert.call_args_list]
+
+    def test_groups_records_by_size_and_target(self):
+        with BufferedWriter(self.backend, batch_size=2, max_latency=10) as writer:
+            for i in range(3):
+                writer.insert('events', {'id': i})
+            writer.insert('audit', {'id': 9})
+            writer.flush()
+            self.assertEqual(writer.pending, 0)
+
+        self.assertEqual(self.written(), [
+            ('events', [{'id': 0}, {'id': 1}]),
+            ('events', [{'id': 2}]),
+            ('audit', [{'id': 9}]),
+        ])
+        self.assertEqual(writer.stats, {'enqueued': 4, 'written': 4, 'failed': 0, 'batches': 3})
+
+    def test_partial_batch_is_written_after_max_latency(self):
+        writer = BufferedWriter(self.backend, batch_size=100, max_latency=0.01)
+        self.addCleanup(writer.close)
+        writer.insert('events', {'id': 1})
+
+        deadline = time.monotonic() + 2
+        while not self.backend.bulk_insert.called and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertEqual(self.written(), [('events', [{'id': 1}])])
+
+    def test_full_queue_applies_back_pressure(self):
+        release = threading.Event()
+        self.backend.bulk_insert.side_effect = lambda target, rows: release.wait()
+        writer = BufferedWriter(self.backend, max_queue=1, batch_size=1, max_latency=0, put_timeout=0.05)
+
+        writer.insert('events', {'id': 1})
+        deadline = time.monotonic() + 2
+        while not self.backend.bulk_insert.called and time.monotonic() < deadline:
+            time.sleep(0.005)
+        writer.insert('events', {'id': 2})
+        with self.assertRaises(queue.Full):
+            writer.insert('events', {'id': 3})
+
+        release.set()
+        writer.close()
+        self.assertEqual([rows for _, rows in self.written()], [[{'id': 1}], [{'id': 2}]])
+
+    def test_failed_batches_go_to_on_error(self):
+        failures = []
+        self.backend.bulk_insert.side_effect = [RuntimeError('down'), {'rows': 1, 'failed': []}]
+        with BufferedWriter(self.backend, batch_size=1, max_latency=0,
+                            on_error=lambda target, rows, error: failures.append((target, rows, error))) as writer:
+            writer.insert('events', {'id': 1})
+            writer.insert('events', {'id': 2})
+
+        self.assertEqual([(target, rows) for target, rows, _ in failures], [('events', [{'id': 1}])])
+        self.assertIsInstance(failures[0][2], RuntimeError)
+        self.assertEqual((writer.stats['written'], writer.stats['failed']), (1, 1))
+
+    def test_partial_failures_pass_only_failed_records(self):
+        failures = []
+        write_errors = [{'index': 1, 'code': 11000}]
+        self.backend.bulk_insert.side_effect = [
+            {'inserted': 2, 'errors': [{'batch': 0, 'offset': 0, 'size': 3, 'inserted': 2, 'error': write_errors}]},
+            {'rows': 2, 'failed': [{'row': 0, 'error': 'timeout'}]},
+        ]
+        with BufferedWriter(self.backend, batch_size=3, max_latency=10,
+                            on_error=lambda target, rows, error: failures.append((target, rows))) as writer:
+            for i in range(3):
+                writer.insert('events', {'id': i})
+            writer.flush()
+            for i in range(3, 6):
+                writer.insert('events', {'id': i})
+
+        self.assertEqual(failures, [('events', [{'id': 1}]), ('events', [{'id': 3}])])
+        self.assertEqual(writer.stats, {'enqueued': 6, 'written': 4, 'failed': 2, 'batches': 2})
+        self.assertEqual(writer.last_error, [{'row': 0, 'error': 'timeout'}])
+
+    def test_failing_on_error_callback_warns(self):
+        self.backend.bulk_insert.side_effect = RuntimeError('down')
+
+        def on_error(target, rows, error):
+            raise ValueError('callback broke')
+        with self.assertWarns(RuntimeWarning):
+            with BufferedWriter(self.backend, batch_size=1, max_latency=0, on_error=on_error) as writer:
+                writer.insert('events', {'id': 1})
+
+    def test_close_drains_the_queue(self):
+        writer = BufferedWriter(self.backend, batch_size=1000, max_latency=60)
+        for i in range(50):
+            writer.insert('events', {'id': i})
+        writer.close()
+
+        self.assertEqual(sum(len(rows) for _, rows in self.written()), 50)
+        with self.assertRaises(RuntimeError):
+            writer.insert('events', {'id': 50})
+
+    def test_unclosed_writer_is_collected_after_writing_its_records(self):
+        writer = BufferedWriter(self.backend, batch_size=1000, max_latency=0)
+        writer.insert('events', {'id': 1})
+        writer.flush()
+        thread = writer._BufferedWriter__thread
+        collected = weakref.ref(writer)
+        del writer
+        gc.collect()
+
+        self.assertIsNone(collected())
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(self.written(), [('events', [{'id': 1}])])
+
+
+if __name__ == '__main__':
+    unittest.main()
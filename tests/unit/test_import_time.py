@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+HEAVY_MODULES = ('pandas', 'numpy', 'pymongo', 'cassandra.cluster')
+
+# Counted rather than timed, so slow CI runners cannot make this flaky. Beyond its own driver each module pulls
+# in under 80 modules; pandas alone is over 500, pymongo and cassandra.cluster about 300 each
+MODULE_BUDGET = 100
+
+
+def _import_report(module: str, driver: str = '', blocked: str = '') -> tuple:
+    # driver is imported first so its modules are not counted; blocked is made unimportable, as if not installed
+    code = (
+        "import sys\n"
+        f"if {blocked!r}:\n"
+        f"    sys.modules[{blocked!r}] = None\n"
+        f"if {driver!r}:\n"
+        f"    __import__({driver!r})\n"
+        "before = set(sys.modules)\n"
+        f"import {module}\n"
+        "added = len(set(sys.modules) - before)\n"
+        f"print(added, ','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+    # A fresh interpreter, so modules already imported by other tests do not hide what the import pulls in
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    output = subprocess.check_output([sys.executable, '-c', code], text=True, env=env)
+    added, loaded = output.strip().partition(' ')[::2]
+    return int(added), [name for name in loaded.split(',') if name]
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_backend_modules_do_not_load_heavy_dependencies(self):
+        for module, driver in (('database_automation.mysql_crud', 'mysql.connector'),
+                               ('database_automation.mongo_crud', ''),
+                               ('database_automation.cassandra_crud', ''),
+                               ('database_automation.ingestion', ''),
+                               ('database_automation.connector', '')):
+            with self.subTest(module=module):
+                added, loaded = _import_report(module, driver)
+                self.assertEqual(loaded, [])
+                self.assertLess(added, MODULE_BUDGET)
+
+    def test_async_mysql_does_not_need_the_blocking_driver(self):
+        # The async extra installs aiomysql only
+        added, loaded = _import_report('database_automation.async_mysql_crud', 'aiomysql', blocked='mysql')
+        self.assertEqual(loaded, [])
+        self.assertLess(added, MODULE_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from database_automation.ingestion import frame_to_rows, iter_batches
+
+
+class TestIterBatches(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.frame = pd.DataFrame({'id': [1, 2, 3, 4, 5], 'name': ['a', 'b', 'c', 'd', None]})
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def assert_batches(self, path, **options):
+        batches = list(iter_batches(path, batch_size=2, **options))
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(pd.concat(batches)['id'].tolist(), [1, 2, 3, 4, 5])
+        return batches
+
+    def test_csv_with_dtype(self):
+        self.frame.to_csv(self.path('data.csv'), index=False)
+        batches = self.assert_batches(self.path('data.csv'), dtype={'id': 'int32'})
+        self.assertEqual(str(batches[0]['id'].dtype), 'int32')
+
+    def test_jsonl(self):
+        self.frame.to_json(self.path('data.jsonl'), orient='records', lines=True)
+        self.assert_batches(self.path('data.jsonl'))
+
+    def test_parquet(self):
+        self.frame.to_parquet(self.path('data.parquet'), index=False, row_group_size=2)
+        self.assert_batches(self.path('data.parquet'), dtype={'id': 'int16'})
+
+    def test_excel(self):
+        self.frame.to_excel(self.path('data.xlsx'), index=False)
+        batches = self.assert_batches(self.path('data.xlsx'))
+        self.assertEqual(list(batches[0].columns), ['id', 'name'])
+
+    def test_unsupported_extension(self):
+        with self.assertRaises(ValueError):
+            iter_batches(self.path('data.txt'))
+
+    def test_frame_to_rows_converts_nan_to_none(self):
+        columns, rows = frame_to_rows(self.frame.tail(1))
+        self.assertEqual(columns, ['id', 'name'])
+        self.assertEqual(rows, [(5, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import mysql.connector
+from database_automation import instrumentation
+from database_automation.instrumentation import HistogramCollector, add_hook, clear_hooks, instrument, prometheus_text
+from database_automation.mysql_crud import MySQLConnection
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.events = []
+        add_hook(self.events.append)
+
+    def tearDown(self):
+        clear_hooks()
+
+    def test_instrument_records_phases_rows_and_bytes(self):
+        with instrument('mysql', 'insert_record', 'users') as event:
+            with event.phase('execute'):
+                pass
+            event.record(1, ('alice', 30))
+        event = self.events[0]
+        self.assertEqual((event.backend, event.operation, event.target), ('mysql', 'insert_record', 'users'))
+        self.assertEqual(event.rows, 1)
+        self.assertEqual(event.bytes, 13)
+        self.assertIn('execute', event.timings)
+        self.assertIsNone(event.error)
+
+    def test_instrument_records_errors(self):
+        with self.assertRaises(ValueError):
+            with instrument('mongo', 'insert_record', 'people'):
+                raise ValueError("boom")
+        self.assertIsInstance(self.events[0].error, ValueError)
+
+    def test_no_events_without_hooks(self):
+        clear_hooks()
+        with instrument('mysql', 'select_record', 'users') as event:
+            event.record(2, [('a',), ('b',)])
+        self.assertFalse(event.enabled)
+        self.assertEqual(event.bytes, 0)
+        self.assertEqual(self.events, [])
+
+    def test_failing_hook_does_not_break_the_operation(self):
+        add_hook(MagicMock(side_effect=RuntimeError("collector down")))
+        with self.assertWarns(RuntimeWarning):
+            with instrument('cassandra', 'delete_record', 'users'):
+                pass
+        self.assertEqual(len(self.events), 1)
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_mysql_operations_emit_events(self, mock_connect):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(1, 'alice'), (2, 'bob')]
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        connection = MySQLConnection('127.0.0.1', 'root', 'password', 'test_db')
+
+        connection.insert_record('users', {'id': 1, 'name': 'alice'})
+        connection.select_record('users')
+        mock_cursor.execute.side_effect = mysql.connector.Error("gone")
+        with self.assertRaises(Exception):
+            connection.delete_record('users', 'id = 1')
+
+        self.assertEqual([event.operation for event in self.events], ['insert_record', 'select_record', 'delete_record'])
+        self.assertEqual(self.events[1].rows, 2)
+        self.assertEqual(set(self.events[1].timings), {'connect', 'execute', 'fetch'})
+        self.assertIsNotNone(self.events[2].error)
+
+
+class TestHistogramCollector(unittest.TestCase):
+
+    def tearDown(self):
+        clear_hooks()
+
+    def test_collects_and_exports_prometheus_text(self):
+        collector = add_hook(HistogramCollector(buckets=(0.01, 0.1, 1.0)))
+        for duration in (0.005, 0.05, 0.5):
+            collector(instrumentation.OperationEvent('mysql', 'select_record', 'users', rows=10, bytes=100,
+                                                     duration=duration, timings={'fetch': duration / 2}))
+        collector(instrumentation.OperationEvent('mysql', 'select_record', 'users', duration=2.0, error=RuntimeError()))
+
+        (snapshot,) = collector.snapshot()
+        self.assertEqual(snapshot['duration']['count'], 4)
+        self.assertEqual(snapshot['rows'], 30)
+        self.assertEqual(snapshot['errors'], 1)
+        self.assertEqual(snapshot['duration']['p50'], 0.1)
+
+        text = prometheus_text(collector)
+        labels = 'backend="mysql",operation="select_record",target="users"'
+        self.assertIn(f'dblinkpro_operation_duration_seconds_bucket{{{labels},le="0.01"}} 1', text)
+        self.assertIn(f'dblinkpro_operation_duration_seconds_bucket{{{labels},le="+Inf"}} 4', text)
+        self.assertIn(f'dblinkpro_operation_duration_seconds_count{{{labels}}} 4', text)
+        self.assertIn(f'dblinkpro_operation_phase_seconds_count{{{labels},phase="fetch"}} 3', text)
+        self.assertIn(f'dblinkpro_operation_errors_total{{{labels}}} 1', text)
+        self.assertEqual(text, collector.to_prometheus())
+
+    def test_series_is_a_copy_taken_under_the_lock(self):
+        collector = HistogramCollector(buckets=(0.01, 0.1))
+        event = instrumentation.OperationEvent('mysql', 'select_record', 'users', rows=1, duration=0.05,
+                                               timings={'fetch': 0.005})
+        collector(event)
+        ((_, series),) = collector.series()
+        collector(event)
+
+        self.assertEqual(series['duration'].count, 1)
+        self.assertEqual(series['duration'].cumulative()[-1], (float('inf'), 1))
+        self.assertEqual(series['phases']['fetch'].count, 1)
+        self.assertEqual(series['rows'], 1)
+        self.assertEqual(collector.snapshot()[0]['duration']['count'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+import mongomock
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import AutoReconnect, BulkWriteError
+from database_automation.instrumentation import add_hook, clear_hooks
+from database_automation.mongo_crud import MongoBulkWriter, MongoOperation
+from database_automation.resilience import RetryPolicy
+
+
+class TestMongoOperation(unittest.TestCase):
+
+    def setUp(self):
+        self.client_url = 'mongodb://localhost:27017/'
+        self.database_name = 'test_db'
+        self.collection_name = 'test_collection'
+        patcher = patch('pymongo.mongo_client.MongoClient')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_operation(self, **options):
+        return MongoOperation(self.client_url, self.database_name, self.collection_name, **options)
+
+    def test_instances_share_one_client(self):
+        first = self.create_operation(max_pool_size=10)
+        second = self.create_operation(max_pool_size=10)
+
+        self.assertIs(first.create_mongo_client(), second.create_mongo_client())
+        self.mock_client_class.assert_called_once_with(self.client_url, maxPoolSize=10, minPoolSize=0)
+
+        first.close()
+        self.mock_client_class.return_value.close.assert_not_called()
+        second.close()
+        self.mock_client_class.return_value.close.assert_called_once()
+
+    def test_different_options_get_separate_clients(self):
+        with self.create_operation(max_pool_size=10) as first, self.create_operation(max_pool_size=20) as second:
+            first.create_mongo_client()
+            second.create_mongo_client()
+        self.assertEqual(self.mock_client_class.call_count, 2)
+
+    def test_list_and_dict_options_can_share_a_client(self):
+        options = {'compressors': ['zstd', 'snappy'], 'driver': {'name': 'app'}}
+        with self.create_operation(**options) as first, self.create_operation(**options) as second:
+            self.assertIs(first.create_mongo_client(), second.create_mongo_client())
+        self.mock_client_class.assert_called_once_with(self.client_url, maxPoolSize=100, minPoolSize=0, **options)
+
+    def test_collection_handles_are_cached(self):
+        with self.create_operation() as mongo:
+            mongo.insert_record({'name': 'John'}, 'people')
+            mongo.insert_record({'name': 'Jane'}, 'people')
+            mongo.insert_record({'name': 'Acme'}, 'companies')
+
+            database = self.mock_client_class.return_value.__getitem__.return_value
+            self.mock_client_class.return_value.__getitem__.assert_called_once_with(self.database_name)
+            self.assertEqual([call[0][0] for call in database.__getitem__.call_args_list], ['people', 'companies'])
+
+    def _write_csv(self, content):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_bulk_insert_streams_batches(self):
+        self.mock_client_class.side_effect = lambda *args, **kwargs: mongomock.MongoClient()
+        path = self._write_csv('name,age\nJohn,35\nJane,\nDoe,40\n')
+
+        for workers in (0, 2):
+            with self.create_operation() as mongo:
+                report = mongo.bulk_insert(path, 'people', batch_size=2, workers=workers)
+                documents = list(mongo.create_collection('people').find({}, {'_id': 0}))
+
+            self.assertEqual(report, {'inserted': 3, 'errors': []})
+            self.assertEqual(documents, [
+                {'name': 'John', 'age': 35.0}, {'name': 'Jane', 'age': None}, {'name': 'Doe', 'age': 40.0}
+            ])
+            self.assertIs(type(documents[0]['age']), float)
+
+    def test_bulk_insert_reports_batch_errors(self):
+        path = self._write_csv('name\nJohn\nJane\nDoe\n')
+        collection = self.mock_client_class.return_value.__getitem__.return_value.__getitem__.return_value
+        write_errors = [{'index': 0, 'errmsg': 'duplicate key'}]
+        collection.insert_many.side_effect = [
+            BulkWriteError({'nInserted': 1, 'writeErrors': write_errors}),
+            MagicMock(inserted_ids=[1]),
+        ]
+
+        with self.create_operation() as mongo:
+            report = mongo.bulk_insert(path, 'people', batch_size=2)
+
+        collection.insert_many.assert_called_with([{'name': 'Doe'}], ordered=False)
+        self.assertEqual(report, {'inserted': 2, 'errors': [{'batch': 0, 'inserted': 1, 'error': write_errors}]})
+
+    def test_insert_rows_accepts_records_and_frames(self):
+        import numpy as np
+        import pandas as pd
+        self.mock_client_class.side_effect = lambda *args, **kwargs: mongomock.MongoClient()
+        records = [{'id': 1}, {'id': 2}]
+        events = []
+        add_hook(events.append)
+        self.addCleanup(clear_hooks)
+
+        with self.create_operation() as mongo:
+            self.assertEqual(mongo.insert_rows(records, 'people', batch_size=1), {'inserted': 2, 'errors': []})
+            frame = pd.DataFrame({'id': [3, 4], 'score': [1.5, np.nan]})
+            self.assertEqual(mongo.insert_rows(frame, 'people'), {'inserted': 2, 'errors': []})
+            self.assertEqual(mongo.update_many({'id': {'$gt': 2}}, {'score': 0.0}, 'people'), 2)
+            self.assertEqual(mongo.delete_many({'id': 1}, 'people'), 1)
+            documents = list(mongo.create_collection('people').find({}, {'_id': 0}))
+
+        self.assertEqual(records, [{'id': 1}, {'id': 2}])
+        self.assertEqual(documents, [{'id': 2}, {'id': 3, 'score': 0.0}, {'id': 4, 'score': 0.0}])
+        self.assertEqual([(event.operation, event.rows) for event in events],
+                         [('insert_rows', 2), ('insert_rows', 2), ('update_many', 2), ('delete_many', 1)])
+
+    def test_insert_rows_reports_failed_batches_by_offset(self):
+        collection = self.mock_client_class.return_value.__getitem__.return_value.__getitem__.return_value
+        write_errors = [{'index': 0, 'errmsg': 'duplicate key'}]
+        collection.insert_many.side_effect = [MagicMock(inserted_ids=[1, 2]), BulkWriteError({'nInserted': 0, 'writeErrors': write_errors})]
+
+        with self.create_operation() as mongo:
+            report = mongo.insert_rows([{'id': i} for i in range(3)], 'people', batch_size=2)
+
+        self.assertEqual(report, {'inserted': 2, 'errors': [{'batch': 1, 'offset': 2, 'size': 1, 'inserted': 0, 'error': write_errors}]})
+
+    def test_bulk_writer_flushes_on_size_and_reports_counts(self):
+        collection = self.mock_client_class.return_value.__getitem__.return_value.__getitem__.return_value
+        collection.bulk_write.side_effect = [
+            MagicMock(bulk_api_result={'nMatched': 2, 'nModified': 1, 'nUpserted': 1}),
+            BulkWriteError({'nRemoved': 0, 'writeErrors': [{'index': 0, 'errmsg': 'failed'}]}),
+        ]
+
+        with self.create_operation() as mongo:
+            with mongo.bulk_writer('people', batch_size=3, flush_interval=None) as writer:
+                writer.upsert({'_id': 1}, {'name': 'John'})
+                writer.update_one({'_id': 2}, {'$set': {'name': 'Janet'}})
+                writer.replace_one({'_id': 3}, {'name': 'Doe'}, upsert=True)
+                self.assertEqual(len(writer), 0)
+                writer.delete_one({'_id': 1})
+                self.assertEqual(len(writer), 1)
+
+        self.assertEqual(collection.bulk_write.call_count, 2)
+        first_batch = collection.bulk_write.call_args_list[0][0][0]
+        self.assertEqual(first_batch[0], UpdateOne({'_id': 1}, {'$set': {'name': 'John'}}, upsert=True))
+        self.assertEqual(collection.bulk_write.call_args_list[1][0][0], [DeleteOne({'_id': 1})])
+        self.assertEqual(writer.stats, {
+            'matched': 2, 'modified': 1, 'upserted': 1, 'deleted': 0, 'inserted': 0,
+            'errors': [{'index': 0, 'errmsg': 'failed'}]
+        })
+
+    def test_bulk_writer_flushes_on_interval(self):
+        with self.create_operation() as mongo:
+            writer = mongo.bulk_writer('people', batch_size=100, flush_interval=0)
+            writer.delete_one({'_id': 1})
+
+        collection = self.mock_client_class.return_value.__getitem__.return_value.__getitem__.return_value
+        collection.bulk_write.assert_called_once()
+        self.assertEqual(collection.bulk_write.call_args[1], {'ordered': False})
+
+    def test_bulk_writer_flushes_idle_buffer_on_timer(self):
+        collection = MagicMock()
+        collection.bulk_write.return_value.bulk_api_result = {'nRemoved': 1}
+        writer = MongoBulkWriter(collection, batch_size=100, flush_interval=0.02)
+        writer.delete_one({'_id': 1})
+
+        deadline = time.monotonic() + 2
+        while not collection.bulk_write.called and time.monotonic() < deadline:
+            time.sleep(0.005)
+        collection.bulk_write.assert_called_once()
+        self.assertEqual((len(writer), writer.stats['deleted']), (0, 1))
+
+    def test_bulk_writer_keeps_operations_when_flush_fails(self):
+        collection = MagicMock()
+        collection.bulk_write.side_effect = [AutoReconnect('primary stepped down'), MagicMock(bulk_api_result={'nRemoved': 2})]
+        writer = MongoBulkWriter(collection, batch_size=100, flush_interval=None)
+        writer.delete_one({'_id': 1})
+        writer.delete_one({'_id': 2})
+
+        with self.assertRaises(AutoReconnect):
+            writer.flush()
+        self.assertEqual(len(writer), 2)
+        self.assertEqual(writer.stats['errors'], ['primary stepped down'])
+
+        writer.delete_one({'_id': 3})
+        writer.flush()
+        self.assertEqual(collection.bulk_write.call_args[0][0], [DeleteOne({'_id': 1}), DeleteOne({'_id': 2}), DeleteOne({'_id': 3})])
+        self.assertEqual((len(writer), writer.stats['deleted']), (0, 2))
+
+    def test_find_iter_yields_documents_and_dataframe_chunks(self):
+        self.mock_client_class.side_effect = lambda *args, **kwargs: mongomock.MongoClient()
+
+        with self.create_operation() as mongo:
+            mongo.insert_record([{'_id': i, 'name': f'name{i}', 'age': 20 + i} for i in range(5)], 'people')
+            mongo.insert_record({'_id': 5, 'name': 'extra', 'city': 'Pune'}, 'people')
+
+            documents = list(mongo.find_iter({'age': {'$gte': 23}}, 'people', projection={'name': 1},
+                                             sort=[('_id', -1)], batch_size=2))
+            chunks = list(mongo.find_iter(collection_name='people', batch_size=4, dataframe=True))
+
+        self.assertEqual(documents, [{'_id': 4, 'name': 'name4'}, {'_id': 3, 'name': 'name3'}])
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 2])
+        self.assertEqual(list(chunks[1].columns), ['_id', 'name', 'age', 'city'])
+        self.assertEqual(chunks[1]['city'].isna().tolist(), [True, False])
+
+    def test_aggregate_iter_passes_batch_size_and_hint(self):
+        collection = self.mock_client_class.return_value.__getitem__.return_value.__getitem__.return_value
+        collection.aggregate.return_value.__iter__.return_value = iter([{'_id': 'eu', 'count': 2}])
+        pipeline = [{'$group': {'_id': '$region', 'count': {'$sum': 1}}}]
+
+        with self.create_operation() as mongo:
+            result = list(mongo.aggregate_iter(pipeline, 'people', batch_size=50, hint='region_1'))
+
+        collection.aggregate.assert_called_once_with(pipeline, batchSize=50, hint='region_1')
+        self.assertEqual(result, [{'_id': 'eu', 'count': 2}])
+        collection.aggregate.return_value.close.assert_called_once()
+
+    def test_find_iter_closes_the_cursor_of_a_failed_attempt(self):
+        collection = self.mock_client_class.return_value.__getitem__.return_value.__getitem__.return_value
+        failed, retried = MagicMock(), MagicMock()
+        failed.__iter__.side_effect = AutoReconnect('primary stepped down')
+        retried.__iter__.return_value = iter([{'_id': 1}])
+        collection.find.side_effect = [failed, retried]
+
+        with self.create_operation(retry_policy=RetryPolicy(max_attempts=2, base_delay=0)) as mongo:
+            documents = list(mongo.find_iter(collection_name='people'))
+
+        self.assertEqual(documents, [{'_id': 1}])
+        failed.close.assert_called_once()
+        retried.close.assert_called_once()
+
+    def test_find_iter_closes_cursor_when_stopped_early(self):
+        collection = self.mock_client_class.return_value.__getitem__.return_value.__getitem__.return_value
+        cursor = collection.find.return_value
+        cursor.__iter__.return_value = iter([{'_id': i} for i in range(10)])
+
+        with self.create_operation() as mongo:
+            documents = mongo.find_iter(collection_name='people', batch_size=2)
+            self.assertEqual(next(documents), {'_id': 0})
+            cursor.close.assert_not_called()
+            documents.close()
+
+        cursor.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from database_automation.mysql_crud import MySQLConnection
+from database_automation.conditions import eq, in_
+from database_automation.mysql_crud import MySQLConnection, MySQLConnectionPool
 from mysql.connector import errorcode
 import mysql.connector
+import threading
 
 
 class TestMySQLConnection(unittest.TestCase):
@@ -34,8 +36,8 @@ class TestMySQLConnection(unittest.TestCase):
             database=self.database,
             port=self.port
         )
-        self.assertEqual(self.db_conn._MySQLConnection__connection, mock_connection)
-        self.assertEqual(self.db_conn._MySQLConnection__cursor, mock_cursor)
+        self.assertEqual(self.db_conn._MySQLConnection__state.connection, mock_connection)
+        self.assertEqual(self.db_conn._MySQLConnection__state.cursor, mock_cursor)
 
     @patch('database_automation.mysql_crud.mysql.connector.connect')
     def test_connect_database_creation(self, mock_connect):
@@ -191,6 +193,311 @@ class TestMySQLConnection(unittest.TestCase):
         mock_cursor.close.assert_called_once()
         mock_connection.close.assert_called_once()
 
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_pooled_calls_reuse_connection(self, mock_connect):
+        mock_connection = MagicMock()
+        mock_connect.return_value = mock_connection
+        db_conn = MySQLConnection(
+            host=self.host, user=self.user, password=self.password,
+            database=self.database, port=self.port, pool_size=2
+        )
+
+        db_conn.insert_record('test_table', {'id': 1, 'name': 'John'})
+        db_conn.delete_record('test_table', 'id=1')
+
+        mock_connect.assert_called_once()
+        mock_connection.close.assert_not_called()
+        db_conn.close()
+        mock_connection.close.assert_called_once()
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_session_shares_one_connection(self, mock_connect):
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+
+        with self.db_conn.session():
+            self.db_conn.insert_record('test_table', {'id': 1, 'name': 'John'})
+            self.db_conn.update_record('test_table', {'name': 'Doe'}, 'id=1')
+            mock_connection.close.assert_not_called()
+
+        mock_connect.assert_called_once()
+        self.assertEqual(mock_cursor.execute.call_count, 2)
+        mock_connection.close.assert_called_once()
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_pooled_instance_serves_threads_concurrently(self, mock_connect):
+        # Every thread blocks inside execute until all four hold a connection at the same time
+        barrier = threading.Barrier(4, timeout=5)
+        connections = []
+
+        def connect(**kwargs):
+            connection = MagicMock()
+            connection.in_transaction = False
+            connection.cursor.return_value.execute.side_effect = lambda *args: barrier.wait()
+            connections.append(connection)
+            return connection
+        mock_connect.side_effect = connect
+        db_conn = MySQLConnection(
+            host=self.host, user=self.user, password=self.password,
+            database=self.database, port=self.port, pool_size=4
+        )
+        errors = []
+
+        def insert(index):
+            try:
+                db_conn.insert_record('test_table', {'id': index})
+            except Exception as err:
+                errors.append(err)
+        threads = [threading.Thread(target=insert, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(connections), 4)
+        for connection in connections:
+            connection.commit.assert_called_once()
+        self.assertEqual(len(db_conn.pool._MySQLConnectionPool__idle), 4)
+        db_conn.close()
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_bulk_insert_batches(self, mock_connect):
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_connection
+        mock_connection.cursor.return_value = mock_cursor
+        rows = ({'id': i, 'name': f'name{i}'} for i in range(5))
+
+        stats = self.db_conn.bulk_insert('test_table', rows, batch_size=2)
+
+        mock_connect.assert_called_once()
+        self.assertEqual(mock_cursor.executemany.call_count, 3)
+        mock_cursor.executemany.assert_called_with(
+            'INSERT INTO test_table (id, name) VALUES (%s, %s)',
+            [(4, 'name4')]
+        )
+        self.assertEqual(mock_connection.commit.call_count, 3)
+        self.assertEqual(stats['rows'], 5)
+        self.assertEqual(stats['batches'], 3)
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_bulk_insert_dataframe_nan_to_null(self, mock_connect):
+        import pandas as pd
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_connection
+        mock_connection.cursor.return_value = mock_cursor
+        frame = pd.DataFrame({'id': [1, 2], 'value': [1.5, float('nan')]})
+
+        self.db_conn.bulk_insert('test_table', frame)
+
+        mock_cursor.executemany.assert_called_once_with(
+            'INSERT INTO test_table (id, value) VALUES (%s, %s)',
+            [(1, 1.5), (2, None)]
+        )
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_select_iter_streams_batches(self, mock_connect):
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_connection
+        mock_connection.cursor.return_value = mock_cursor
+        mock_cursor.fetchmany.side_effect = [[(1, 'John'), (2, 'Jane')], [(3, 'Doe')], []]
+
+        rows = self.db_conn.select_iter('test_table', 'id > 0', batch_size=2)
+        self.assertEqual(next(rows), (1, 'John'))
+        mock_connection.close.assert_not_called()
+        self.assertEqual(list(rows), [(2, 'Jane'), (3, 'Doe')])
+
+        mock_cursor.execute.assert_called_once_with('SELECT * FROM test_table WHERE id > 0')
+        mock_cursor.fetchmany.assert_called_with(2)
+        mock_cursor.fetchall.assert_not_called()
+        mock_connection.close.assert_called_once()
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_select_iter_drops_connection_when_stopped_early(self, mock_connect):
+        connections = []
+
+        def connect(**kwargs):
+            connection = MagicMock()
+            connection.in_transaction = False
+            connection.cursor.return_value.fetchmany.side_effect = [[(1, 'John')], [(2, 'Jane')], []]
+            connections.append(connection)
+            return connection
+        mock_connect.side_effect = connect
+        db_conn = MySQLConnection(
+            host=self.host, user=self.user, password=self.password,
+            database=self.database, port=self.port, pool_size=1, pool_timeout=0.1
+        )
+
+        rows = db_conn.select_iter('test_table')
+        self.assertEqual(next(rows), (1, 'John'))
+        rows.close()
+
+        cursor = connections[0].cursor.return_value
+        self.assertEqual(cursor.fetchmany.call_count, 1)
+        connections[0].shutdown.assert_called_once()
+        db_conn.delete_record('test_table', 'id=1')
+        self.assertEqual(len(connections), 2)
+
+        rows = self.db_conn.select_iter('test_table')
+        next(rows)
+        rows.close()
+        self.assertEqual(connections[2].cursor.return_value.fetchmany.call_count, 1)
+        connections[2].shutdown.assert_called_once()
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_select_iter_binds_params_and_orders(self, mock_connect):
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_connection
+        mock_connection.cursor.return_value = mock_cursor
+        mock_cursor.fetchmany.side_effect = [[{'id': 6}], []]
+
+        rows = list(self.db_conn.select_iter('test_table', 'id > %s', params=(5,), order_by='id', dictionary=True))
+
+        self.assertEqual(rows, [{'id': 6}])
+        mock_connection.cursor.assert_called_with(dictionary=True)
+        mock_cursor.execute.assert_called_once_with('SELECT * FROM test_table WHERE id > %s ORDER BY id', (5,))
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_conditions_are_bound_as_parameters(self, mock_connect):
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+
+        self.db_conn.select_record('test_table', eq('name', "O'Brien"))
+        self.db_conn.update_record('test_table', {'name': 'Doe'}, in_('id', [1, 2]))
+        self.db_conn.delete_record('test_table', eq('id', 3))
+
+        self.assertEqual(mock_cursor.execute.call_args_list[0].args, ('SELECT * FROM test_table WHERE name = %s', ("O'Brien",)))
+        self.assertEqual(mock_cursor.execute.call_args_list[1].args, ('UPDATE test_table SET name=%s WHERE id IN (%s, %s)', ('Doe', 1, 2)))
+        self.assertEqual(mock_cursor.execute.call_args_list[2].args, ('DELETE FROM test_table WHERE id = %s', (3,)))
+        with self.assertRaises(ValueError):
+            self.db_conn.delete_record('test_table', None)
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_key_range_reads_min_and_max(self, mock_connect):
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (1, 500)
+
+        self.assertEqual(self.db_conn.key_range('test_table', 'id'), (1, 500))
+        mock_cursor.execute.assert_called_once_with('SELECT MIN(id), MAX(id) FROM test_table')
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_bulk_insert_upsert(self, mock_connect):
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+
+        self.db_conn.bulk_insert('test_table', [{'id': 1, 'name': 'John'}], upsert=True)
+
+        mock_cursor.executemany.assert_called_once_with(
+            'INSERT INTO test_table (id, name) VALUES (%s, %s) ON DUPLICATE KEY UPDATE id = VALUES(id), name = VALUES(name)',
+            [(1, 'John')]
+        )
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_select_iter_dataframe_chunks(self, mock_connect):
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_connection
+        mock_connection.cursor.return_value = mock_cursor
+        mock_cursor.column_names = ('id', 'name')
+        mock_cursor.fetchmany.side_effect = [[(1, 'John'), (2, 'Jane')], []]
+
+        chunks = list(self.db_conn.select_iter('test_table', dataframe=True))
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(list(chunks[0].columns), ['id', 'name'])
+        self.assertEqual(chunks[0]['name'].tolist(), ['John', 'Jane'])
+
+
+class TestMySQLTransaction(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('database_automation.mysql_crud.mysql.connector.connect')
+        self.mock_connect = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.connection = self.mock_connect.return_value
+        self.connection.in_transaction = False
+        self.cursor = self.connection.cursor.return_value
+        self.db_conn = MySQLConnection('127.0.0.1', 'root', 'password', 'test_db')
+
+    def test_commits_once_on_one_connection(self):
+        with self.db_conn.transaction(isolation_level='SERIALIZABLE') as tx:
+            tx.insert_record('accounts', {'id': 1, 'balance': 10})
+            tx.update_record('accounts', {'balance': 5}, 'id=1')
+            tx.delete_record('accounts', 'id=2')
+            self.connection.commit.assert_not_called()
+
+        self.mock_connect.assert_called_once()
+        self.connection.start_transaction.assert_called_once_with(isolation_level='SERIALIZABLE', readonly=None)
+        self.connection.commit.assert_called_once()
+        self.connection.rollback.assert_not_called()
+        self.assertEqual(self.cursor.execute.call_count, 3)
+
+    def test_exception_rolls_back(self):
+        with self.assertRaises(ValueError):
+            with self.db_conn.transaction():
+                self.db_conn.insert_record('accounts', {'id': 1})
+                raise ValueError('abort')
+
+        self.connection.rollback.assert_called_once()
+        self.connection.commit.assert_not_called()
+        self.connection.close.assert_called_once()
+
+    def test_nested_transaction_rolls_back_to_savepoint(self):
+        with self.db_conn.transaction():
+            self.db_conn.insert_record('accounts', {'id': 1})
+            try:
+                with self.db_conn.transaction():
+                    self.db_conn.insert_record('accounts', {'id': 2})
+                    raise ValueError('inner')
+            except ValueError:
+                pass
+            with self.db_conn.savepoint('keep'):
+                self.db_conn.insert_record('accounts', {'id': 3})
+
+        statements = [call.args[0] for call in self.cursor.execute.call_args_list if not call.args[0].startswith('INSERT')]
+        self.assertEqual(statements, ['SAVEPOINT sp_1', 'ROLLBACK TO SAVEPOINT sp_1', 'SAVEPOINT keep', 'RELEASE SAVEPOINT keep'])
+        self.connection.commit.assert_called_once()
+        self.connection.rollback.assert_not_called()
+
+    def test_savepoint_requires_transaction(self):
+        with self.assertRaises(RuntimeError):
+            with self.db_conn.savepoint():
+                pass
+
+
+class TestMySQLConnectionPool(unittest.TestCase):
+
+    def test_checkout_timeout(self):
+        pool = MySQLConnectionPool(MagicMock, pool_size=1, timeout=0.01)
+        pool.get()
+        with self.assertRaises(TimeoutError):
+            pool.get()
+
+    def test_pre_ping_discards_dead_connection(self):
+        dead, alive = MagicMock(), MagicMock()
+        dead.is_connected.return_value = False
+        factory = MagicMock(side_effect=[dead, alive])
+        pool = MySQLConnectionPool(factory, pool_size=1)
+        pool.put(pool.get())
+
+        self.assertIs(pool.get(), alive)
+        dead.close.assert_called_once()
+
+    def test_max_lifetime_recycles_connection(self):
+        old, new = MagicMock(), MagicMock()
+        pool = MySQLConnectionPool(MagicMock(side_effect=[old, new]), pool_size=1, max_lifetime=0)
+        pool.put(pool.get())
+
+        self.assertIs(pool.get(), new)
+        old.close.assert_called_once()
+
 
 if __name__ == '__main__':
     unittest.main()
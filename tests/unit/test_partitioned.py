@@ -0,0 +1,143 @@
+import csv
+import glob
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import mongomock
+import pandas as pd
+import pyarrow.parquet as pq
+from database_automation.partitioned import (
+    MAX_TOKEN, MIN_TOKEN, ConnectorSink, Partition, ShardSink, cassandra_partitions, mongo_partitions,
+    mysql_partitions, run_partitioned
+)
+
+
+ROWS = [{'id': i, 'name': f'name{i}'} for i in range(1, 11)]
+
+
+class FakeMySQL:
+    # select_iter over ROWS, understanding the range conditions mysql_partitions produces
+    def select_iter(self, table_name, conditions=None, batch_size=1000, batches=False, params=None, dictionary=False):
+        rows = ROWS
+        if conditions:
+            low, high = params
+            inclusive = '<=' in conditions
+            rows = [row for row in rows if low <= row['id'] and (row['id'] <= high if inclusive else row['id'] < high)]
+        for offset in range(0, len(rows), batch_size):
+            yield rows[offset:offset + batch_size]
+
+    def close(self):
+        pass
+
+
+def open_fake_mysql():
+    return FakeMySQL()
+
+
+class TestPartitionPlanning(unittest.TestCase):
+
+    def test_mysql_partitions_cover_key_range(self):
+        connection = MagicMock()
+        connection.key_range.return_value = (1, 10)
+
+        partitions = mysql_partitions(connection, 'people', 'id', 3)
+
+        self.assertEqual([(partition.conditions, partition.params) for partition in partitions], [
+            ('id >= %s AND id < %s', (1, 5)),
+            ('id >= %s AND id < %s', (5, 9)),
+            ('id >= %s AND id <= %s', (9, 10)),
+        ])
+        connection.key_range.return_value = (None, None)
+        self.assertEqual(mysql_partitions(connection, 'people', 'id', 3), [Partition('mysql', 'people', 0)])
+
+    def test_cassandra_partitions_are_contiguous(self):
+        partitions = cassandra_partitions('people', 'id', 4)
+
+        self.assertEqual(partitions[0].params[0], MIN_TOKEN)
+        self.assertEqual(partitions[-1].params[1], MAX_TOKEN)
+        for previous, current in zip(partitions, partitions[1:]):
+            self.assertEqual(previous.params[1], current.params[0])
+        self.assertEqual(partitions[0].conditions, ('id',))
+
+    def test_mongo_partitions_split_on_sampled_ids(self):
+        collection = mongomock.MongoClient().db.people
+        collection.insert_many([{'_id': i} for i in range(100)])
+        operation = MagicMock()
+        operation.create_collection.return_value = collection
+
+        partitions = mongo_partitions(operation, 'people', 4)
+
+        self.assertEqual(len(partitions), 4)
+        counts = [collection.count_documents(partition.conditions) for partition in partitions]
+        self.assertEqual(sum(counts), 100)
+        self.assertTrue(all(counts))
+
+
+class TestRunPartitioned(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        connection = MagicMock()
+        connection.key_range.return_value = (1, 10)
+        self.partitions = mysql_partitions(connection, 'people', 'id', 3)
+
+    def test_parquet_shards_hold_every_row(self):
+        report = run_partitioned(open_fake_mysql, self.partitions, ShardSink(self.directory), workers=3,
+                                 executor='thread', batch_size=2)
+
+        self.assertEqual(report['rows'], 10)
+        self.assertEqual([result['rows'] for result in report['partitions']], [4, 4, 2])
+        frame = pd.read_parquet(self.directory)
+        self.assertEqual(sorted(frame['id'].tolist()), list(range(1, 11)))
+
+    def test_parquet_shard_widens_all_null_and_new_columns(self):
+        shard = ShardSink(self.directory).open(0)
+        shard.write([{'id': 1, 'note': None}, {'id': 2, 'note': None}])
+        shard.write([{'id': 3, 'note': 'late'}])
+        shard.write([{'id': 4, 'note': None, 'score': 1.5}])
+        table = pq.read_table(shard.close())
+
+        self.assertEqual(table.column_names, ['id', 'note', 'score'])
+        self.assertEqual(table.column('note').to_pylist(), [None, None, 'late', None])
+        self.assertEqual(table.column('score').to_pylist(), [None, None, None, 1.5])
+
+    def test_process_pool_writes_csv_shards(self):
+        report = run_partitioned(open_fake_mysql, self.partitions, ShardSink(self.directory, format='csv'), workers=2)
+
+        shards = sorted(glob.glob(os.path.join(self.directory, 'part-*.csv')))
+        self.assertEqual([result['output'] for result in report['partitions']], shards)
+        rows = []
+        for shard in shards:
+            with open(shard, newline='', encoding='utf-8') as f:
+                rows.extend(csv.DictReader(f))
+        self.assertEqual([int(row['id']) for row in rows], list(range(1, 11)))
+
+    def test_connector_sink_writes_each_partition(self):
+        target = MagicMock()
+        target.bulk_insert.return_value = {'rows': 0}
+
+        report = run_partitioned(open_fake_mysql, self.partitions, ConnectorSink(lambda: target, 'people_copy'),
+                                 executor='thread')
+
+        written = [row for call in target.bulk_insert.call_args_list for row in call.args[1]]
+        self.assertEqual(sorted(row['id'] for row in written), list(range(1, 11)))
+        self.assertEqual(report['partitions'][0]['output'], {'target': 'people_copy', 'errors': []})
+        self.assertEqual(target.close.call_count, 3)
+
+    def test_connector_sink_reports_rejected_rows_as_failed(self):
+        target = MagicMock()
+        # Cassandra-style report: the second row of every batch was rejected
+        target.bulk_insert.side_effect = lambda table, rows: {'rows': len(rows) - 1, 'failed': [{'row': 1, 'error': 'timeout'}]}
+
+        report = run_partitioned(open_fake_mysql, self.partitions, ConnectorSink(lambda: target, 'people_copy'),
+                                 executor='thread', batch_size=2)
+
+        self.assertEqual((report['rows'], report['failed']), (5, 5))
+        self.assertEqual([(result['rows'], result['failed']) for result in report['partitions']], [(2, 2), (2, 2), (1, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
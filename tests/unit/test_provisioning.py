@@ -0,0 +1,112 @@
+import socket
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from database_automation.cassandra_crud import CassandraOperation
+from database_automation.provisioning import DockerProvisioner, Provisioner, probe_cql, wait_for_cql
+
+
+def serve_once(response):
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+
+    def handle():
+        connection, _ = server.accept()
+        with connection:
+            connection.recv(9)
+            connection.sendall(response)
+        server.close()
+
+    threading.Thread(target=handle, daemon=True).start()
+    return server.getsockname()[1]
+
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestReadinessProbe(unittest.TestCase):
+
+    def test_probe_accepts_supported_frame(self):
+        port = serve_once(b'\x84\x00\x00\x00\x06\x00\x00\x00\x00')
+        self.assertTrue(probe_cql('127.0.0.1', port))
+
+    def test_probe_rejects_non_cql_listener(self):
+        port = serve_once(b'HTTP/1.1 400 Bad Request\r\n')
+        self.assertFalse(probe_cql('127.0.0.1', port))
+
+    def test_probe_fails_on_closed_port(self):
+        self.assertFalse(probe_cql('127.0.0.1', unused_port(), timeout=0.2))
+
+    def test_wait_for_cql_gives_up_at_timeout(self):
+        self.assertFalse(wait_for_cql(['127.0.0.1'], unused_port(), timeout=0.2, probe_timeout=0.05))
+
+
+class TestProvisioning(unittest.TestCase):
+
+    @patch('database_automation.provisioning.subprocess')
+    def test_existing_cluster_spawns_no_subprocesses(self, mock_subprocess):
+        cassandra = CassandraOperation(contact_points=['127.0.0.1'])
+        cassandra.close()
+        self.assertEqual(mock_subprocess.mock_calls, [])
+
+    @patch('database_automation.provisioning.probe_cql', return_value=True)
+    @patch('database_automation.provisioning.subprocess')
+    def test_docker_provisioner_skips_docker_when_reachable(self, mock_subprocess, mock_probe):
+        self.assertTrue(DockerProvisioner().start())
+        self.assertEqual(mock_subprocess.mock_calls, [])
+
+    @patch('database_automation.provisioning.probe_cql', return_value=True)
+    @patch('database_automation.provisioning.subprocess')
+    def test_close_leaves_a_container_it_did_not_start(self, mock_subprocess, mock_probe):
+        cassandra = CassandraOperation(contact_points=['127.0.0.1'], provisioner=DockerProvisioner())
+        cassandra.close()
+        self.assertEqual(mock_subprocess.mock_calls, [])
+
+    @patch('database_automation.provisioning.wait_for_cql', return_value=True)
+    @patch('database_automation.provisioning.probe_cql', return_value=False)
+    @patch('database_automation.provisioning.subprocess')
+    def test_close_leaves_an_already_running_container(self, mock_subprocess, mock_probe, mock_wait):
+        mock_subprocess.check_output.return_value = b'true'
+        with patch('builtins.print'):
+            cassandra = CassandraOperation(contact_points=['127.0.0.1'], provisioner=DockerProvisioner())
+            cassandra.close()
+        mock_subprocess.run.assert_not_called()
+
+    @patch('database_automation.provisioning.wait_for_cql', return_value=True)
+    @patch('database_automation.provisioning.probe_cql', return_value=False)
+    @patch('database_automation.provisioning.subprocess')
+    def test_docker_provisioner_runs_container_and_waits_for_cql(self, mock_subprocess, mock_probe, mock_wait):
+        mock_subprocess.check_output.side_effect = [b'false', b'abc123']
+        mock_subprocess.run.return_value.returncode = 0
+        with patch('builtins.print'):
+            provisioner = DockerProvisioner(volume='data', port=9043)
+            self.assertTrue(provisioner.start())
+            provisioner.stop()
+        run_args = mock_subprocess.check_output.call_args_list[1][0][0]
+        self.assertEqual(run_args[:4], ['docker', 'run', '--name', 'test-cassandra-v2'])
+        self.assertIn('9043:9042', run_args)
+        mock_wait.assert_called_once_with(['127.0.0.1'], 9043, 180.0)
+        mock_subprocess.run.assert_any_call(['docker', 'stop', 'test-cassandra-v2'], check=True)
+
+    def test_provisioner_lifecycle_is_tied_to_the_operation(self):
+        provisioner = MagicMock(spec=['start', 'stop'])
+        provisioner.start.return_value = True
+        self.assertIsInstance(provisioner, Provisioner)
+        cassandra = CassandraOperation(contact_points=['127.0.0.1'], provisioner=provisioner)
+        cassandra.close()
+        provisioner.start.assert_called_once_with()
+        provisioner.stop.assert_called_once_with()
+
+    def test_failed_provisioning_raises(self):
+        provisioner = MagicMock(spec=['start', 'stop'])
+        provisioner.start.return_value = False
+        with self.assertRaises(RuntimeError):
+            CassandraOperation(contact_points=['127.0.0.1'], provisioner=provisioner)
+
+
+if __name__ == '__main__':
+    unittest.main()
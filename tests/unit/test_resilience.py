@@ -0,0 +1,176 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import mysql.connector
+from cassandra.cluster import NoHostAvailable
+from pymongo.errors import AutoReconnect, DuplicateKeyError
+from database_automation.cassandra_crud import CassandraOperation
+from database_automation.mysql_crud import MySQLConnection
+from database_automation.resilience import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, is_mysql_connectivity_error, is_transient_cassandra_error,
+    is_transient_mongo_error, is_transient_mysql_error
+)
+
+
+def flaky(failures, error, result='ok'):
+    calls = []
+
+    def function():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error
+        return result
+    return function, calls
+
+
+@patch('database_automation.resilience.time.sleep')
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_transient_errors_are_retried(self, mock_sleep):
+        function, calls = flaky(2, ConnectionResetError())
+        self.assertEqual(RetryPolicy(max_attempts=3).call(function), 'ok')
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_permanent_errors_are_not_retried(self, mock_sleep):
+        function, calls = flaky(1, ValueError("bad query"))
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_attempts=3).call(function)
+        self.assertEqual(len(calls), 1)
+
+    def test_gives_up_after_max_attempts(self, mock_sleep):
+        function, calls = flaky(5, ConnectionResetError())
+        with self.assertRaises(ConnectionResetError):
+            RetryPolicy(max_attempts=3).call(function)
+        self.assertEqual(len(calls), 3)
+
+    @patch('database_automation.resilience.time.monotonic')
+    def test_gives_up_at_the_deadline(self, mock_monotonic, mock_sleep):
+        mock_monotonic.side_effect = [0.0, 1.0, 2.5]
+        function, calls = flaky(5, ConnectionResetError())
+        with self.assertRaises(ConnectionResetError):
+            RetryPolicy(max_attempts=None, deadline=2.0, jitter=False).call(function)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(mock_sleep.call_args[0][0], 0.1)
+
+    def test_backoff_is_capped_and_jittered(self, mock_sleep):
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0, jitter=False)
+        self.assertEqual([policy.backoff(attempt) for attempt in (1, 2, 3, 4)], [1.0, 2.0, 4.0, 4.0])
+        jittered = RetryPolicy(base_delay=1.0, max_delay=4.0)
+        self.assertTrue(all(0 <= jittered.backoff(5) <= 4.0 for _ in range(50)))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    @patch('database_automation.resilience.time.sleep')
+    @patch('database_automation.resilience.time.monotonic')
+    def test_opens_fails_fast_and_recovers(self, mock_monotonic, mock_sleep):
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        policy = RetryPolicy(max_attempts=1)
+        function, calls = flaky(2, ConnectionResetError())
+        for _ in range(2):
+            with self.assertRaises(ConnectionResetError):
+                policy.call(function, breaker=breaker)
+        self.assertEqual(breaker.state, 'open')
+        with self.assertRaises(CircuitOpenError):
+            policy.call(function, breaker=breaker)
+        self.assertEqual(len(calls), 2)
+
+        mock_monotonic.return_value = 131.0
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertEqual(policy.call(function, breaker=breaker), 'ok')
+        self.assertEqual(breaker.state, 'closed')
+
+
+class TestClassification(unittest.TestCase):
+
+    def test_mysql(self):
+        self.assertTrue(is_transient_mysql_error(mysql.connector.errors.OperationalError(errno=2013)))
+        self.assertTrue(is_transient_mysql_error(mysql.connector.errors.DatabaseError(errno=1213)))
+        self.assertTrue(is_mysql_connectivity_error(mysql.connector.errors.OperationalError(errno=2013)))
+        self.assertFalse(is_mysql_connectivity_error(mysql.connector.errors.DatabaseError(errno=1213)))
+        self.assertFalse(is_transient_mysql_error(mysql.connector.errors.ProgrammingError(errno=1064)))
+
+    def test_mongo(self):
+        self.assertTrue(is_transient_mongo_error(AutoReconnect("primary stepped down")))
+        self.assertFalse(is_transient_mongo_error(DuplicateKeyError("E11000")))
+
+    def test_cassandra(self):
+        self.assertTrue(is_transient_cassandra_error(NoHostAvailable("down", {})))
+        self.assertFalse(is_transient_cassandra_error(ValueError()))
+
+
+@patch('database_automation.resilience.time.sleep')
+class TestAppliedRetries(unittest.TestCase):
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_mysql_select_record_retries_lost_connection(self, mock_connect, mock_sleep):
+        mock_cursor = MagicMock()
+        mock_cursor.execute.side_effect = [mysql.connector.errors.OperationalError(errno=2013), None]
+        mock_cursor.fetchall.return_value = [(1, 'alice')]
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        connection = MySQLConnection('127.0.0.1', 'root', 'password', 'test_db')
+
+        self.assertEqual(connection.select_record('users'), [(1, 'alice')])
+        self.assertEqual(mock_connect.call_count, 2)
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_mysql_insert_record_is_not_retried(self, mock_connect, mock_sleep):
+        mock_connect.return_value.cursor.return_value.execute.side_effect = mysql.connector.errors.OperationalError(errno=2013)
+        connection = MySQLConnection('127.0.0.1', 'root', 'password', 'test_db')
+
+        with self.assertRaises(Exception):
+            connection.insert_record('users', {'id': 1})
+        self.assertEqual(mock_connect.call_count, 1)
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_mysql_breaker_opens_when_connect_keeps_failing(self, mock_connect, mock_sleep):
+        mock_connect.side_effect = mysql.connector.errors.InterfaceError(errno=2003)
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        connection = MySQLConnection('127.0.0.1', 'root', 'password', 'test_db',
+                                     retry_policy=RetryPolicy(max_attempts=3), circuit_breaker=breaker)
+
+        with self.assertRaises(Exception):
+            connection.select_record('users')
+        self.assertEqual(breaker.state, 'open')
+        self.assertEqual(mock_connect.call_count, 3)
+        for _ in range(5):
+            with self.assertRaises(CircuitOpenError):
+                connection.select_record('users')
+            with self.assertRaises(CircuitOpenError):
+                connection.insert_record('users', {'id': 1})
+        self.assertEqual(mock_connect.call_count, 3)
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_mysql_deadlocks_are_retried_without_opening_the_breaker(self, mock_connect, mock_sleep):
+        mock_cursor = MagicMock()
+        deadlock = mysql.connector.errors.DatabaseError(errno=1213)
+        mock_cursor.execute.side_effect = [deadlock, deadlock, deadlock, deadlock, None, None]
+        mock_cursor.fetchall.return_value = [(1, 'alice')]
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        connection = MySQLConnection('127.0.0.1', 'root', 'password', 'test_db',
+                                     retry_policy=RetryPolicy(max_attempts=3), circuit_breaker=breaker)
+
+        with self.assertRaises(Exception):
+            connection.update_record('users', {'name': 'bob'}, 'id = 1')
+        connection.update_record('users', {'name': 'bob'}, 'id = 1')
+        self.assertEqual(breaker.state, 'closed')
+        self.assertEqual(connection.select_record('users'), [(1, 'alice')])
+        self.assertEqual(mock_cursor.execute.call_count, 6)
+
+    @patch('cassandra.cluster.Cluster')
+    def test_cassandra_connect_backs_off_until_ready(self, mock_cluster, mock_sleep):
+        session = MagicMock()
+        mock_cluster.return_value.connect.side_effect = [NoHostAvailable("starting", {}), NoHostAvailable("starting", {}), session]
+        cassandra = CassandraOperation(contact_points=['127.0.0.1'])
+
+        with patch('builtins.print'):
+            self.assertIs(cassandra.connect(), session)
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertTrue(all(call[0][0] <= 10.0 for call in mock_sleep.call_args_list))
+        self.assertEqual(mock_cluster.return_value.shutdown.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
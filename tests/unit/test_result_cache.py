@@ -0,0 +1,128 @@
+import unittest
+import threading
+from unittest.mock import patch, MagicMock
+from database_automation.cassandra_crud import CassandraOperation
+from database_automation.mysql_crud import MySQLConnection
+from database_automation.result_cache import ENTRY_OVERHEAD, ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_hit_and_miss_statistics(self):
+        cache = ResultCache()
+        key = cache.key('mysql', 'users', ' age > 30\n')
+        self.assertEqual(cache.get(key), (False, None))
+        cache.put(key, [(1, 'alice')])
+        self.assertEqual(cache.get(cache.key('mysql', 'users', 'age > 30')), (True, [(1, 'alice')]))
+        stats = cache.stats
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_inner_whitespace_is_part_of_the_key(self):
+        # The condition text may contain string literals, where 'a  b' and 'a b' are different values
+        cache = ResultCache()
+        cache.put(cache.key('mysql', 'users', "name = 'a  b'"), [(1, 'a  b')])
+        self.assertEqual(cache.get(cache.key('mysql', 'users', "name = 'a b'")), (False, None))
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = ResultCache(max_bytes=2 * (ENTRY_OVERHEAD + 100), ttl=None)
+        for name in ('a', 'b'):
+            cache.put(cache.key('mysql', name), ['x' * 100])
+        cache.get(cache.key('mysql', 'a'))
+        cache.put(cache.key('mysql', 'c'), ['x' * 100])
+        self.assertTrue(cache.get(cache.key('mysql', 'a'))[0])
+        self.assertFalse(cache.get(cache.key('mysql', 'b'))[0])
+        self.assertEqual(cache.stats['evictions'], 1)
+        self.assertLessEqual(cache.stats['bytes'], cache.max_bytes)
+
+    def test_oversized_results_are_not_cached(self):
+        cache = ResultCache(max_bytes=ENTRY_OVERHEAD + 10)
+        cache.put(cache.key('mysql', 'users'), ['x' * 100])
+        self.assertEqual(len(cache), 0)
+
+    @patch('database_automation.result_cache.time.monotonic')
+    def test_entries_expire_after_ttl(self, mock_monotonic):
+        cache = ResultCache(ttl=10)
+        mock_monotonic.return_value = 100.0
+        cache.put(cache.key('mysql', 'users'), [])
+        mock_monotonic.return_value = 111.0
+        self.assertFalse(cache.get(cache.key('mysql', 'users'))[0])
+        self.assertEqual(cache.stats['expirations'], 1)
+
+    def test_invalidate_only_touches_the_table(self):
+        cache = ResultCache()
+        cache.put(cache.key('mysql', 'users', 'id = 1'), [])
+        cache.put(cache.key('mysql', 'users', 'id = 2'), [])
+        cache.put(cache.key('mysql', 'orders'), [])
+        cache.put(cache.key('cassandra', 'users'), [])
+        self.assertEqual(cache.invalidate('mysql', 'users'), 2)
+        self.assertEqual(len(cache), 2)
+
+
+class TestCachedReads(unittest.TestCase):
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_mysql_select_record_is_cached_until_a_write(self, mock_connect):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(1, 'alice')]
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        connection = MySQLConnection('127.0.0.1', 'root', 'password', 'test_db', result_cache=ResultCache())
+
+        self.assertEqual(connection.select_record('users', 'id = 1'), [(1, 'alice')])
+        self.assertEqual(connection.select_record('users', 'id = 1 '), [(1, 'alice')])
+        self.assertEqual(mock_connect.call_count, 1)
+
+        connection.update_record('users', {'name': 'bob'}, 'id = 1')
+        mock_cursor.fetchall.return_value = [(1, 'bob')]
+        self.assertEqual(connection.select_record('users', 'id = 1'), [(1, 'bob')])
+        self.assertEqual(connection.result_cache.stats['hits'], 1)
+        self.assertEqual(connection.result_cache.stats['invalidations'], 1)
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_reads_inside_a_transaction_bypass_the_cache(self, mock_connect):
+        mock_connect.return_value.in_transaction = False
+        mock_connect.return_value.cursor.return_value.fetchall.return_value = [(1, 'uncommitted')]
+        connection = MySQLConnection('127.0.0.1', 'root', 'password', 'test_db', result_cache=ResultCache())
+
+        with connection.transaction():
+            connection.select_record('users', 'id = 1')
+
+        self.assertEqual(len(connection.result_cache), 0)
+        self.assertEqual(connection.result_cache.stats['misses'], 0)
+
+    @patch('database_automation.mysql_crud.mysql.connector.connect')
+    def test_tables_written_in_a_transaction_are_invalidated_on_commit(self, mock_connect):
+        mock_connect.return_value.in_transaction = False
+        fetchall = mock_connect.return_value.cursor.return_value.fetchall
+        fetchall.return_value = [(1, 'alice')]
+        connection = MySQLConnection('127.0.0.1', 'root', 'password', 'test_db', result_cache=ResultCache())
+
+        with connection.transaction():
+            connection.update_record('users', {'name': 'bob'}, 'id = 1')
+            # Another thread reads the committed row before this transaction commits
+            reader = threading.Thread(target=connection.select_record, args=('users', 'id = 1'))
+            reader.start()
+            reader.join()
+            self.assertEqual(len(connection.result_cache), 1)
+
+        fetchall.return_value = [(1, 'bob')]
+        self.assertEqual(connection.select_record('users', 'id = 1'), [(1, 'bob')])
+
+    def test_cassandra_fetch_records_is_cached_until_a_write(self):
+        cassandra = CassandraOperation(contact_points=['127.0.0.1'], result_cache=ResultCache())
+        session = MagicMock()
+        session.keyspace = 'test_keyspace'
+        session.execute.return_value = iter([(1, 'alice')])
+        cassandra._CassandraOperation__session = session
+
+        self.assertEqual(cassandra.fetch_records('users'), [(1, 'alice')])
+        self.assertEqual(cassandra.fetch_records('users'), [(1, 'alice')])
+        self.assertEqual(session.execute.call_count, 1)
+
+        cassandra.delete_record('users', 'id', 1)
+        session.execute.return_value = iter([])
+        self.assertEqual(cassandra.fetch_records('users'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
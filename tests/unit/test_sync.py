@@ -0,0 +1,137 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from database_automation.sync import IncrementalSync, SyncError, WatermarkStore
+
+
+class FakeSource:
+    # Stands in for MySQLConnection.select_iter over an in-memory table
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def select_iter(self, table_name, conditions=None, batch_size=1000, batches=False, params=None,
+                    order_by=None, dictionary=False):
+        self.queries.append((conditions, params))
+        rows = sorted(self.rows, key=lambda row: row[order_by])
+        if conditions:
+            column, operator, _ = conditions.split()
+            rows = [row for row in rows if (row[column] >= params[0] if operator == '>=' else row[column] > params[0])]
+        for offset in range(0, len(rows), batch_size):
+            yield [dict(row) for row in rows[offset:offset + batch_size]]
+
+
+class TestWatermarkStore(unittest.TestCase):
+
+    def test_round_trips_typed_values(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'state.json')
+            store = WatermarkStore(path)
+            stamp = datetime.datetime(2024, 5, 1, 12, 30, 15, 250)
+            store.set('people', stamp)
+            store.set('orders', 42)
+
+            reopened = WatermarkStore(path)
+            self.assertEqual(reopened.get('people'), stamp)
+            self.assertEqual(reopened.get('orders'), 42)
+            self.assertIsNone(reopened.get('missing'))
+            reopened.reset('orders')
+            self.assertIsNone(store.get('orders'))
+            self.assertEqual(os.listdir(directory), ['state.json'])
+
+
+class TestIncrementalSync(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = WatermarkStore(os.path.join(directory.name, 'state.json'))
+
+    def test_copies_only_rows_past_the_watermark(self):
+        source = FakeSource([{'id': i, 'name': f'name{i}'} for i in range(1, 6)])
+        target = MagicMock()
+        target.bulk_insert.return_value = {'rows': 0}
+        sync = IncrementalSync(source, 'people', 'id', [('mysql', target, 'people_copy')], self.store, batch_size=2)
+
+        self.assertEqual(sync.run(), {'rows': 5, 'batches': 3, 'watermark': 5})
+        source.rows.append({'id': 6, 'name': 'name6'})
+        self.assertEqual(sync.run(), {'rows': 1, 'batches': 1, 'watermark': 6})
+        self.assertEqual(sync.run(), {'rows': 0, 'batches': 0, 'watermark': 6})
+
+        self.assertEqual(source.queries, [(None, None), ('id > %s', (5,)), ('id > %s', (6,))])
+        self.assertEqual(target.bulk_insert.call_args_list[-1].args, ('people_copy', [{'id': 6, 'name': 'name6'}]))
+
+    def test_failed_batch_keeps_last_acknowledged_watermark(self):
+        source = FakeSource([{'id': i} for i in range(1, 5)])
+        target = MagicMock()
+        target.bulk_insert.side_effect = [{'rows': 2, 'failed': []}, {'rows': 1, 'failed': [{'row': 1, 'error': 'timeout'}]}]
+        sync = IncrementalSync(source, 'people', 'id', [('cassandra', target, 'people')], self.store, batch_size=2)
+
+        with self.assertRaises(SyncError) as raised:
+            sync.run()
+        self.assertEqual(raised.exception.watermark, 2)
+        self.assertEqual(self.store.get('people'), 2)
+
+    def test_updated_at_sync_upserts_by_key(self):
+        early, late = datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 2)
+        source = FakeSource([{'id': 1, 'name': 'John', 'updated_at': early}, {'id': 2, 'name': 'Jane', 'updated_at': late}])
+        target = MagicMock()
+        target.upsert.return_value = {'upserted': 0, 'errors': []}
+        sync = IncrementalSync(source, 'people', 'updated_at', [('mongo', target, 'people')], self.store, key='id')
+
+        sync.run()
+        source.rows[0].update(name='Johnny', updated_at=late)
+        report = sync.run()
+
+        # Rows sharing the watermark timestamp are re-read; the upsert makes that harmless
+        self.assertEqual(source.queries[-1], ('updated_at >= %s', (late,)))
+        self.assertEqual(report, {'rows': 2, 'batches': 1, 'watermark': late})
+        rows, key = target.upsert.call_args.args[1:]
+        self.assertEqual(([row['name'] for row in rows], key), (['Johnny', 'Jane'], 'id'))
+        target.bulk_insert.assert_not_called()
+
+    def test_custom_connector_needs_upsert_for_keyed_sync(self):
+        class Custom:
+            def __init__(self):
+                self.rows = []
+
+            def insert(self, target, record):
+                pass
+
+            def bulk_insert(self, target, rows):
+                self.rows.extend(rows)
+
+            def iter_select(self, target, conditions=None, batch_size=1000):
+                return iter([])
+
+            def update(self, target, values, conditions):
+                pass
+
+            def delete(self, target, conditions):
+                pass
+
+            def close(self):
+                pass
+
+        class CustomWithUpsert(Custom):
+            def upsert(self, target, rows, key):
+                self.rows.extend(rows)
+
+        source = FakeSource([{'id': 1}, {'id': 2}])
+        with self.assertRaises(TypeError):
+            IncrementalSync(source, 'people', 'id', [('custom', Custom(), 'people')], self.store, key='id')
+
+        target = CustomWithUpsert()
+        IncrementalSync(source, 'people', 'id', [('custom', target, 'people')], self.store, key='id').run()
+        self.assertEqual(target.rows, [{'id': 1}, {'id': 2}])
+
+    def test_several_targets_need_a_key(self):
+        targets = [('mysql', MagicMock(), 'people'), ('mongo', MagicMock(), 'people')]
+        with self.assertRaises(ValueError):
+            IncrementalSync(FakeSource([]), 'people', 'id', targets, self.store)
+
+
+if __name__ == '__main__':
+    unittest.main()